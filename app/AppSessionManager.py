@@ -1,9 +1,7 @@
-import json
-import os
-
 from PyQt6.QtWidgets import QFileDialog
 
 from AppWindow import AppWindow
+from Core.ProjectFile import get_project_title, write_project_file
 from Utility.MessageHandler import MessageHandler
 
 class AppSessionManager:
@@ -15,22 +13,15 @@ class AppSessionManager:
 
         self.current_file = ''
     
-    def _get_project_title(self, file_path):
-        return os.path.splitext(os.path.basename(file_path))[0]
-    
     def _save_data_to_file(self, file_path, data):
-        if not file_path.endswith('.json'):
-            file_path += '.json'
-        
         try:
-            with open(file_path, "w") as write_file:
-                json.dump(data, write_file, indent=4)
+            file_path = write_project_file(file_path, data)
         except Exception as e:
             MessageHandler.critical(self._app_window, 'Błąd', f'Wystąpił błąd zapisywania pliku: {e}')
             return None
 
         self.current_file = file_path
-        new_project_title = self._get_project_title(file_path)
+        new_project_title = get_project_title(file_path)
         return new_project_title
 
     def save_data(self, suggested_file_name, data):
@@ -0,0 +1,30 @@
+import json
+import os
+
+def get_project_title(file_path):
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+def read_project_file(file_path):
+    """
+    Args:
+        file_path (str): Path to the project file.
+    Returns:
+        (list): Saved data of the application components.
+    """
+    with open(file_path, 'r') as read_file:
+        return json.load(read_file)
+
+def write_project_file(file_path, data):
+    """
+    Args:
+        file_path (str): Path to the project file - the '.json' extension is added if it is missing.
+        data (list): Data of the application components.
+    Returns:
+        (str): Path to the saved file.
+    """
+    if not file_path.endswith('.json'):
+        file_path += '.json'
+
+    with open(file_path, "w") as write_file:
+        json.dump(data, write_file, indent=4)
+    return file_path
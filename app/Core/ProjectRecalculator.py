@@ -0,0 +1,124 @@
+from Core.ProjectFile import get_project_title, read_project_file
+
+from DbHandler.model.DatabaseHandler import getDatabaseHandler
+
+from InputShaft.model.InputShaftCalculator import InputShaftCalculator
+from InputShaft.Tabs.BearingsTabCalculator import BearingsTabCalculator
+from InputShaft.Tabs.PowerLossTabCalculator import PowerLossTabCalculator
+
+from ShaftDesigner.model.FunctionsCalculator import FunctionsCalculator
+from ShaftDesigner.model.ShaftCalculator import ShaftCalculator
+
+class ProjectRecalculator():
+    """
+    Rebuild the saved project without the GUI - the same way as InputShaftController.load_data - and recalculate its results.
+    The material and the bearings of the project are read from the current catalog by their codes - the project whose item
+    is no longer in the catalog can not be recalculated.
+    """
+    # Keys of the summary of the project, the values not available for the project are None
+    summary_keys = ('dsc', 'dec', 'Ra', 'Rb', 'fmax', 'z_fmax', 'θmax', 'z_θmax', 'nkr',
+                    'C_support_A', 'C_support_B', 'C_eccentrics', 'P')
+
+    def _get_catalog_item(self, tables_group_name, item):
+        # The saved item is the copy of the row of one of the tables of the group - the row with the same code
+        # is read from the table with the same attributes
+        db_handler = getDatabaseHandler()
+        attributes = list(item)
+        code = item[attributes[0]][0]
+        for table_name in db_handler.getAvailableTables(tables_group_name):
+            catalog_item = db_handler.getSingleItem(table_name, code)
+            if catalog_item is not None and list(catalog_item) == attributes:
+                return catalog_item
+        raise LookupError(f"Item '{code}' of the tables group '{tables_group_name}' is not in the catalog")
+
+    def _update_catalog_items(self, input_shaft_calculator):
+        # The material and the bearings are read from the catalog again, so that the project is recalculated
+        # with their current values instead of the ones saved with the project
+        data = input_shaft_calculator.get_data()
+        if data['Materiał']:
+            data['Materiał'] = self._get_catalog_item(input_shaft_calculator.get_shaft_material_tables_group_name(), data['Materiał'])
+        for bearing_section_id, attributes in data['Bearings'].items():
+            if attributes['data']:
+                attributes['data'] = self._get_catalog_item(input_shaft_calculator.get_bearing_tables_group_name(bearing_section_id),
+                                                            attributes['data'])
+            if attributes['data'] and attributes['rolling_elements']:
+                attributes['rolling_elements'] = self._get_catalog_item(input_shaft_calculator.get_rolling_element_tables_group_name(bearing_section_id),
+                                                                        attributes['rolling_elements'])
+
+    def _calculate_shaft(self, component_data, shaft_sections):
+        functions_calculator = FunctionsCalculator(initial_functions_cache_size=0)
+        functions_calculator.calculate_initial_functions_and_attributes(component_data)
+        summary = {key: component_data[key][0] for key in ('dsc', 'dec', 'Ra', 'Rb')}
+
+        if shaft_sections:
+            shaft_calculator = ShaftCalculator()
+            shaft_calculator.set_data(functions_calculator.get_shaft_initial_attributes())
+            # The subsections numbers are saved as the strings of the JSON keys
+            shaft_calculator.shaft_sections = {section_name: {int(number): subsection for number, subsection in section.items()}
+                                               for section_name, section in shaft_sections.items()}
+            shaft_calculator.calculate_shaft_sections()
+            functions_calculator.calculate_remaining_functions(shaft_calculator.get_shaft_attributes())
+            shaft_calculator.save_data(component_data)
+
+            deflection_arrow = functions_calculator.get_deflection_arrow_extremum()
+            deflection_angle = functions_calculator.get_deflection_angle_extremum()
+            if deflection_arrow is not None:
+                summary['z_fmax'], summary['fmax'] = deflection_arrow
+                summary['z_θmax'], summary['θmax'] = deflection_angle
+                summary['nkr'] = functions_calculator.get_critical_speed()['nkr']
+        return summary
+
+    def _calculate_bearings(self, component_data):
+        bearings_calculator = BearingsTabCalculator()
+        bearings_calculator.init_data(component_data, None, None)
+        power_loss_calculator = PowerLossTabCalculator()
+        power_loss_calculator.init_data(component_data, None, None)
+
+        summary = {}
+        power_losses = []
+        for bearing_section_id, attributes in component_data['Bearings'].items():
+            if all(attributes[key][0] is not None for key in ('Lh', 'fd', 'ft')):
+                summary[f'C_{bearing_section_id}'] = bearings_calculator.calculate_bearing_load_capacity(bearing_section_id, component_data)
+            if attributes['data'] and attributes['rolling_elements'] and attributes['f'][0] is not None:
+                power_losses.append(power_loss_calculator.calculate_bearing_power_loss(bearing_section_id, component_data))
+
+        # The absolute power loss is only known if the bearings of all the sections were selected
+        if len(power_losses) == len(component_data['Bearings']):
+            summary['P'] = sum(power_losses)
+        return summary
+
+    def recalculate(self, project_data):
+        """
+        Args:
+            project_data (list): Saved project - the calculator data, the shaft sections, the tabs states and the is_shaft_designed flag.
+        Returns:
+            (dict): Summary of the project with the keys from summary_keys.
+        """
+        input_shaft_calculator = InputShaftCalculator()
+        input_shaft_calculator.set_data(project_data[0])
+        self._update_catalog_items(input_shaft_calculator)
+        input_shaft_calculator.set_initial_data()
+        component_data = input_shaft_calculator.get_data()
+
+        summary = dict.fromkeys(self.summary_keys)
+        summary.update(self._calculate_shaft(component_data, project_data[1]))
+        summary.update(self._calculate_bearings(component_data))
+        return {key: None if value is None else float(value) for key, value in summary.items()}
+
+def recalculate_project_file(file_path):
+    """
+    Recalculate the saved project - it runs in the worker process of the batch recalculation.
+
+    Args:
+        file_path (str): Path to the project file.
+    Returns:
+        (dict): Name and path of the project, its summary and the error message if the project could not be recalculated.
+    """
+    result = {'project': get_project_title(file_path), 'file': file_path}
+    try:
+        result.update(ProjectRecalculator().recalculate(read_project_file(file_path)))
+        result['error'] = None
+    except Exception as e:
+        result.update(dict.fromkeys(ProjectRecalculator.summary_keys))
+        result['error'] = f'{type(e).__name__}: {e}'
+    return result
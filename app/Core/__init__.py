@@ -0,0 +1,20 @@
+"""
+Headless calculation core of the application - the calculators and the database handler, which
+can be imported without PyQt6, e.g. in the batch workers and the scripts.
+"""
+from Core.ProjectFile import get_project_title, read_project_file, write_project_file
+from Core.ProjectRecalculator import ProjectRecalculator, recalculate_project_file
+
+from DbHandler.model.ColumnarCatalog import ColumnarCatalog
+from DbHandler.model.DatabaseHandler import DatabaseHandler, getDatabaseHandler
+from DbHandler.model.ResultStore import ResultStore
+
+from InputShaft.model.InputShaftCalculator import InputShaftCalculator
+from InputShaft.Tabs.PreliminaryDataTabCalculator import calculate_input_limits
+from InputShaft.Tabs.BearingsTabCalculator import BearingsTabCalculator
+from InputShaft.Tabs.PowerLossTabCalculator import PowerLossTabCalculator
+
+from ShaftDesigner.model.FunctionsCalculator import FunctionsCalculator
+from ShaftDesigner.model.LoadCasesCalculator import LoadCasesCalculator
+from ShaftDesigner.model.ShaftCalculator import ShaftCalculator
+from ShaftDesigner.model.ShaftOptimizer import ShaftOptimizer
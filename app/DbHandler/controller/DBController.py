@@ -1,12 +1,18 @@
 from ast import literal_eval
 from functools import partial
 
+from DbHandler.model.ColumnarCatalog import ColumnarCatalog
+
 class ViewSelectItemController:
-    def __init__(self, model, view, availableTables, limits):
+    def __init__(self, model, view, tablesGroupName, limits):
         self._dbHandler = model
         self._window = view
-        self._availableTables = availableTables
         self._limits = limits
+        # The tables of the group are read once into the columnar catalog and filtered in the memory - switching
+        # the tables only creates the data frame of the filtered rows
+        self._catalog = ColumnarCatalog(model)
+        self._availableTables = self._dbHandler.getAvailableTables(tablesGroupName)
+        self._tablesIndices = {tableName: self._catalog.getFilteredIndices(tableName, limits) for tableName in self._availableTables}
 
         self.selectedItemAttributes = None
         self._initUI()
@@ -17,7 +23,7 @@ class ViewSelectItemController:
         self._activeTable = self._availableTables[0]
         # Init view
         self._window.viewActiveTableSelector(self._availableTables)
-        self._window.viewTableItems(self._dbHandler.getFilteredResults(self._activeTable, self._limits))
+        self._window.viewTableItems(self._getTableResults(self._activeTable))
         self._window.viewFunctionButtons()
 
     def _connectSignalsAndSlots(self):
@@ -33,9 +39,12 @@ class ViewSelectItemController:
             # Set new active table
             self._activeTable = selectedTable
             # Update view
-            updatedResults = self._dbHandler.getFilteredResults(self._activeTable, self._limits)
+            updatedResults = self._getTableResults(self._activeTable)
             self._window.TableItemsView.updateItemsView(updatedResults)
 
+    def _getTableResults(self, tableName):
+        return self._catalog.getFilteredResults(tableName, indices=self._tablesIndices[tableName])
+
     def _selectItemEvent(self, item):
         # Get the selected item attributes
         itemCode = self._window.TableItemsView.getItemCode(item)
@@ -58,6 +67,8 @@ class ViewDbTablesController:
     def __init__(self, model, view):
         self._dbHandler = model
         self._window = view
+        # The tables are filtered again on every change of the limits, so they are read once into the memory
+        self._catalog = ColumnarCatalog(model)
         
         self._startup()
         self._connectSignalsAndSlots()
@@ -71,7 +82,7 @@ class ViewDbTablesController:
         # Init view
         self._window.viewTablesTree(self._availableTables)
         self._window.viewFilters(self._dbHandler.getTableItemsAttributes(self._activeTable))
-        self._window.viewTableItems(self._dbHandler.getFilteredResults(self._activeTable, self._limits))
+        self._window.viewTableItems(self._catalog.getFilteredResults(self._activeTable, self._limits))
     
     def _connectSignalsAndSlots(self):
         self._window.tablesTreeView.tableSelectedSignal.connect(self._switchActiveTableEvent)
@@ -85,7 +96,7 @@ class ViewDbTablesController:
             # Update limits - get them from new active table
             self._limits = self._dbHandler.getTableItemsFilters(self._activeTable)
             # Update view
-            updatedResults = self._dbHandler.getFilteredResults(self._activeTable, self._limits)
+            updatedResults = self._catalog.getFilteredResults(self._activeTable, self._limits)
             updatedAttributes = self._dbHandler.getTableItemsAttributes(self._activeTable)
             self._window.TableItemsView.updateItemsView(updatedResults)
             self._window.ItemsFiltersView.updateFiltersView(updatedAttributes)
@@ -96,8 +107,8 @@ class ViewDbTablesController:
         for attribute, attributeLimits in self._limits.items():
             for limit in attributeLimits:
                 text = self._window.ItemsFiltersView.filtersLineEdits[attribute][limit].text()
-                number = literal_eval(text) if text else 0
+                number = literal_eval(text) if text else None
                 attributeLimits[limit] = number
         # Update items view
-        updatedResults = self._dbHandler.getFilteredResults(self._activeTable, self._limits)
+        updatedResults = self._catalog.getFilteredResults(self._activeTable, self._limits)
         self._window.TableItemsView.updateItemsView(updatedResults)
@@ -0,0 +1,162 @@
+import numpy as np
+
+from DbHandler.model.DatabaseHandler import getAttributeAndUnit, getDatabaseHandler
+
+class ColumnarCatalog:
+    """
+    In-memory alternative of the filtering of the database handler - every table is read once into the numpy arrays
+    of its columns. The items are filtered with the same limits as by getFilteredResults, but the results are the indices
+    of the rows, so that the limits can be applied again on every change without creating a data frame.
+
+    The numeric columns are kept with their sorted orders - the range of the most selective limit is found by the binary
+    search and the remaining limits only filter its rows. The codes of the items (the first column) are sorted as well.
+    """
+    def __init__(self, dbHandler=None):
+        """
+        Args:
+            dbHandler (DatabaseHandler): Handler of the database - the shared one by default.
+        """
+        self._dbHandler = dbHandler or getDatabaseHandler()
+        self._databaseVersion = None
+        self._tables = {}
+
+    def _getTable(self, tableName):
+        # The tables are read again if the database changed
+        databaseVersion = self._dbHandler.getDatabaseVersion()
+        if databaseVersion != self._databaseVersion:
+            self._databaseVersion = databaseVersion
+            self._tables = {}
+        if tableName not in self._tables:
+            self._tables[tableName] = self._loadTable(tableName)
+        return self._tables[tableName]
+
+    def _loadTable(self, tableName):
+        columnNames, rows = self._dbHandler.getTableData(tableName)
+        columnsValues = list(zip(*rows)) if rows else [()] * len(columnNames)
+
+        columns = []
+        for columnValues in columnsValues:
+            # The columns without texts are float with NaN for NULL - NaN is sorted last and fails every limit
+            if not any(isinstance(value, str) for value in columnValues):
+                values = np.array(columnValues, dtype=float)
+                order = np.argsort(values, kind='stable')
+                columns.append({'values': values, 'order': order, 'sortedValues': values[order], 'validCount': np.count_nonzero(~np.isnan(values))})
+            else:
+                columns.append({'values': np.array(columnValues, dtype=object), 'order': None})
+
+        # Codes of the items as they are shown in the items table
+        codes = np.array([str(value) for value in columnsValues[0]]) if rows else np.array([], dtype=str)
+        codesOrder = np.argsort(codes, kind='stable')
+        return {'columnNames': columnNames, 'rows': rows, 'columns': columns, 'codes': codes[codesOrder], 'codesOrder': codesOrder}
+
+    def _getConditions(self, table, limits):
+        # Ranges of the columns - the same columns and limits as in the query of getFilteredResults
+        conditions = {}
+        for attribute, attributeLimits in limits.items():
+            columnIdx = next((idx for idx, columnName in enumerate(table['columnNames'][1:], 1) if columnName.startswith(attribute)), None)
+            if columnIdx is None:
+                raise ValueError(f"No column for the attribute '{attribute}'")
+            minValue, maxValue = conditions.get(columnIdx, (None, None))
+            if attributeLimits['min'] is not None:
+                minValue = attributeLimits['min']
+            if attributeLimits['max'] is not None:
+                maxValue = attributeLimits['max']
+            if minValue is not None or maxValue is not None:
+                conditions[columnIdx] = (minValue, maxValue)
+        return conditions
+
+    @staticmethod
+    def _getSortedRange(column, minValue, maxValue):
+        start = np.searchsorted(column['sortedValues'], minValue, 'left') if minValue is not None else 0
+        stop = np.searchsorted(column['sortedValues'], maxValue, 'right') if maxValue is not None else column['validCount']
+        return start, max(start, stop)
+
+    @staticmethod
+    def _getMask(values, minValue, maxValue):
+        if values.dtype != object:
+            mask = ~np.isnan(values)
+            if minValue is not None:
+                mask &= values >= minValue
+            if maxValue is not None:
+                mask &= values <= maxValue
+            return mask
+        # The text columns are compared with the limits as texts, the same as by SQLite
+        minText = None if minValue is None else str(minValue)
+        maxText = None if maxValue is None else str(maxValue)
+        return np.array([isinstance(value, str) and (minText is None or value >= minText) and (maxText is None or value <= maxText)
+                         for value in values], dtype=bool)
+
+    def getFilteredIndices(self, tableName, limits):
+        """
+        Args:
+            tableName (str): Name of the table.
+            limits (dict): Limits of the items - see DatabaseHandler.getTableItemsFilters. The limits equal to None are not applied.
+        Returns:
+            (numpy.ndarray): Indices of the rows of the items within the limits in the order of the table.
+        """
+        table = self._getTable(tableName)
+        conditions = self._getConditions(table, limits)
+        if not conditions:
+            return np.arange(len(table['rows']))
+
+        # Start with the rows of the numeric column with the fewest rows within its limits
+        ranges = {columnIdx: self._getSortedRange(table['columns'][columnIdx], *conditions[columnIdx])
+                  for columnIdx in conditions if table['columns'][columnIdx]['order'] is not None}
+        if ranges:
+            columnIdx = min(ranges, key=lambda idx: ranges[idx][1] - ranges[idx][0])
+            start, stop = ranges[columnIdx]
+            indices = table['columns'][columnIdx]['order'][start:stop]
+            del conditions[columnIdx]
+        else:
+            indices = np.arange(len(table['rows']))
+
+        for columnIdx, (minValue, maxValue) in conditions.items():
+            indices = indices[self._getMask(table['columns'][columnIdx]['values'][indices], minValue, maxValue)]
+        return np.sort(indices)
+
+    def getColumnValues(self, tableName, attribute, indices=None):
+        """
+        Args:
+            tableName (str): Name of the table.
+            attribute (str): Attribute of the column - the first column starting with it is returned.
+            indices (numpy.ndarray): Indices of the rows - by default all of them.
+        Returns:
+            (numpy.ndarray): Values of the column.
+        """
+        table = self._getTable(tableName)
+        columnIdx = next(idx for idx, columnName in enumerate(table['columnNames']) if columnName.startswith(attribute))
+        values = table['columns'][columnIdx]['values']
+        return values if indices is None else values[indices]
+
+    def getSingleItem(self, tableName, code):
+        """
+        Args:
+            tableName (str): Name of the table.
+            code (str): Code of the item - the value of the first column.
+        Returns:
+            (dict): Attributes of the item - the same as by DatabaseHandler.getSingleItem.
+        """
+        table = self._getTable(tableName)
+        position = np.searchsorted(table['codes'], str(code))
+        if position == len(table['codes']) or table['codes'][position] != str(code):
+            return None
+        row = table['rows'][table['codesOrder'][position]]
+        return {attr: [value, unit] for (attr, unit), value in zip(map(getAttributeAndUnit, table['columnNames']), row)}
+
+    def getFilteredResults(self, tableName, limits=None, indices=None):
+        """
+        Args:
+            tableName (str): Name of the table.
+            limits (dict): Limits of the items - used if the indices are not given.
+            indices (numpy.ndarray): Indices of the rows - see getFilteredIndices.
+        Returns:
+            (pandas.DataFrame): Items in the same form as returned by DatabaseHandler.getFilteredResults.
+        """
+        import pandas as pd
+
+        table = self._getTable(tableName)
+        if indices is None:
+            indices = self.getFilteredIndices(tableName, limits or {})
+        df = pd.DataFrame.from_records([table['rows'][idx] for idx in indices], columns=table['columnNames'])
+        df.columns = [column.replace("[", "\n[") for column in df.columns]
+        return df
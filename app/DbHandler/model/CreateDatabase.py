@@ -1,5 +1,7 @@
+import argparse
+import hashlib
+import json
 import sqlite3
-import pandas as pd
 import os
 import sys
 
@@ -31,31 +33,36 @@ if config_dir not in sys.path:
 
 
 from config import DATA_PATH, resource_path
+from DbHandler.model.DatabaseHandler import SOURCES_TABLE_NAME
 
 database_tables = [
     {   
         "name": "wał czynny-łożyska-podporowe-kulkowe",
         "csvName": "wal_czynny-lozyska-podporowe-kulkowe.csv",
         "headers": ["Kod", "Dw [mm]", "Dz [mm]", "B [mm]", "C [kN]", "C0 [kN]", "n max [obr/min]", "elementy toczne"],
-        "types": ['TEXT', 'INTEGER', 'INTEGER', 'INTEGER', 'REAL', 'REAL', 'INTEGER', 'TEXT']
+        "types": ['TEXT', 'INTEGER', 'INTEGER', 'INTEGER', 'REAL', 'REAL', 'INTEGER', 'TEXT'],
+        "indexes": ["Dw [mm]", "Dz [mm]", "B [mm]", "C [kN]", "n max [obr/min]"]
     },
     {
         "name": "wał czynny-łożyska-podporowe-walcowe",
         "csvName": "wal_czynny-lozyska-podporowe-walcowe.csv",
         "headers": ["Kod", "Dw [mm]", "Dz [mm]", "B [mm]", "C [kN]", "C0 [kN]", "n max [obr/min]", "elementy toczne"],
-        "types": ['TEXT', 'INTEGER', 'INTEGER', 'INTEGER', 'REAL', 'REAL', 'INTEGER', 'TEXT']
+        "types": ['TEXT', 'INTEGER', 'INTEGER', 'INTEGER', 'REAL', 'REAL', 'INTEGER', 'TEXT'],
+        "indexes": ["Dw [mm]", "Dz [mm]", "B [mm]", "C [kN]", "n max [obr/min]"]
     },
     {
         "name": "wał czynny-łożyska-centralne-walcowe",
         "csvName": "wal_czynny-lozyska-centralne-walcowe.csv",
         "headers": ["Kod", "Dw [mm]", "Dz [mm]", "E [mm]", "B [mm]", "C [kN]", "C0 [kN]", "n max [obr/min]", "elementy toczne"],
-        "types": ['TEXT', 'INTEGER', 'INTEGER', 'REAL', 'INTEGER', 'REAL', 'REAL', 'INTEGER', 'TEXT']
+        "types": ['TEXT', 'INTEGER', 'INTEGER', 'REAL', 'INTEGER', 'REAL', 'REAL', 'INTEGER', 'TEXT'],
+        "indexes": ["Dw [mm]", "Dz [mm]", "B [mm]", "C [kN]", "n max [obr/min]"]
     },
     {
         "name": "wał czynny-łożyska-centralne-igiełkowe",
         "csvName": "wal_czynny-lozyska-centralne-igielkowe.csv",
         "headers": ["Kod", "Dw [mm]", "Dz [mm]", "E [mm]", "B [mm]", "C [kN]", "C0 [kN]", "n max [obr/min]", "elementy toczne"],
-        "types": ['TEXT', 'INTEGER', 'INTEGER', 'REAL', 'INTEGER', 'REAL', 'REAL', 'INTEGER', 'TEXT']
+        "types": ['TEXT', 'INTEGER', 'INTEGER', 'REAL', 'INTEGER', 'REAL', 'REAL', 'INTEGER', 'TEXT'],
+        "indexes": ["Dw [mm]", "Dz [mm]", "B [mm]", "C [kN]", "n max [obr/min]"]
     },
     {
         "name": "wał czynny-materiały",
@@ -67,72 +74,144 @@ database_tables = [
         "name": "wał czynny-elementy toczne-kulki",
         "csvName": "wal_czynny-elementy_toczne-kulki.csv",
         "headers": [ "Kod", "D" ],
-        "types": [ 'STRING', 'INTEGER']
+        "types": [ 'STRING', 'INTEGER'],
+        "indexes": ["D"]
     },
     {
         "name": "wał czynny-elementy toczne-wałeczki",
         "csvName": "wal_czynny-elementy_toczne-waleczki.csv",
         "headers": [ "Kod", "D" ],
-        "types": [ 'STRING', 'INTEGER']
+        "types": [ 'STRING', 'INTEGER'],
+        "indexes": ["D"]
     },
     {
         "name": "wał czynny-elementy toczne-igiełki",
         "csvName": "wal_czynny-elementy_toczne-igielki.csv",
         "headers": [ "Kod", "D" ],
-        "types": [ 'STRING', 'INTEGER']
+        "types": [ 'STRING', 'INTEGER'],
+        "indexes": ["D"]
     }
 ]
 
 class DatabaseCreator:
-    def __init__(self): 
-        self._createDatabase()
-        self._createTables()
-        self._populateTables()
-
-    def _createDatabase(self):
-        # Get the destination directory absoulte path where csv and database files should be stored
-        self._dataPath = DATA_PATH
+    """
+    Build the database of the elements from the csv files. The hashes of the csv files and of the tables definitions
+    are recorded in the sources table, so that only the tables whose source changed are rebuilt - all of them
+    in a single transaction, so the database is never left partially updated.
+    """
+    def __init__(self, databasePath=None, tables=database_tables):
+        """
+        Args:
+            databasePath (str): Path to the database file - by default the database of the application.
+            tables (list): Definitions of the tables.
+        """
+        self._databasePath = databasePath or resource_path('baza_elementow.db')
+        self._tables = tables
+
+    @staticmethod
+    def _getFileHash(path):
+        fileHash = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(2**20), b''):
+                fileHash.update(block)
+        return fileHash.hexdigest()
+
+    @staticmethod
+    def _getDefinitionHash(table):
+        return hashlib.sha256(json.dumps(table, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+    def _checkSources(self):
+        # Check if the destination directory and the csv files exist before anything is changed
         if not os.path.exists(DATA_PATH):
             sys.stderr.write(f"Error: {DATA_PATH} does not exist.\n")
             sys.exit(1)
-
-        # Get the absoulte path of the created database
-        self._databasePath = resource_path('baza_elementow.db')
-
-        conn = sqlite3.connect(self._databasePath)
-        conn.close
-    
-    def _createTables(self):
-        conn = sqlite3.connect(self._databasePath)
-        # Create table for every table parameters listed above
-        self._tables = database_tables
-        
-        for table in self._tables:
-            headersWithTypes = [h + ' ' + t for h, t in zip(table['headers'], table['types'])]
-            headersStr = '", "'.join(headersWithTypes)
-            query = f"CREATE TABLE IF NOT EXISTS \"{table['name']}\" ({headersStr})"
-            conn.cursor().execute(query)
-
-        conn.commit()
-        conn.close
-    
-    def _populateTables(self):
-        conn = sqlite3.connect(self._databasePath)
-       
         for table in self._tables:
-            # Get the associated csv file absolute path 
             csvPath = resource_path(table["csvName"])
-            # Check if the csv file exists
             if not os.path.exists(csvPath):
                 sys.stderr.write(f"Error: {csvPath} does not exist.\n")
-                conn.close()
                 sys.exit(1)
-            # Populate the table with data from the csv file
-            df = pd.read_csv(csvPath, delimiter=';', decimal=',')
-            df.columns = table["headers"]
-            df.to_sql(table["name"], conn, if_exists='replace', index=False)
 
-        conn.commit()
-        conn.close()
-
-dbCreator = DatabaseCreator()
+    def _isTableUpToDate(self, conn, table, source, existingTables):
+        # The csv file is only hashed if its modification time or size changed
+        if table["name"] not in existingTables or source is None or source["definitionHash"] != self._getDefinitionHash(table):
+            return False
+        csvPath = resource_path(table["csvName"])
+        stat = os.stat(csvPath)
+        if (source["mtime"], source["size"]) == (stat.st_mtime_ns, stat.st_size):
+            return True
+        if source["csvHash"] != self._getFileHash(csvPath):
+            return False
+        conn.execute(f"UPDATE \"{SOURCES_TABLE_NAME}\" SET mtime = ?, size = ? WHERE name = ?", (stat.st_mtime_ns, stat.st_size, table["name"]))
+        return True
+
+    def _rebuildTable(self, conn, table):
+        # pandas is imported here, because it is slow to import and only the rebuilt tables need it
+        import pandas as pd
+
+        csvPath = resource_path(table["csvName"])
+        df = pd.read_csv(csvPath, delimiter=';', decimal=',')
+        df.columns = table["headers"]
+
+        # The table is created with the same columns types as by pandas.DataFrame.to_sql, which commits on its own,
+        # so the rows are inserted in the transaction of the build
+        conn.execute(f"DROP TABLE IF EXISTS \"{table['name']}\"")
+        conn.execute(pd.io.sql.get_schema(df, table["name"], con=conn))
+        rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+        conn.executemany(f"INSERT INTO \"{table['name']}\" VALUES ({', '.join('?' * len(df.columns))})", rows)
+
+        # Index the columns filtered in the items selection
+        for header in table.get("indexes", []):
+            indexName = f"{table['name']}-{header.split(' [')[0]}"
+            conn.execute(f"CREATE INDEX \"{indexName}\" ON \"{table['name']}\" (\"{header}\")")
+
+        stat = os.stat(csvPath)
+        conn.execute(f"INSERT OR REPLACE INTO \"{SOURCES_TABLE_NAME}\" VALUES (?, ?, ?, ?, ?, ?)",
+                     (table["name"], table["csvName"], self._getFileHash(csvPath), self._getDefinitionHash(table), stat.st_mtime_ns, stat.st_size))
+
+    def build(self, force=False):
+        """
+        Rebuild the tables whose csv file or definition changed.
+
+        Args:
+            force (bool): Rebuild all the tables.
+        Returns:
+            (list): Names of the rebuilt tables.
+        """
+        self._checkSources()
+
+        conn = sqlite3.connect(self._databasePath, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(f"CREATE TABLE IF NOT EXISTS \"{SOURCES_TABLE_NAME}\" (name TEXT PRIMARY KEY, csvName TEXT, csvHash TEXT, definitionHash TEXT, mtime INTEGER, size INTEGER)")
+            existingTables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+            cursor = conn.execute(f"SELECT name, csvHash, definitionHash, mtime, size FROM \"{SOURCES_TABLE_NAME}\"")
+            sources = {row[0]: dict(zip(("csvHash", "definitionHash", "mtime", "size"), row[1:])) for row in cursor}
+
+            rebuiltTables = []
+            for table in self._tables:
+                if force or not self._isTableUpToDate(conn, table, sources.get(table["name"]), existingTables):
+                    self._rebuildTable(conn, table)
+                    rebuiltTables.append(table["name"])
+
+            # Gather the statistics of the indexes, so that the query planner can choose the most selective one
+            if rebuiltTables:
+                conn.execute("ANALYZE")
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return rebuiltTables
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Zbuduj bazę danych elementów z plików csv - przebudowywane są tylko tabele, których źródła się zmieniły.')
+    parser.add_argument('--force', action='store_true', help='Przebuduj wszystkie tabele')
+    args = parser.parse_args()
+
+    rebuiltTables = DatabaseCreator().build(args.force)
+    if rebuiltTables:
+        print('Przebudowano tabele:\n' + '\n'.join(rebuiltTables))
+    else:
+        print('Baza danych jest aktualna.')
@@ -1,177 +1,289 @@
 import sqlite3
-import pandas as pd
 import os
 import sys
 import re
 
 from config import DATA_PATH, resource_path
 
+# Table with the hashes of the sources of the tables, which is written by the DatabaseCreator
+SOURCES_TABLE_NAME = 'źródła tabel'
+
+def getAttributeAndUnit(columnName):
+    """
+    Args:
+        columnName (str): Name of the column of the table.
+    Returns:
+        (tuple): Attribute and its unit.
+    """
+    # Check if the item contains square brackets (indicating a unit)
+    if '[' in columnName and ']' in columnName:
+        # Split the attribute and its unit and remove the square brackets from the unit
+        attr, unit = columnName.rsplit(' ', 1)
+        return attr, unit.strip('[]')
+    # For items without a unit, use the whole item as the attribute and an empty string for the unit
+    return columnName, ''
+
 class DatabaseHandler:
-    def __init__(self):
-        self._startup()
+    """
+    Access to the database of the elements. The connection is kept open and the schema - the tables names and their
+    columns - is read once and cached, so that the queries of the items run a single SELECT. The cache and
+    the connection are renewed if the database file changes, e.g. when it is rebuilt by the DatabaseCreator.
+    """
+    def __init__(self, databasePath=None):
+        """
+        Args:
+            databasePath (str): Path to the database file - by default the database of the application.
+        """
+        self._conn = None
+        self._startup(databasePath)
     
-    def _startup(self):
+    def _startup(self, databasePath):
         # Check if destination folder where database file should be, exists
         if not os.path.exists(DATA_PATH):
             sys.stderr.write(f"Error: Directory {DATA_PATH} does not exist.\n")
             sys.exit(1)
         # Check if database file exists
-        self._databaseAbsPath = resource_path('baza_elementow.db')
+        self._databaseAbsPath = databasePath or resource_path('baza_elementow.db')
         if not os.path.exists(self._databaseAbsPath):
             sys.stderr.write(f"Error: Database file {self._databaseAbsPath} does not exist.\n")
             sys.exit(1)
         # Check the connection with the database
         try:
-            conn = sqlite3.connect(self._databaseAbsPath)
-            conn.close()
+            self._connect()
         except sqlite3.Error as e:
             print(f"Connection failed with error: {e}")
         #TODO: Add check if all required tables are in the database and check if they aren't empty
 
+    def _getDatabaseVersion(self):
+        # The file is replaced or modified when the database is rebuilt
+        stat = os.stat(self._databaseAbsPath)
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _connect(self):
+        if self._conn is not None:
+            self._conn.close()
+        self._conn = sqlite3.connect(self._databaseAbsPath)
+        # The connection can not be shared with the forked processes - they connect again
+        self._pid = os.getpid()
+        self._databaseVersion = self._getDatabaseVersion()
+        self._tables = None
+        self._columns = {}
+
+    def _getConnection(self):
+        if self._conn is None or self._pid != os.getpid() or self._databaseVersion != self._getDatabaseVersion():
+            self._connect()
+        return self._conn
+
+    def _getTables(self):
+        conn = self._getConnection()
+        if self._tables is None:
+            # The tables of the elements - without the internal tables of SQLite and the sources table
+            cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite\\_%' ESCAPE '\\' AND name != ?", (SOURCES_TABLE_NAME,))
+            self._tables = [row[0] for row in cursor.fetchall()]
+        return self._tables
+
+    def _getColumns(self, tableName):
+        # Names of the columns of the table - the first one is the code of the item
+        conn = self._getConnection()
+        if tableName not in self._columns:
+            cursor = conn.execute(f"PRAGMA table_info(\"{tableName}\")")
+            self._columns[tableName] = [column[1] for column in cursor.fetchall()]
+        return self._columns[tableName]
+
     def getAvailableTables(self, tableGroupName = None):
-        conn = sqlite3.connect(self._databaseAbsPath)
-        cursor = conn.cursor()
-        # Fetch all tables names from the database
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        allTables = [row[0] for row in cursor.fetchall()]
+        allTables = self._getTables()
         # If table group name is not provided, return all tables 
         if tableGroupName is None:
-            return allTables
+            return list(allTables)
         else:
             # Filter tables based on the provided table group name
             matchingTableNames = [table for table in allTables if table.startswith(tableGroupName)]
 
             if not matchingTableNames:
                 sys.stderr.write(f"Error: Invalid group name: {tableGroupName}.\n")
-                conn.close()
                 return []
 
-            conn.close()
             return matchingTableNames
     
     def getTableItemsAttributes(self, tableName):
-        conn = sqlite3.connect(self._databaseAbsPath)
-        cursor = conn.cursor()
         # Check if the table exists in the database
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (tableName,))
-        if not cursor.fetchone():
+        if tableName not in self._getTables():
             sys.stderr.write(f"Table '{tableName}' does not exist in the database.")
-            conn.close()
             return []
-        # Get the column names from the table and store them in list
-        cursor.execute(f"PRAGMA table_info(\"{tableName}\")")
-        columns =  cursor.fetchall()
 
-        conn.close()
-
-        headers = [column[1] for column in columns[1:]]
+        headers = self._getColumns(tableName)[1:]
 
         attributes = [(header.split('[')[0].strip(), header[header.find('[')+1:header.find(']')].strip()) for header in headers]
         return attributes
 
     def getTableItemsFilters(self, tableOrGroupName):
-        conn = sqlite3.connect(self._databaseAbsPath)
-        cursor = conn.cursor()
-        # First, try to treat the input as a full table name
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (tableOrGroupName,))
-        table = cursor.fetchone()
-        # If not found, then try to treat the input as a group name prefix
-        if not table:
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE ? LIMIT 1", (tableOrGroupName + '%',))
-            table = cursor.fetchone()
+        tables = self._getTables()
+        # First, try to treat the input as a full table name. If not found, then try to treat the input as a group name prefix
+        table = tableOrGroupName if tableOrGroupName in tables else next((table for table in tables if table.startswith(tableOrGroupName)), None)
         # Check if any table with given name or group name prefix was found
         if not table:
             sys.stderr.write(f"No tables found with name or group name: {tableOrGroupName}.")
-            conn.close()
             return []
-        # Get the column names from the table and store them in list
-        cursor.execute(f"PRAGMA table_info(\"{table[0]}\")")
-        columns = cursor.fetchall()
 
-        columnNames = [column[1] for column in columns[1:]]
+        columnNames = self._getColumns(table)[1:]
         # Get only the attributse from the column names 
         attributes = [re.sub(r'\[.*?\]', '', name).strip() for name in columnNames]
 
-        conn.close()
-        return {attribute:{"min": 0, "max": 0} for attribute in attributes}
+        # None means no limit - 0 is a valid limit of the items
+        return {attribute:{"min": None, "max": None} for attribute in attributes}
 
     def getSingleItem(self, tableName, code):
-        conn = sqlite3.connect(self._databaseAbsPath)
-        cursor = conn.cursor()
-
-        # Get the columns names
-        cursor.execute(f"PRAGMA table_info(\"{tableName}\")")
-        columns = cursor.fetchall()
-
-        # Set the dictionary - for every name in the column name create a list with values and units.
-        attributes = {}
-
-        for column in columns:
-            coulmnName = column[1]
-            # Check if the item contains square brackets (indicating a unit)
-            if '[' in coulmnName and ']' in coulmnName:
-                # Split the attribute and its unit
-                attr, unit = coulmnName.rsplit(' ', 1)
-                # Remove the square brackets from the unit
-                unit = unit.strip('[]')
-            else:
-                # For items without a unit, use the whole item as the attribute and an empty string for the unit
-                attr, unit = coulmnName, ''
-
-            # Add to the dictionary
-            attributes[attr] = [None, unit]
+        columns = self._getColumns(tableName)
         # Get the first column name
-        FirstColumnName = columns[0][1]
+        FirstColumnName = columns[0]
 
         # Find the row where the first column is equal to code
-        cursor.execute(f"SELECT * FROM \"{tableName}\" WHERE {FirstColumnName} = ?", (code,)) 
+        cursor = self._getConnection().execute(f"SELECT * FROM \"{tableName}\" WHERE \"{FirstColumnName}\" = ?", (code,))
         itemData = cursor.fetchone()
+        if itemData is None:
+            return None
 
-        # For every value in the row get the adequate column name and set the value in the list
-        for i, value in enumerate(itemData):
-            attribute = list(attributes.keys())[i]
-            attributes[attribute][0] = value
-        
-        conn.close()
-
-        return attributes
+        # Set the dictionary - for every name in the column name create a list with values and units.
+        return {attr: [value, unit] for (attr, unit), value in zip(map(getAttributeAndUnit, columns), itemData)}
     
-    def getFilteredResults(self, tableName, limits):
-        conn = sqlite3.connect(self._databaseAbsPath)
-        cursor = conn.cursor()
+    def getDatabaseVersion(self):
+        """
+        Returns:
+            (tuple): Version of the database file - it changes when the database is modified or rebuilt.
+        """
+        self._getConnection()
+        return self._databaseVersion
 
-        # Check if the table exists in the database
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (tableName,))
-        if not cursor.fetchone():
-            sys.stderr.write(f"Table '{tableName}' does not exist in the database.")
-            conn.close()
-            return []
+    def getTableData(self, tableName):
+        """
+        Args:
+            tableName (str): Name of the table.
+        Returns:
+            (tuple): Names of the columns and the rows of the table.
+        """
+        cursor = self._getConnection().execute(f"SELECT * FROM \"{tableName}\"")
+        return list(self._getColumns(tableName)), cursor.fetchall()
 
-        # Get the column names from the table and store them in list
-        cursor.execute(f"PRAGMA table_info(\"{tableName}\")")
-        columns =  cursor.fetchall()
+    def getTableItems(self, tableName):
+        # Get the attributes and their units from the columns names - the same as in getSingleItem
+        attributes = [getAttributeAndUnit(column) for column in self._getColumns(tableName)]
 
-        columnNames = [column[1] for column in columns[1:]]
-        # Create the base of the query
-        query = f"SELECT * FROM \"{tableName}\" WHERE"
-        # Create the filters query part
+        # Get all the items of the table at once
+        cursor = self._getConnection().execute(f"SELECT * FROM \"{tableName}\"")
+        return [{attr: [value, unit] for (attr, unit), value in zip(attributes, itemData)} for itemData in cursor.fetchall()]
+    
+    def _getFiltersQuery(self, tableName, limits):
+        columnNames = self._getColumns(tableName)[1:]
+        # Create the filters query part - the limits are bound as parameters, so that the statement can be reused
         filtersQuery = []
+        parameters = []
 
         for attribute, attributeLimits in limits.items():
                 # Get the full column name from the header of the table: attribute + units part
                 columnName = next((columnName for columnName in columnNames if columnName.startswith(attribute)), None)
-                if attributeLimits['min']:
-                    filtersQuery.append(f" \"{columnName}\" >= {attributeLimits['min']}")
-                if attributeLimits['max']:
-                    filtersQuery.append(f" \"{columnName}\" <= {attributeLimits['max']}")
+                if attributeLimits['min'] is not None:
+                    filtersQuery.append(f"\"{columnName}\" >= ?")
+                    parameters.append(attributeLimits['min'])
+                if attributeLimits['max'] is not None:
+                    filtersQuery.append(f"\"{columnName}\" <= ?")
+                    parameters.append(attributeLimits['max'])
         # Join the queries
-        query += " AND".join(filtersQuery)
+        return (" WHERE " + " AND ".join(filtersQuery) if filtersQuery else ""), parameters
+
+    def _getFilteredQuery(self, tableName, limits):
+        filtersQuery, parameters = self._getFiltersQuery(tableName, limits)
+        # Keep the order of the table - the rows found by an index come in the order of the indexed column
+        query = f"SELECT * FROM \"{tableName}\"{filtersQuery} ORDER BY rowid"
+        return query, parameters
+
+    def getQueryPlan(self, tableName, limits):
+        """
+        Args:
+            tableName (str): Name of the table.
+            limits (dict): Limits of the items - the same as for getFilteredResults.
+        Returns:
+            (list): Details of the steps of the query plan of the filtered results, e.g. the used indexes.
+        """
+        query, parameters = self._getFilteredQuery(tableName, limits)
+        cursor = self._getConnection().execute(f"EXPLAIN QUERY PLAN {query}", parameters)
+        return [row[3] for row in cursor.fetchall()]
+
+    def getFilteredResults(self, tableName, limits):
+        # Check if the table exists in the database
+        if tableName not in self._getTables():
+            sys.stderr.write(f"Table '{tableName}' does not exist in the database.")
+            return []
 
-        if query.endswith(" AND") or query.endswith("WHERE"):
-            query = query.rsplit(' ', 1)[0]
-        # Get the results in form of a dataframe
-        df = pd.read_sql_query(query,conn)
+        query, parameters = self._getFilteredQuery(tableName, limits)
+        # Get the results in form of a dataframe - pandas is imported here, because it is slow to import 
+        # and only the items selection needs it
+        import pandas as pd
+        df = pd.read_sql_query(query, self._getConnection(), params=parameters)
 
-        conn.close()
         df.columns = [column.replace("[", "\n[") for column in df.columns]
         return df
+
+    def getGroupFilteredResults(self, tableGroupName, limits, sortBy=None):
+        """
+        Get the filtered items of all the tables of the group with a single query.
+
+        Args:
+            tableGroupName (str): Name of the group of tables - see getAvailableTables.
+            limits (dict): Limits of the items - the same as for getFilteredResults.
+            sortBy (str): Attribute of the column the merged items are sorted by - by default they are
+                          in the order of the tables.
+        Returns:
+            (tuple): Dict of the items of every table of the group - the same data frames as returned by getFilteredResults,
+                     and the data frame of the items of all the tables with the name of their table in the first column.
+        """
+        import pandas as pd
+
+        tables = self.getAvailableTables(tableGroupName)
+        # Columns of all the tables - the columns missing in a table are selected as NULL
+        tablesColumns = [self._getColumns(tableName) for tableName in tables]
+        mergedColumns = list(dict.fromkeys(column for columns in tablesColumns for column in columns))
+
+        # The tables are joined into one query, so the whole group is read in a single pass
+        selectQueries = []
+        parameters = []
+        for tableIdx, (tableName, columns) in enumerate(zip(tables, tablesColumns)):
+            filtersQuery, tableParameters = self._getFiltersQuery(tableName, limits)
+            columnsQuery = ", ".join(f"\"{column}\"" if column in columns else f"NULL AS \"{column}\"" for column in mergedColumns)
+            selectQueries.append(f"SELECT {tableIdx}, rowid, {columnsQuery} FROM \"{tableName}\"{filtersQuery}")
+            parameters.extend(tableParameters)
+        rows = self._getConnection().execute(" UNION ALL ".join(selectQueries) + " ORDER BY 1, 2", parameters).fetchall() if tables else []
+
+        # Split the rows into the tables - every data frame has the columns and the types of its own table
+        tablesRows = {tableIdx: [] for tableIdx in range(len(tables))}
+        for row in rows:
+            tablesRows[row[0]].append(row[2:])
+        tablesResults = {}
+        for tableIdx, (tableName, columns) in enumerate(zip(tables, tablesColumns)):
+            columnsIndices = [mergedColumns.index(column) for column in columns]
+            df = pd.DataFrame.from_records([[row[idx] for idx in columnsIndices] for row in tablesRows[tableIdx]],
+                                           columns=columns, coerce_float=True)
+            df.columns = [column.replace("[", "\n[") for column in df.columns]
+            tablesResults[tableName] = df
+
+        mergedResults = pd.DataFrame.from_records([(tables[row[0]],) + row[2:] for row in rows],
+                                                  columns=['tabela'] + mergedColumns, coerce_float=True)
+        if sortBy is not None:
+            sortColumn = next((column for column in mergedColumns if column.startswith(sortBy)), None)
+            if sortColumn is None:
+                raise ValueError(f"No column for the attribute '{sortBy}'")
+            # The stable sort keeps the order of the tables for the equal values
+            mergedResults = mergedResults.sort_values(sortColumn, kind='stable', na_position='last', ignore_index=True)
+        mergedResults.columns = [column.replace("[", "\n[") for column in mergedResults.columns]
+        return tablesResults, mergedResults
+
+_databaseHandler = None
+
+def getDatabaseHandler():
+    """
+    Returns:
+        (DatabaseHandler): Handler of the database shared by the whole process.
+    """
+    global _databaseHandler
+    if _databaseHandler is None:
+        _databaseHandler = DatabaseHandler()
+    return _databaseHandler
@@ -0,0 +1,198 @@
+import sqlite3
+import time
+import numpy as np
+
+class ResultStore:
+    """
+    Store of the results of the sweeps and the batch calculations in the SQLite database. The rows are written in batches
+    in the WAL mode, so that many processes can write to the same file - every process opens its own store. The key outputs
+    are indexed for the range queries, whose results are returned as the numpy arrays.
+    """
+    # Key outputs indexed by default, if they are in the columns of the results
+    defaultIndexedColumns = ('dsc', 'dec', 'fmax', 'P')
+
+    def __init__(self, databasePath, tableName='results', columns=None, indexedColumns=defaultIndexedColumns, timeout=60):
+        """
+        Args:
+            databasePath (str): Path to the database file - it is created if it does not exist.
+            tableName (str): Name of the table with the results.
+            columns (dict): Names and SQLite types of the columns - {name: 'REAL' | 'INTEGER' | 'TEXT'}. If not given,
+                            they are read from the existing table or inferred from the first written rows.
+            indexedColumns (iterable): Columns indexed for the range queries.
+            timeout (float): Time of waiting for the other writers to release the database [s].
+        """
+        self._databasePath = databasePath
+        self._tableName = tableName
+        self._indexedColumns = tuple(indexedColumns)
+        self._timeout = timeout
+
+        self._conn = sqlite3.connect(databasePath, timeout=timeout, isolation_level=None)
+        # WAL lets the readers work during the writes and the writers append without rewriting the database
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+        self._columns = self._getTableColumns()
+        if not self._columns and columns:
+            self._createTable(columns)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _getTableColumns(self):
+        cursor = self._conn.execute(f"PRAGMA table_info(\"{self._tableName}\")")
+        return {column[1]: column[2] for column in cursor.fetchall()}
+
+    @staticmethod
+    def _getColumnType(value):
+        if isinstance(value, str):
+            return 'TEXT'
+        if isinstance(value, (bool, int, np.integer)):
+            return 'INTEGER'
+        return 'REAL'
+
+    def _createTable(self, columns):
+        columnsQuery = ", ".join(f"\"{name}\" {columnType}" for name, columnType in columns.items())
+        self._execute(f"CREATE TABLE IF NOT EXISTS \"{self._tableName}\" ({columnsQuery})")
+        # Another process may have created the table with the other columns in the meantime
+        self._columns = self._getTableColumns()
+        self.createIndexes([column for column in self._indexedColumns if column in self._columns])
+
+    def _execute(self, query, parameters=()):
+        # The write lock is taken up front and the busy database is retried until the timeout, so that the writes
+        # of many processes are serialized instead of failing
+        start = time.monotonic()
+        while True:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                break
+            except sqlite3.OperationalError as e:
+                if 'locked' not in str(e) and 'busy' not in str(e) or time.monotonic() - start > self._timeout:
+                    raise
+                time.sleep(0.05)
+        try:
+            if isinstance(parameters, list):
+                self._conn.executemany(query, parameters)
+            else:
+                self._conn.execute(query, parameters)
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def getColumns(self):
+        return dict(self._columns)
+
+    def createIndexes(self, columns):
+        """
+        Args:
+            columns (iterable): Columns to index - the existing indexes are kept.
+        """
+        for column in columns:
+            self._execute(f"CREATE INDEX IF NOT EXISTS \"{self._tableName}_{column}\" ON \"{self._tableName}\" (\"{column}\")")
+
+    def writeResults(self, rows, batchSize=10000):
+        """
+        Write the results - every batch is written in a single transaction.
+
+        Args:
+            rows (iterable): Dicts with the results - the keys missing in a row are written as NULL, the keys
+                             which are not the columns of the table are ignored.
+            batchSize (int): Number of the rows written at once.
+        Returns:
+            (int): Number of the written rows.
+        """
+        written = 0
+        batch = []
+        for row in rows:
+            if not self._columns:
+                self._createTable({key: self._getColumnType(value) for key, value in row.items()})
+            batch.append(row)
+            if len(batch) == batchSize:
+                written += self._writeBatch(batch)
+                batch = []
+        if batch:
+            written += self._writeBatch(batch)
+        return written
+
+    def _writeBatch(self, rows):
+        columns = list(self._columns)
+        columnsQuery = ", ".join(f"\"{column}\"" for column in columns)
+        query = f"INSERT INTO \"{self._tableName}\" ({columnsQuery}) VALUES ({', '.join('?' * len(columns))})"
+        # numpy scalars are converted to the python numbers, which are supported by sqlite3
+        convert = lambda value: value.item() if isinstance(value, np.generic) else value
+        self._execute(query, [tuple(convert(row.get(column)) for column in columns) for row in rows])
+        return len(rows)
+
+    def _getFiltersQuery(self, limits):
+        # Limits in the same form as in the items filters of the database handler - {column: {'min': value, 'max': value}}
+        filtersQuery = []
+        parameters = []
+        for column, columnLimits in (limits or {}).items():
+            if column not in self._columns:
+                raise ValueError(f"Column '{column}' does not exist in the table '{self._tableName}'")
+            for limit, operator in (('min', '>='), ('max', '<=')):
+                if columnLimits.get(limit) is not None:
+                    filtersQuery.append(f"\"{column}\" {operator} ?")
+                    parameters.append(columnLimits[limit])
+        return (" WHERE " + " AND ".join(filtersQuery) if filtersQuery else ""), parameters
+
+    def _getIndexedBy(self, limits):
+        # SQLite has no statistics of the ranges, so with several limited indexed columns it can choose the index,
+        # which selects most of the rows. The ranges are counted on the indexes instead and the most selective one is used
+        indexes = {row[0] for row in self._conn.execute("SELECT name FROM sqlite_master WHERE type='index' AND tbl_name=?", (self._tableName,))}
+        indexedLimits = {column: columnLimits for column, columnLimits in (limits or {}).items() if f"{self._tableName}_{column}" in indexes}
+        if len(indexedLimits) < 2:
+            return ""
+        counts = {}
+        for column, columnLimits in indexedLimits.items():
+            filtersQuery, parameters = self._getFiltersQuery({column: columnLimits})
+            counts[column] = self._conn.execute(f"SELECT COUNT(*) FROM \"{self._tableName}\" INDEXED BY \"{self._tableName}_{column}\"{filtersQuery}", parameters).fetchone()[0]
+        return f" INDEXED BY \"{self._tableName}_{min(counts, key=counts.get)}\""
+
+    def countResults(self, limits=None):
+        """
+        Args:
+            limits (dict): Limits of the columns - {column: {'min': value, 'max': value}}, None values are not limited.
+        Returns:
+            (int): Number of the results within the limits.
+        """
+        if not self._columns:
+            return 0
+        filtersQuery, parameters = self._getFiltersQuery(limits)
+        return self._conn.execute(f"SELECT COUNT(*) FROM \"{self._tableName}\"{self._getIndexedBy(limits)}{filtersQuery}", parameters).fetchone()[0]
+
+    def getResults(self, limits=None, columns=None, orderBy=None, maxCount=None):
+        """
+        Args:
+            limits (dict): Limits of the columns - {column: {'min': value, 'max': value}}, None values are not limited.
+            columns (iterable): Returned columns - by default all of them.
+            orderBy (str): Column the results are sorted by.
+            maxCount (int): Largest number of the returned results.
+        Returns:
+            (dict): Arrays of the columns - float for the numeric columns with NaN for NULL, object for the TEXT ones.
+        """
+        columns = list(columns or self._columns)
+        for column in columns + ([orderBy] if orderBy else []):
+            if column not in self._columns:
+                raise ValueError(f"Column '{column}' does not exist in the table '{self._tableName}'")
+
+        filtersQuery, parameters = self._getFiltersQuery(limits)
+        columnsQuery = ", ".join(f"\"{column}\"" for column in columns)
+        query = f"SELECT {columnsQuery} FROM \"{self._tableName}\"{self._getIndexedBy(limits)}{filtersQuery}"
+        if orderBy:
+            query += f" ORDER BY \"{orderBy}\""
+        if maxCount is not None:
+            query += " LIMIT ?"
+            parameters.append(maxCount)
+        rows = self._conn.execute(query, parameters).fetchall()
+
+        # The rows are transposed to the columns without the intermediate data frame
+        values = list(zip(*rows)) if rows else [()] * len(columns)
+        return {column: np.array(columnValues, dtype=object if self._columns[column] == 'TEXT' else float)
+                for column, columnValues in zip(columns, values)}
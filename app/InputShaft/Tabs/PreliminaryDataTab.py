@@ -45,6 +45,7 @@ class PreliminaryDataTab(ITrackedTab):
         component_layout.addWidget(create_data_input_row(self._inputs['LA'], 'L<sub>A</sub>', 'Współrzędna podpory przesuwnej', decimal_precision=2))
         component_layout.addWidget(create_data_input_row(self._inputs['LB'], 'L<sub>B</sub>', 'Współrzędna podpory stałej', decimal_precision=2))
         component_layout.addWidget(create_data_input_row(self._inputs['L1'], 'L<sub>1</sub>', 'Współrzędna koła obiegowego nr 1', decimal_precision=2))
+        component_layout.addWidget(create_data_input_row(self._inputs['αe'], 'α<sub>e</sub>', 'Kąt przesunięcia pomiędzy kolejnymi mimośrodami', decimal_precision=1))
 
         self.main_layout.addLayout(component_layout)
     
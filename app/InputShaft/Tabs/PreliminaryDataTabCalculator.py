@@ -1,3 +1,32 @@
+def calculate_input_limits(input_name, component_data, inputs_values):
+    """
+    Calculate the limits of the shaft coordinate which name was provided. The limits of 'LA', 'LB' and 'L1'
+    depend on the values of the preceding coordinates - 'L', 'LA', 'LB'.
+
+    Args:
+        input_name (str): name of the input for which the limits are calculated
+        component_data (dict): Component data with the values of 'x', 'B' and 'n'.
+        inputs_values (dict): Values of the preceding coordinates.
+    Returns:
+        (tuple): Minimal and maximal value of the input.
+    """
+    x = component_data['x'][0]
+    B = component_data['B'][0]
+    if input_name == 'L':
+        min_value = x + 2 * B
+        max_value = 1000
+    elif input_name == 'LA':
+        min_value = 0
+        max_value = inputs_values['L']
+    elif input_name == 'LB':
+        min_value = inputs_values['LA'] + 2 * B + x
+        max_value = inputs_values['L']
+    elif input_name == 'L1':
+        min_value =  inputs_values['LA'] + 0.5 * B
+        max_value = inputs_values['LB'] - 0.5 * B - (x + B) * (component_data['n'][0] - 1)
+
+    return (round(min_value, 2), round(max_value, 2))
+
 class PreliminaryDataTabCalculator:
     def init_data(self, component_data, inputs, outputs, validated_inputs):
             self._component_data = component_data
@@ -65,21 +94,9 @@ class PreliminaryDataTabCalculator:
         Args:
             input_name (str): name of the input for which the limits are set
         """
-
-        if input_name == 'L':
-            min_value = self._component_data['x'][0] + 2 * self._component_data['B'][0]
-            max_value = 1000
-        elif input_name == 'LA':
-            min_value = 0
-            max_value = self.validated_inputs_values['L']
-        elif input_name == 'LB':
-            min_value = self.validated_inputs_values['LA'] + 2 * self._component_data['B'][0] + self._component_data['x'][0]
-            max_value = self.validated_inputs_values['L']
-        elif input_name == 'L1':
-            min_value =  self.validated_inputs_values['LA'] + 0.5 * self._component_data['B'][0]
-            max_value = self.validated_inputs_values['LB'] - 0.5 * self._component_data['B'][0] - (self._component_data['x'][0] + self._component_data['B'][0]) * (self._component_data['n'][0] - 1)
+        min_value, max_value = calculate_input_limits(input_name, self._component_data, self.validated_inputs_values)
         
-        self.validated_inputs_limits[input_name] = (round(min_value, 2), round(max_value, 2))
+        self.validated_inputs_limits[input_name] = (min_value, max_value)
         self._inputs[input_name][0].setPlaceholderText(f"{min_value:.2f}-{max_value:.2f}")
     
     def setup_inputs_validation(self):
@@ -65,7 +65,7 @@ class PreliminaryDataTabController():
         """
         self._component_data = component_data       
 
-        inputs_keys = [['L'], ['LA'], ['LB'], ['L1'], ['Lc'], ['xz'], ['qdop'], ['tetadop'], ['fdop']]
+        inputs_keys = [['L'], ['LA'], ['LB'], ['L1'], ['Lc'], ['αe'], ['xz'], ['qdop'], ['tetadop'], ['fdop']]
         outputs_keys = [['B'], ['x'], ['e']]
         items = [['Materiał']]
 
@@ -18,6 +18,8 @@ class ResultsTab(ITrackedTab):
         content_layout.addWidget(create_header('Ogólne:', bold=True))
         content_layout.addWidget(create_data_display_row(self._outputs['nwe'], 'n<sub>we</sub>', 'Wejściowa prędkość obrotowa', decimal_precision=2))
         content_layout.addWidget(create_data_display_row(self._outputs['Mwe'], 'M<sub>we</sub>', 'Wejściowy moment obrotowy', decimal_precision=2))
+        content_layout.addWidget(create_data_display_row(self._outputs['nkr'], 'n<sub>kr</sub>', 'Pierwsza prędkość krytyczna wału', decimal_precision=2))
+        content_layout.addWidget(create_data_display_row(self._outputs['xkr'], 'n<sub>kr</sub>/n<sub>we</sub>', 'Zapas do prędkości krytycznej', decimal_precision=2))
         content_layout.addWidget(create_header('Wymiary wału:', bold=True))
         content_layout.addWidget(create_data_display_row(self._outputs['L'], 'L', 'Długość wału czynnego', decimal_precision=2))
         content_layout.addWidget(create_data_display_row(self._outputs['LA'], 'L<sub>A</sub>', 'Współrzędna podpory przesuwnej', decimal_precision=2))
@@ -26,6 +28,7 @@ class ResultsTab(ITrackedTab):
         for idx, input in enumerate(self._outputs['Lc'].values()):
             content_layout.addWidget(create_data_display_row(input, f'L<sub>{idx+2}</sub>', f'Współrzędna koła obiegowego nr {idx+2}', decimal_precision=2))
         content_layout.addWidget(create_data_display_row(self._outputs['e'], 'e', 'Mimośród', decimal_precision=2))
+        content_layout.addWidget(create_data_display_row(self._outputs['αe'], 'α<sub>e</sub>', 'Kąt przesunięcia pomiędzy kolejnymi mimośrodami', decimal_precision=1))
         content_layout.addWidget(create_header('Siły i reakcje:', bold=True))
         for idx, input in enumerate(self._outputs['Fx'].values()):
             content_layout.addWidget(create_data_display_row(input, f'R<sub>{idx+1}</sub>', f'Siła wywierana ze strony koła obiegowego nr {idx+1}', decimal_precision=2))
@@ -19,7 +19,7 @@ class ResultsTabController:
         """
         self._component_data = component_data
 
-        outputs_keys = [['nwe'], ['Mwe'], ['L'], ['LA'], ['LB'], ['L1'], ['Lc'], ['e'],
+        outputs_keys = [['nwe'], ['Mwe'], ['nkr'], ['xkr'], ['L'], ['LA'], ['LB'], ['L1'], ['Lc'], ['e'], ['αe'],
                         ['Fx'], ['Ra'], ['Rb'], ['P'],
                         ['Bearings', 'support_A', 'P'],
                         ['Bearings', 'support_B', 'P'],
@@ -20,6 +20,10 @@ from InputShaft.Tabs.ResultsTabController import ResultsTabController
 from ShaftDesigner.controller.ShaftDesignerController import ShaftDesignerController
 from ShaftDesigner.view.ShaftDesigner import ShaftDesigner
 
+from DbHandler.controller.DBController import ViewSelectItemController
+from DbHandler.model.DatabaseHandler import getDatabaseHandler
+from DbHandler.view.Window import Window
+
 class InputShaftController:
     """
     Controller for the InputShaft in the application.
@@ -118,20 +122,47 @@ class InputShaftController:
     def _open_shaft_designer_window(self):
         self._shaft_designer.show()
 
+    def _open_items_selection(self, window_title, tables_group_name, limits):
+        """
+        Open the window for selection of an item from the database.
+
+        Args:
+            window_title (str): Title of the window.
+            tables_group_name (str): Name of the group of tables to select the item from.
+            limits (dict): Limits of the tables items.
+        Returns:
+            (None or dict): selected item data.
+        """
+        # Get acces to the database
+        db_handler = getDatabaseHandler()
+        # Create a subwindow that views GUI for the DatabaseHandler
+        subwindow = Window()
+        subwindow.setWindowTitle(window_title)
+        # Setup the controller for the subwindow
+        view_select_items_ctrl = ViewSelectItemController(db_handler, subwindow, tables_group_name, limits)
+        result = view_select_items_ctrl.startup()
+        if result:
+            return view_select_items_ctrl.selectedItemAttributes
+        else:
+            return None
+
     def _on_select_materials(self):
-        result = self._calculator.open_shaft_material_selection()
+        tables_group_name, limits = self._calculator.get_shaft_material_selection_attributes()
+        result = self._open_items_selection("Dobór materiału", tables_group_name, limits)
         if result:
             self.tab_controllers[0].on_materials_selected(result)
 
     def _on_select_bearing(self, bearing_section_id, data):
         self._calculator.update_data(data)
-        result = self._calculator.open_bearing_selection(bearing_section_id)
+        tables_group_name, limits = self._calculator.get_bearing_selection_attributes(bearing_section_id)
+        result = self._open_items_selection("Dobór łożyska", tables_group_name, limits)
         if result:
             self.tab_controllers[1].on_bearing_selected(bearing_section_id, result)
 
     def _on_select_rolling_element(self, bearing_section_id, data):
         self._calculator.update_data(data)
-        result = self._calculator.open_rolling_element_selection(bearing_section_id)
+        tables_group_name, limits = self._calculator.get_rolling_element_selection_attributes(bearing_section_id)
+        result = self._open_items_selection("Dobór elementu tocznego", tables_group_name, limits)
         if result:
             self.tab_controllers[2].on_rolling_element_selected(bearing_section_id, result)
 
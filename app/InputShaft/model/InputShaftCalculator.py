@@ -1,9 +1,8 @@
 import math
 import copy
+import numpy as np
 
-from DbHandler.controller.DBController import ViewSelectItemController
-from DbHandler.model.DatabaseHandler import DatabaseHandler
-from DbHandler.view.Window import Window
+from DbHandler.model.DatabaseHandler import getDatabaseHandler
 
 from ..common.common_functions import fetch_data_subset
 
@@ -27,12 +26,14 @@ class InputShaftCalculator():
             'n': [2, ''],                   # Liczba kół obiegowych
             'L1': [None, 'mm'],             # Wsp. pierwszego koła obiegowego
             'Lc': {},                       # Wsp. kolejnych kół obiegowych - domyślnie brak
+            'αe': [180, '°'],               # Kąt przesunięcia pomiędzy kolejnymi mimośrodami
             # Dobrany materiał i parametry
             'Materiał' : None,              # Materiał wału
             'xz': [None, ''],               # Współczynnik bezpieczeństwa
             'qdop': [None, 'rad/m'],        # Dopuszczalny jednostkowy kąt skręcenia wału
             'tetadop': [None, 'rad'],       # Dopuszczalny kąt ugięcia wału
             'fdop': [None, 'mm'],           # Dopuszczalna strzałka ugięcia wału
+            'Metoda ugięć': ['Wał zastępczy', ''], # Metoda obliczania ugięć wału - wał zastępczy lub macierze przeniesienia
             # Siły pochodzące od kół obiegowych
             'Fwzx': [4444.44, 'N'],         # Wypadkowa siła międzyzębna działająca w osi x
             'Fwzy': [2799.16, 'N'],         # Wypadkowa siła międzyzębn działająca w osi y
@@ -42,9 +43,13 @@ class InputShaftCalculator():
             'Rb':[None, 'N'],               # Reakcja w podporze ruchomej
             'F': [None, 'N'],               # Siła pochodząca od koła obiegowego
             'Fx': {},                       # Siła na kole obiegowym 1
+            'Fp': {},                       # Składowe sił na kołach obiegowych w płaszczyznach x i y
             # Obliczone wymiary wału
             'dsc': [None, 'mm'],            # Średnica wału wejściowego - obliczona
             'dec': [None, 'mm'],            # Średnica mimośrodu - obliczona
+            # Prędkość krytyczna
+            'nkr': [None, 'obr/min'],       # Pierwsza prędkość krytyczna wału
+            'xkr': [None, ''],              # Stosunek prędkości krytycznej do prędkości wejściowej
             # Straty mocy w mechanizmie
             'P': [None, 'W'],
             # Łożyska
@@ -138,91 +143,93 @@ class InputShaftCalculator():
         
         self.data['P'][0] = absolute_power_loss
 
-    def open_shaft_material_selection(self):
+    @staticmethod
+    def get_eccentrics_directions(n, angle):
         """
-        Open the window for selection of the shaft material
+        Args:
+            n (int): Number of the eccentrics.
+            angle (float or np.ndarray): Angle between consecutive eccentrics [°] - an array gives the directions for every angle.
+        Returns:
+            (tuple): Components of the unit forces on the eccentrics in the planes x and y, of shape angle.shape + (n,).
+                     The plane x is the plane of the force on the first eccentric.
+        """
+        angles = np.radians(np.asarray(angle, dtype=float))[..., np.newaxis] * np.arange(n)
+        # Round off the components of the multiples of 90 degrees, so that e.g. the default 180 degrees give the forces in the plane x only
+        return np.round(np.cos(angles), 12), np.round(np.sin(angles), 12)
+
+    def get_shaft_material_tables_group_name(self):
+        return 'wał czynny-materiały'
+
+    def get_bearing_tables_group_name(self, bearing_section_id):
+        """
+        Args:
+            bearing_section_id (str): Id of section that specifies the bearing location.
+
+        Returns:
+            (str): Name of the group of tables to select the bearing from.
+        """
+        if bearing_section_id == 'support_A' or  bearing_section_id == 'support_B':
+            return 'wał czynny-łożyska-podporowe'
+        elif bearing_section_id == 'eccentrics':
+            return 'wał czynny-łożyska-centralne'
+
+    def get_rolling_element_tables_group_name(self, bearing_section_id):
+        """
+        Args:
+            bearing_section_id (str): Id of section that specifies the bearing location - its bearing has to be selected.
 
         Returns:
-            (None or dict): selected item data.
+            (str): Name of the group of tables to select the rolling element from.
         """
-        db_handler = DatabaseHandler()
-        subwindow = Window()
-        subwindow.setWindowTitle("Dobór materiału")
-        tables_group_name = 'wał czynny-materiały'
-        available_tables = db_handler.getAvailableTables(tables_group_name)
-        limits = db_handler.getTableItemsFilters(tables_group_name)
-        view_select_items_ctrl = ViewSelectItemController(db_handler, subwindow, available_tables, limits)
-        result = view_select_items_ctrl.startup()
-        if result:
-            return view_select_items_ctrl.selectedItemAttributes
-        else:
-            return None
-
-    def open_bearing_selection(self, bearing_section_id):
+        return f"wał czynny-elementy toczne-{self.data['Bearings'][bearing_section_id]['data']['elementy toczne'][0]}"
+
+    def get_shaft_material_selection_attributes(self):
+        """
+        Get the attributes of the shaft material selection.
+
+        Returns:
+            (tuple): Name of the group of tables to select the material from and the limits of their items.
         """
-        Open the window for bearing selection the.
+        tables_group_name = self.get_shaft_material_tables_group_name()
+        limits = getDatabaseHandler().getTableItemsFilters(tables_group_name)
+        return tables_group_name, limits
+
+    def get_bearing_selection_attributes(self, bearing_section_id):
+        """
+        Get the attributes of the bearing selection.
 
         Args:
             bearing_section_id (str): Id of section that specifies the bearing location.
 
         Returns:
-            (None or dict): selected item data.
+            (tuple): Name of the group of tables to select the bearing from and the limits of their items.
         """
         # Specify the name of the tables to open
-        if bearing_section_id == 'support_A' or  bearing_section_id == 'support_B':
-            tables_group_name = 'wał czynny-łożyska-podporowe'
-        elif bearing_section_id == 'eccentrics':
-            tables_group_name = 'wał czynny-łożyska-centralne'
-
-        # Get acces to the database
-        db_handler = DatabaseHandler()
-        # Create a subwindow that views GUI for the DatabaseHandler
-        subwindow = Window()
-        subwindow.setWindowTitle("Dobór łożyska")
-        # Get available tables
-        available_tables = db_handler.getAvailableTables(tables_group_name)
+        tables_group_name = self.get_bearing_tables_group_name(bearing_section_id)
+
         # Specify the limits for the group of tables
-        limits = db_handler.getTableItemsFilters(tables_group_name)
+        limits = getDatabaseHandler().getTableItemsFilters(tables_group_name)
         limits['Dw']['min'] = self.data['Bearings'][bearing_section_id]['dip'][0]
         limits['Dw']['max'] = self.data['Bearings'][bearing_section_id]['dip'][0] + 10
         limits['C']['min'] = self.data['Bearings'][bearing_section_id]['C'][0]
-        # Setup the controller for the subwindow
-        view_select_items_ctrl = ViewSelectItemController(db_handler, subwindow, available_tables, limits)
-        result = view_select_items_ctrl.startup()
-        if result:
-            return view_select_items_ctrl.selectedItemAttributes
-        else:
-            return None
-
-    def open_rolling_element_selection(self, bearing_section_id):
+        return tables_group_name, limits
+
+    def get_rolling_element_selection_attributes(self, bearing_section_id):
         """
-        Open the window for rolling element selection.
+        Get the attributes of the rolling element selection.
 
         Args:
             bearing_section_id (str): Id of section that specifies the bearing location for which the rollin 
                                       elements are being selected.
         Returns:
-            (None or dict): selected item data.
+            (tuple): Name of the group of tables to select the rolling element from and the limits of their items.
         """
-        # Get acces to the database
-        db_handler = DatabaseHandler()
-        # Create a subwindow that views GUI for the DatabaseHandler
-        subwindow = Window()
-        subwindow.setWindowTitle("Dobór elementu tocznego")
-        # Get available tables
-        tables_group_name = f"wał czynny-elementy toczne-{self.data['Bearings'][bearing_section_id]['data']['elementy toczne'][0]}"
-        available_tables = db_handler.getAvailableTables(tables_group_name)
+        tables_group_name = self.get_rolling_element_tables_group_name(bearing_section_id)
         # Specify the limits for the group of tables
-        limits = db_handler.getTableItemsFilters(tables_group_name)
+        limits = getDatabaseHandler().getTableItemsFilters(tables_group_name)
         limits['D']['min'] = math.floor(self.data['Bearings'][bearing_section_id]['drc'][0]) - 1
         limits['D']['max'] = math.ceil(self.data['Bearings'][bearing_section_id]['drc'][0]) + 1
-        # Setup the controller for the subwindow
-        view_select_items_ctrl = ViewSelectItemController(db_handler, subwindow, available_tables, limits)
-        result = view_select_items_ctrl.startup()
-        if result:
-            return view_select_items_ctrl.selectedItemAttributes
-        else:
-            return None
+        return tables_group_name, limits
         
     def get_bearing_attributes(self, bearing_section_id, bearing_data):
         """
@@ -271,9 +278,13 @@ class InputShaftCalculator():
 
             self.data['Fx'] = {}
 
+        directions = self.get_eccentrics_directions(self.data['n'][0], self.data['αe'][0])
+        self.data['Fp'] = {}
         for idx in range(self.data['n'][0]):
+            components = [float(direction[idx] * self.data['F'][0]) for direction in directions]
             self.data['Fx'][f'F{idx+1}'] = copy.deepcopy(self.data['F'])
-            self.data['Fx'][f'F{idx+1}'][0] = self.data['F'][0] * (-1)**idx
+            self.data['Fx'][f'F{idx+1}'][0] = components[0]
+            self.data['Fp'][f'F{idx+1}'] = [components, 'N']
 
     def set_data(self, data):
         """
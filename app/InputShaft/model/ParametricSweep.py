@@ -0,0 +1,175 @@
+import copy
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice, product
+
+from InputShaft.model.InputShaftCalculator import InputShaftCalculator
+from InputShaft.model.SweepCheckpoint import SweepCheckpoint, get_inputs_hash
+from InputShaft.Tabs.PreliminaryDataTabCalculator import calculate_input_limits
+from ShaftDesigner.model.FunctionsCalculator import FunctionsCalculator
+
+def _evaluate_chunk(base_data, combinations):
+    """
+    Evaluate the InputShaftCalculator -> FunctionsCalculator chain for the chunk of the combinations.
+    It runs in the worker process, so the calculators are created once for the whole chunk.
+
+    Args:
+        base_data (dict): Component data the combinations are applied to.
+        combinations (list): Dicts with the values of the swept parameters.
+    Returns:
+        (list): Results of the combinations - the swept parameters and the calculated values.
+    """
+    input_shaft_calculator = InputShaftCalculator()
+    input_shaft_calculator.set_data(copy.deepcopy(base_data))
+    data = input_shaft_calculator.get_data()
+    functions_calculator = FunctionsCalculator(initial_functions_cache_size=0)
+
+    results = []
+    for combination in combinations:
+        ParametricSweep.set_combination_data(input_shaft_calculator, combination)
+        functions_calculator.calculate_initial_functions_and_attributes(data)
+        result = dict(combination)
+        result.update({key: float(data[key][0]) for key in ParametricSweep.results_keys})
+        results.append(result)
+    return results
+
+class ParametricSweep():
+    """
+    Evaluate the shaft for every combination of the swept coordinates. The infeasible combinations are pruned
+    up front with the limits of the preliminary data tab and the remaining ones are evaluated in chunks by
+    the pool of processes. The results are yielded as the chunks complete, so they can be stored or filtered
+    without keeping the whole sweep in memory.
+    """
+    # Parameters that can be swept. The coordinates are in the order of their validation - the limits of every
+    # coordinate depend on the preceding ones
+    sweep_keys = ('e', 'B', 'x', 'L', 'LA', 'LB', 'L1')
+    coordinates_keys = ('L', 'LA', 'LB', 'L1')
+    # Calculated values stored in the results
+    results_keys = ('Ra', 'Rb', 'F', 'dsc', 'dec')
+
+    def __init__(self, base_data, chunk_size=256, max_workers=None):
+        """
+        Args:
+            base_data (dict): Component data of InputShaftCalculator with the selected material - the values
+                              of the parameters which are not swept are taken from it.
+            chunk_size (int): Number of the combinations evaluated by a worker at once.
+            max_workers (int): Number of the worker processes - by default the number of processors.
+        """
+        self._base_data = base_data
+        self._chunk_size = chunk_size
+        self._max_workers = max_workers or os.cpu_count()
+
+    @staticmethod
+    def set_combination_data(input_shaft_calculator, combination):
+        """
+        Set the values of the swept parameters in the data of the calculator.
+
+        Args:
+            input_shaft_calculator (InputShaftCalculator): Calculator with the component data.
+            combination (dict): Values of the swept parameters.
+        """
+        data = input_shaft_calculator.get_data()
+        for key, value in combination.items():
+            data[key][0] = value
+        input_shaft_calculator.set_initial_data()
+        # Positions of the following eccentrics - the same as set by the preliminary data tab
+        for idx, position in enumerate(data['Lc'].values()):
+            position[0] = data['L1'][0] + (idx + 1) * (data['x'][0] + data['B'][0])
+
+    def _get_parameters_values(self, ranges):
+        for key in ranges:
+            if key not in self.sweep_keys:
+                raise ValueError(f'Parameter {key} can not be swept')
+        return {key: list(ranges[key]) if key in ranges else [self._base_data[key][0]] for key in self.sweep_keys}
+
+    def _get_feasible_coordinates(self, component_data, values, coordinates=None, level=0):
+        # Combinations of the coordinates within the limits - the values of a coordinate are only iterated for
+        # the feasible values of the preceding ones, so the infeasible branches are skipped as a whole
+        coordinates = coordinates or {}
+        if level == len(self.coordinates_keys):
+            yield dict(coordinates)
+            return
+        key = self.coordinates_keys[level]
+        min_value, max_value = calculate_input_limits(key, component_data, coordinates)
+        for value in values[key]:
+            if min_value <= value <= max_value:
+                coordinates[key] = value
+                yield from self._get_feasible_coordinates(component_data, values, coordinates, level + 1)
+        coordinates.pop(key, None)
+
+    def get_feasible_combinations(self, ranges):
+        """
+        Args:
+            ranges (dict): Values of the swept parameters - {key: iterable}, with the keys from sweep_keys.
+        Returns:
+            (generator): Feasible combinations of the parameters.
+        """
+        values = self._get_parameters_values(ranges)
+        for e, B, x in product(values['e'], values['B'], values['x']):
+            component_data = {'e': [e, 'mm'], 'B': [B, 'mm'], 'x': [x, 'mm'], 'n': self._base_data['n']}
+            for coordinates in self._get_feasible_coordinates(component_data, values):
+                yield {'e': e, 'B': B, 'x': x, **coordinates}
+
+    def count_feasible_combinations(self, ranges):
+        """
+        Args:
+            ranges (dict): Values of the swept parameters - {key: iterable}, with the keys from sweep_keys.
+        Returns:
+            (int): Number of the feasible combinations.
+        """
+        return sum(1 for _ in self.get_feasible_combinations(ranges))
+
+    def _get_inputs(self, ranges):
+        # Inputs the results depend on - the chunks are numbered in the order of the combinations, so the chunk size
+        # is the input as well
+        return {'sweep': type(self).__name__, 'base_data': self._base_data, 'ranges': self._get_parameters_values(ranges),
+                'chunk_size': self._chunk_size}
+
+    def _create_executor(self):
+        return ProcessPoolExecutor(max_workers=self._max_workers)
+
+    def _submit_chunk(self, executor, chunk):
+        return executor.submit(_evaluate_chunk, self._base_data, chunk)
+
+    def run(self, ranges, checkpoint_path=None):
+        """
+        Evaluate all the feasible combinations of the swept parameters.
+
+        Args:
+            ranges (dict): Values of the swept parameters - {key: iterable}, with the keys from sweep_keys.
+            checkpoint_path (str): Path to the checkpoint file of the sweep - the results of the completed chunks
+                                   are saved in it and the sweep resumed with the same inputs skips these chunks.
+        Returns:
+            (generator): Lists of the results of the chunks in the order of their completion - with the checkpoint
+                         the results of the chunks completed before come first.
+        """
+        combinations = self.get_feasible_combinations(ranges)
+        chunks = enumerate(iter(lambda: list(islice(combinations, self._chunk_size)), []))
+
+        checkpoint = None
+        if checkpoint_path is not None:
+            checkpoint = SweepCheckpoint(checkpoint_path, get_inputs_hash(self._get_inputs(ranges)))
+            completed_chunks = checkpoint.get_completed_chunks()
+            yield from checkpoint.get_results()
+            chunks = ((chunk_id, chunk) for chunk_id, chunk in chunks if chunk_id not in completed_chunks)
+
+        try:
+            with self._create_executor() as executor:
+                # Keep a limited number of the chunks in progress, so that the combinations are generated on demand
+                pending = {}
+                for chunk_id, chunk in islice(chunks, 2 * self._max_workers):
+                    pending[self._submit_chunk(executor, chunk)] = chunk_id
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        chunk_id = pending.pop(future)
+                        next_chunk = next(chunks, None)
+                        if next_chunk is not None:
+                            pending[self._submit_chunk(executor, next_chunk[1])] = next_chunk[0]
+                        results = future.result()
+                        if checkpoint is not None:
+                            checkpoint.save_chunk(chunk_id, results)
+                        yield results
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
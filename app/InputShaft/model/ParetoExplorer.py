@@ -0,0 +1,255 @@
+import copy
+import csv
+import json
+import math
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from DbHandler.model.DatabaseHandler import getDatabaseHandler
+from InputShaft.model.InputShaftCalculator import InputShaftCalculator
+from InputShaft.model.ParametricSweep import ParametricSweep
+from InputShaft.Tabs.BearingsTabCalculator import BearingsTabCalculator
+from InputShaft.Tabs.PowerLossTabCalculator import PowerLossTabCalculator
+from ShaftDesigner.model.FunctionsCalculator import FunctionsCalculator
+from ShaftDesigner.model.ShaftCalculator import ShaftCalculator
+from ShaftDesigner.model.ShaftOptimizer import ShaftOptimizer
+
+# Groups of the tables with the bearings of every bearing section
+BEARINGS_TABLES_GROUPS = {'support_A': 'wał czynny-łożyska-podporowe',
+                          'support_B': 'wał czynny-łożyska-podporowe',
+                          'eccentrics': 'wał czynny-łożyska-centralne'}
+
+# Catalog shared by the candidates evaluated in the worker process - set once by the initializer of the process
+_catalog = None
+
+def load_catalog(db_handler=None):
+    """
+    Read the bearings and the rolling elements from the database at once.
+
+    Args:
+        db_handler (DatabaseHandler): Handler of the database - the shared one by default.
+    Returns:
+        (dict): Items of the bearings of every tables group and of the rolling elements of every type
+                with their numeric attributes as arrays.
+    """
+    db_handler = db_handler or getDatabaseHandler()
+    catalog = {'bearings': {}, 'rolling_elements': {}}
+    for tables_group_name in set(BEARINGS_TABLES_GROUPS.values()):
+        items = [item for table in db_handler.getAvailableTables(tables_group_name) for item in db_handler.getTableItems(table)]
+        catalog['bearings'][tables_group_name] = {'items': items,
+                                                  'elementy toczne': np.array([item['elementy toczne'][0] for item in items]),
+                                                  **{key: np.array([item[key][0] for item in items], dtype=float) for key in ('Dw', 'Dz', 'C')}}
+    for rolling_element_type in {item['elementy toczne'][0] for group in catalog['bearings'].values() for item in group['items']}:
+        tables_group_name = f'wał czynny-elementy toczne-{rolling_element_type}'
+        items = [item for table in db_handler.getAvailableTables(tables_group_name) for item in db_handler.getTableItems(table)]
+        catalog['rolling_elements'][rolling_element_type] = {'items': items, 'D': np.array([item['D'][0] for item in items], dtype=float)}
+    return catalog
+
+def _set_catalog(catalog):
+    global _catalog
+    _catalog = catalog
+
+def get_non_dominated(objectives):
+    """
+    Find the non-dominated points with the sort-based skyline - after sorting the points lexicographically
+    a point can only be dominated by the points before it, so it is compared with the already kept points only.
+
+    Args:
+        objectives (np.ndarray): Minimized objectives of the points - shape (points, objectives).
+    Returns:
+        (np.ndarray): Indices of the non-dominated points. Of the equal points only the first one is kept.
+    """
+    order = np.lexsort(objectives.T[::-1])
+    kept = []
+    for idx in order:
+        if kept and np.any(np.all(objectives[kept] <= objectives[idx], axis=1)):
+            continue
+        kept.append(idx)
+    return np.array(kept, dtype=int)
+
+def _select_bearing(bearing_section_id, data):
+    """
+    Select the bearing and its rolling elements with the minimal power loss from the catalog. The bearings have
+    the same limits as in the bearing selection window - the inner diameter from dip to dip + 10 and the required
+    load capacity and the rolling elements from floor(drc) - 1 to ceil(drc) + 1.
+
+    Returns:
+        (None or tuple): Power loss [W], the bearing and the rolling elements.
+    """
+    bearings = _catalog['bearings'][BEARINGS_TABLES_GROUPS[bearing_section_id]]
+    attributes = data['Bearings'][bearing_section_id]
+    dip = attributes['dip'][0]
+
+    bearings_calculator = BearingsTabCalculator()
+    bearings_calculator.init_data(data, None, None)
+    C = bearings_calculator.calculate_bearing_load_capacity(bearing_section_id, data) if attributes['Lh'][0] is not None else 0
+    feasible = (dip <= bearings['Dw']) & (bearings['Dw'] <= dip + 10) & (bearings['C'] >= C)
+
+    best = None
+    for rolling_element_type, rolling_elements in _catalog['rolling_elements'].items():
+        indices = np.flatnonzero(feasible & (bearings['elementy toczne'] == rolling_element_type))
+        if not len(indices):
+            continue
+        # Power loss of every pair of the bearing and the rolling element of the type - shape (bearings, rolling elements)
+        Dw = bearings['Dw'][indices, np.newaxis]
+        Dz = bearings['Dz'][indices, np.newaxis]
+        D = rolling_elements['D'][np.newaxis, :]
+        component_data = {key: data[key] for key in ('w0', 'e', 'rw1')}
+        component_data['Bearings'] = {bearing_section_id: {'F': attributes['F'], 'data': {'Dw': [Dw], 'Dz': [Dz]}}}
+        power_loss_calculator = PowerLossTabCalculator()
+        power_loss_calculator.init_data(component_data, None, None)
+        P = power_loss_calculator.calculate_bearing_power_loss(bearing_section_id, {'Bearings': {bearing_section_id: {'f': attributes['f'], 'rolling_elements': {'D': [D]}}}})
+
+        drc = 0.25 * (Dz - Dw)
+        P = np.where((np.floor(drc) - 1 <= D) & (D <= np.ceil(drc) + 1), P, np.inf)
+        bearing_idx, rolling_element_idx = np.unravel_index(np.argmin(P), P.shape)
+        if np.isfinite(P[bearing_idx, rolling_element_idx]) and (best is None or P[bearing_idx, rolling_element_idx] < best[0]):
+            best = (float(P[bearing_idx, rolling_element_idx]), bearings['items'][indices[bearing_idx]], rolling_elements['items'][rolling_element_idx])
+    return best
+
+def _evaluate_designs_chunk(base_data, combinations, max_steps_options, diameter_increment):
+    """
+    Evaluate the designs of the chunk of the coordinates combinations - it runs in the worker process.
+
+    Returns:
+        (list): Non-dominated designs of the chunk.
+    """
+    input_shaft_calculator = InputShaftCalculator()
+    input_shaft_calculator.set_data(copy.deepcopy(base_data))
+    data = input_shaft_calculator.get_data()
+    functions_calculator = FunctionsCalculator()
+    shaft_optimizer = ShaftOptimizer(diameter_increment=diameter_increment)
+    density = data['Materiał']['g'][0]
+
+    designs = []
+    for combination in combinations:
+        ParametricSweep.set_combination_data(input_shaft_calculator, combination)
+        functions_calculator.calculate_initial_functions_and_attributes(data)
+
+        # Eccentrics with the minimal length and the diameter dec rounded up
+        shaft_calculator = ShaftCalculator()
+        shaft_calculator.set_data(functions_calculator.get_shaft_initial_attributes())
+        eccentric = {'l': data['B'][0], 'd': math.ceil(data['dec'][0] / diameter_increment) * diameter_increment}
+        eccentrics = {idx: dict(eccentric) for idx in range(data['n'][0])}
+
+        layouts = []
+        for max_steps in max_steps_options:
+            shaft_calculator.shaft_sections = {'Mimośrody': eccentrics}
+            shaft_calculator.calculate_shaft_sections()
+            functions_calculator.calculate_remaining_functions(shaft_calculator.get_shaft_attributes())
+            sections = shaft_optimizer.optimize_shaft(shaft_calculator, functions_calculator, max_steps)
+            if sections in layouts:
+                continue
+            layouts.append(sections)
+
+            shaft_calculator.shaft_sections = {'Mimośrody': eccentrics, **sections}
+            shaft_calculator.calculate_shaft_sections()
+            shaft_steps = shaft_calculator.get_shaft_attributes()
+            functions_calculator.calculate_remaining_functions(shaft_steps)
+            if functions_calculator.get_deflection_arrow_extremum() is None:
+                continue
+            shaft_calculator.save_data(data)
+
+            selected_bearings = {bearing_section_id: _select_bearing(bearing_section_id, data) for bearing_section_id in data['Bearings']}
+            if None in selected_bearings.values():
+                continue
+
+            design = dict(combination)
+            design['max_steps'] = max_steps
+            design['mass'] = sum(density * np.pi * (step['d'] * 0.001)**2 / 4 * step['l'] * 0.001 for step in shaft_steps)
+            design['P'] = sum(bearing[0] for bearing in selected_bearings.values())
+            design['fmax'] = abs(float(functions_calculator.get_deflection_arrow_extremum()[1]))
+            for bearing_section_id, (_, bearing, rolling_element) in selected_bearings.items():
+                design[bearing_section_id] = bearing['Kod'][0]
+                design[f'{bearing_section_id}_rolling_elements'] = rolling_element['Kod'][0]
+            design['sections'] = {'Mimośrody': eccentrics, **sections}
+            designs.append(design)
+
+    if not designs:
+        return []
+    objectives = np.array([[design[key] for key in ParetoExplorer.objectives_keys] for design in designs])
+    return [designs[idx] for idx in get_non_dominated(objectives)]
+
+class ParetoExplorer(ParametricSweep):
+    """
+    Explore the designs of the shaft and keep the non-dominated ones with respect to the shaft mass, the absolute
+    power loss of the bearings and the maximal deflection.
+
+    The designs are the feasible coordinates combinations with the shaft steps proposed by ShaftOptimizer for every
+    maximal number of the steps. The bearings and the rolling elements only change the power loss, so the catalog items
+    with the minimal power loss are selected for every bearing section at once - the front is the same as for all
+    the combinations of the catalog items. The catalog is read once and shared by the worker processes.
+    """
+    objectives_keys = ('mass', 'P', 'fmax')
+
+    def __init__(self, base_data, max_steps_options=(1, 2, 3), diameter_increment=0.5, catalog=None, chunk_size=32, max_workers=None):
+        """
+        Args:
+            base_data (dict): Component data of InputShaftCalculator with the selected material and the bearings factors
+                              'Lh', 'fd', 'ft' and 'f' - the values of the parameters which are not swept are taken from it.
+            max_steps_options (iterable): Maximal numbers of the steps in every section of the proposed layouts.
+            diameter_increment (float): Increment of the steps diameters [mm].
+            catalog (dict): Bearings and rolling elements - see load_catalog. It is read from the database by default.
+            chunk_size (int): Number of the coordinates combinations evaluated by a worker at once.
+            max_workers (int): Number of the worker processes - by default the number of processors.
+        """
+        super().__init__(base_data, chunk_size, max_workers)
+        self._max_steps_options = tuple(max_steps_options)
+        self._diameter_increment = diameter_increment
+        self._catalog = catalog if catalog is not None else load_catalog()
+        self.front = []
+
+    def _get_inputs(self, ranges):
+        inputs = super()._get_inputs(ranges)
+        inputs.update({'max_steps_options': self._max_steps_options, 'diameter_increment': self._diameter_increment, 'catalog': self._catalog})
+        return inputs
+
+    def _create_executor(self):
+        return ProcessPoolExecutor(max_workers=self._max_workers, initializer=_set_catalog, initargs=(self._catalog,))
+
+    def _submit_chunk(self, executor, chunk):
+        return executor.submit(_evaluate_designs_chunk, self._base_data, chunk, self._max_steps_options, self._diameter_increment)
+
+    def update_front(self, designs):
+        """
+        Args:
+            designs (list): New designs - dicts with the keys from objectives_keys.
+        Returns:
+            (list): Non-dominated designs of the current front and the new designs.
+        """
+        candidates = self.front + designs
+        if candidates:
+            objectives = np.array([[design[key] for key in self.objectives_keys] for design in candidates])
+            self.front = [candidates[idx] for idx in get_non_dominated(objectives)]
+        return self.front
+
+    def explore(self, ranges, checkpoint_path=None):
+        """
+        Evaluate the designs of all the feasible coordinates combinations.
+
+        Args:
+            ranges (dict): Values of the swept parameters - {key: iterable}, with the keys from sweep_keys.
+            checkpoint_path (str): Path to the checkpoint file - see ParametricSweep.run.
+        Returns:
+            (generator): Front updated with the designs of every chunk in the order of their completion.
+        """
+        for designs in self.run(ranges, checkpoint_path):
+            yield self.update_front(designs)
+
+    def export_front(self, file_path):
+        """
+        Write the front to the CSV file - the shaft sections are stored as JSON.
+
+        Args:
+            file_path (str): Path to the CSV file.
+        """
+        fieldnames = [*self.sweep_keys, 'max_steps', *self.objectives_keys]
+        for bearing_section_id in BEARINGS_TABLES_GROUPS:
+            fieldnames += [bearing_section_id, f'{bearing_section_id}_rolling_elements']
+        fieldnames.append('sections')
+
+        with open(file_path, 'w', newline='', encoding='utf-8') as output_file:
+            writer = csv.DictWriter(output_file, fieldnames=fieldnames)
+            writer.writeheader()
+            for design in sorted(self.front, key=lambda design: [design[key] for key in self.objectives_keys]):
+                writer.writerow({**design, 'sections': json.dumps(design['sections'], ensure_ascii=False)})
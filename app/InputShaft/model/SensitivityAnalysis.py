@@ -0,0 +1,197 @@
+import copy
+import numbers
+import numpy as np
+
+from InputShaft.model.InputShaftCalculator import InputShaftCalculator
+from InputShaft.model.ParametricSweep import ParametricSweep
+from InputShaft.Tabs.BearingsTabCalculator import BearingsTabCalculator
+from InputShaft.Tabs.PowerLossTabCalculator import PowerLossTabCalculator
+from ShaftDesigner.model.FunctionsCalculator import FunctionsCalculator
+from ShaftDesigner.model.LoadCasesCalculator import LoadCasesCalculator
+
+class SensitivityAnalysis():
+    """
+    Calculate the finite-difference Jacobian of the key outputs of the design with respect to the numeric inputs
+    of the component data. Every input is perturbed by +h and -h and all the perturbed cases are evaluated at once
+    as the load cases of LoadCasesCalculator - the bearings load capacity and power loss are calculated from their arrays.
+
+    The deflection of the designed shaft is linear in the force on the eccentrics and inversely proportional to E,
+    so it is scaled for the cases with the perturbed loads or material. Only the cases with the perturbed coordinates
+    of the shaft or angle between the eccentrics are recalculated one by one - the given shaft steps are mapped
+    onto the perturbed coordinates first.
+    """
+    outputs_keys = ('dsc', 'dec', 'fmax', 'C_support_A', 'C_support_B', 'C_eccentrics', 'P')
+    # Values of the component data which are calculated or are not continuous
+    calculated_keys = ('n', 'Ra', 'Rb', 'F', 'dsc', 'dec', 'nkr', 'xkr', 'P')
+    # Inputs of the bearings - the remaining values are calculated or come from the selected catalog items
+    bearings_inputs_keys = ('Lh', 'fd', 'ft', 'f')
+    # Coordinates of the shaft - the deflection of the cases with the perturbed coordinates is recalculated
+    geometry_keys = ('L', 'LA', 'LB', 'L1', 'e', 'B', 'x')
+    # Inputs changing the directions of the forces - the deflection is not proportional to them, so their cases are recalculated too
+    directions_keys = ('αe',)
+
+    def __init__(self, relative_step=0.01):
+        """
+        Args:
+            relative_step (float): Perturbation of the inputs relative to their values - the minimal diameters are rounded up
+                                   to 0.01 mm, so the step has to be large enough to change them.
+        """
+        self._relative_step = relative_step
+
+    @staticmethod
+    def _get_value(data, path):
+        for key in path:
+            data = data[key]
+        return data[0]
+
+    def get_inputs(self, data):
+        """
+        Args:
+            data (dict): Component data.
+        Returns:
+            (list): Paths of the numeric inputs - tuples of the keys of the data.
+        """
+        is_number = lambda value: isinstance(value, list) and isinstance(value[0], numbers.Real) and not isinstance(value[0], bool)
+        inputs = [(key,) for key, value in data.items() if key not in self.calculated_keys and is_number(value)]
+        inputs += [('Materiał', key) for key, value in data['Materiał'].items() if is_number(value)]
+        for bearing_section_id, attributes in data['Bearings'].items():
+            inputs += [('Bearings', bearing_section_id, key) for key in self.bearings_inputs_keys if is_number(attributes[key])]
+        return inputs
+
+    def _calculate_bearings(self, data, inputs, values, forces):
+        # Load capacity and power loss of every bearing for all the cases - the values of the cases are the columns of the data
+        column = lambda path: values[:, inputs.index(path)] if path in inputs else self._get_value(data, path)
+        outputs = {}
+        power_losses = []
+        for bearing_section_id, attributes in data['Bearings'].items():
+            bearing_data = {'Bearings': {bearing_section_id: {key: [column(('Bearings', bearing_section_id, key))] for key in self.bearings_inputs_keys}}}
+            if all(attributes[key][0] is not None for key in ('Lh', 'fd', 'ft')):
+                bearings_calculator = BearingsTabCalculator()
+                bearings_calculator.init_data({'nwe': [column(('nwe',))], 'Bearings': {bearing_section_id: {'F': [forces[bearing_section_id]]}}}, None, None)
+                outputs[f'C_{bearing_section_id}'] = bearings_calculator.calculate_bearing_load_capacity(bearing_section_id, bearing_data)
+            if attributes['data'] and attributes['rolling_elements'] and attributes['f'][0] is not None:
+                component_data = {key: [column((key,))] for key in ('w0', 'e', 'rw1')}
+                component_data['Bearings'] = {bearing_section_id: {'F': [forces[bearing_section_id]], 'data': attributes['data']}}
+                bearing_data['Bearings'][bearing_section_id]['rolling_elements'] = attributes['rolling_elements']
+                power_loss_calculator = PowerLossTabCalculator()
+                power_loss_calculator.init_data(component_data, None, None)
+                power_losses.append(power_loss_calculator.calculate_bearing_power_loss(bearing_section_id, bearing_data))
+
+        # The absolute power loss is only known if the bearings of all the sections were selected
+        if len(power_losses) == len(data['Bearings']):
+            outputs['P'] = np.sum(power_losses, axis=0)
+        return outputs
+
+    def _calculate_deflection(self, data, shaft_steps):
+        functions_calculator = FunctionsCalculator(initial_functions_cache_size=0)
+        functions_calculator.calculate_initial_functions_and_attributes(data)
+        functions_calculator.calculate_remaining_functions(shaft_steps)
+        extremum = functions_calculator.get_deflection_arrow_extremum()
+        return np.nan if extremum is None else abs(extremum[1])
+
+    @staticmethod
+    def _get_shaft_knots(data):
+        # Coordinates the shaft steps are designed to - the ends of the shaft, the supports and the edges of the eccentrics
+        positions = [data['L1'][0]] + [value[0] for value in data['Lc'].values()]
+        edges = [position + side * data['B'][0] / 2 for position in positions for side in (-1, 1)]
+        return np.array([0, data['LA'][0], data['LB'][0], data['L'][0]] + edges, dtype=float)
+
+    def _get_perturbed_shaft_steps(self, data, perturbed_data, shaft_steps):
+        """
+        Args:
+            data (dict): Component data the shaft steps are designed for.
+            perturbed_data (dict): Component data with the perturbed coordinates of the shaft.
+            shaft_steps (list): Designed shaft steps covering the whole shaft.
+        Returns:
+            (list): Shaft steps covering the whole perturbed shaft - the bounds of the steps are moved piecewise linearly between
+                    the ends of the shaft, the supports and the edges of the eccentrics, and the eccentrics steps get the perturbed
+                    eccentricity.
+        """
+        knots = self._get_shaft_knots(data)
+        perturbed_knots = self._get_shaft_knots(perturbed_data)
+        # The knots coinciding in the designed shaft (e.g. a support at the edge of an eccentric) are mapped by the first of them
+        order = np.argsort(knots, kind='stable')
+        knots, unique_indices = np.unique(knots[order], return_index=True)
+        perturbed_knots = perturbed_knots[order][unique_indices]
+
+        bounds = np.array([step['z'] for step in shaft_steps] + [shaft_steps[-1]['z'] + shaft_steps[-1]['l']], dtype=float)
+        if not np.array_equal(knots, perturbed_knots):
+            bounds = np.interp(bounds, knots, perturbed_knots)
+        e = perturbed_data['e'][0]
+        return [dict(step, z=float(start), l=float(stop - start), e=float(np.sign(step['e']) * e))
+                for step, start, stop in zip(shaft_steps, bounds[:-1], bounds[1:])]
+
+    def _calculate_cases(self, data, inputs, values, shaft_steps):
+        column = lambda key: values[:, inputs.index((key,))] if (key,) in inputs else np.full(len(values), data[key][0], dtype=float)
+        material_column = lambda key: values[:, inputs.index(('Materiał', key))]
+
+        # Forces on the eccentrics - consecutive eccentrics are shifted by the angle αe
+        F = np.hypot(column('Fwzx'), column('Fwm') - column('Fwzy'))
+        n = data['n'][0]
+        load_cases = {key: column(key) for key in ('L', 'LA', 'LB', 'L1', 'Mwe', 'e', 'xz', 'qdop')}
+        load_cases['Lc'] = column('L1')[:, np.newaxis] + np.arange(1, n) * (column('x') + column('B'))[:, np.newaxis]
+        directions = InputShaftCalculator.get_eccentrics_directions(n, column('αe'))
+        load_cases['Fx'] = F[:, np.newaxis] * directions[0]
+        load_cases['Fy'] = F[:, np.newaxis] * directions[1]
+        load_cases.update({key: material_column(key) for key in ('Zgo', 'Zso', 'G')})
+        results = LoadCasesCalculator(initial_functions_cache_size=0).calculate_load_cases(load_cases)
+
+        outputs = {'dsc': results['dsc'], 'dec': results['dec']}
+        outputs.update(self._calculate_bearings(data, inputs, values, {'support_A': results['Ra'], 'support_B': results['Rb'], 'eccentrics': F}))
+
+        if shaft_steps is not None:
+            # Scale the deflection of the nominal case, recalculate the cases with the perturbed coordinates
+            E = material_column('E')
+            fmax = self._calculate_deflection(data, shaft_steps) * F / F[0] * E[0] / E
+            recalculated_keys = [key for key in self.geometry_keys + self.directions_keys if (key,) in inputs]
+            recalculated_indices = [inputs.index((key,)) for key in recalculated_keys]
+            geometry_indices = [inputs.index((key,)) for key in self.geometry_keys if (key,) in inputs]
+            for case in np.flatnonzero(np.any(values[:, recalculated_indices] != values[0, recalculated_indices], axis=1)):
+                input_shaft_calculator = InputShaftCalculator()
+                input_shaft_calculator.set_data(copy.deepcopy(data))
+                ParametricSweep.set_combination_data(input_shaft_calculator, {key: values[case, inputs.index((key,))] for key in recalculated_keys})
+                case_data = input_shaft_calculator.get_data()
+                case_steps = shaft_steps
+                if np.any(values[case, geometry_indices] != values[0, geometry_indices]):
+                    case_steps = self._get_perturbed_shaft_steps(data, case_data, shaft_steps)
+                fmax[case] = self._calculate_deflection(case_data, case_steps)
+            outputs['fmax'] = fmax
+        return outputs
+
+    def calculate(self, data, shaft_steps=None):
+        """
+        Args:
+            data (dict): Component data with the selected material.
+            shaft_steps (list): Designed shaft steps covering the whole shaft - without them the deflection is not analysed.
+        Returns:
+            (dict): 'inputs' - names of the inputs, 'outputs' - names of the available outputs, 'values' - nominal values of the outputs,
+                    'jacobian' and 'elasticities' (relative derivatives ∂y/∂x * x/y) of shape (outputs, inputs) and 'table' - rows with
+                    the output, the input, the derivative and the elasticity sorted by the absolute elasticity. The inputs which
+                    do not change an output are omitted in the table. 'not_analysed' - rows with the output and the input
+                    of the derivatives which could not be calculated, e.g. because a perturbed case has no deflection.
+        """
+        inputs = self.get_inputs(data)
+        nominal = np.array([self._get_value(data, path) for path in inputs], dtype=float)
+        steps = self._relative_step * np.where(nominal != 0, np.abs(nominal), 1)
+
+        # Nominal case and the cases with every input perturbed by +h and -h
+        values = np.tile(nominal, (2 * len(inputs) + 1, 1))
+        values[1::2][np.diag_indices(len(inputs))] += steps
+        values[2::2][np.diag_indices(len(inputs))] -= steps
+        outputs = self._calculate_cases(data, inputs, values, shaft_steps)
+
+        names = ['.'.join(path) for path in inputs]
+        outputs_keys = [key for key in self.outputs_keys if key in outputs]
+        jacobian = np.array([(outputs[key][1::2] - outputs[key][2::2]) / (2 * steps) for key in outputs_keys])
+        output_values = np.array([outputs[key][0] for key in outputs_keys])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            elasticities = jacobian * nominal / output_values[:, np.newaxis]
+
+        table = [{'output': output, 'input': name, 'derivative': float(jacobian[i, j]), 'elasticity': float(elasticities[i, j])}
+                 for i, output in enumerate(outputs_keys) for j, name in enumerate(names) if np.isfinite(jacobian[i, j]) and jacobian[i, j] != 0]
+        table.sort(key=lambda row: -abs(row['elasticity']) if np.isfinite(row['elasticity']) else 0)
+        not_analysed = [{'output': output, 'input': name} for i, output in enumerate(outputs_keys)
+                        for j, name in enumerate(names) if not np.isfinite(jacobian[i, j])]
+
+        return {'inputs': names, 'outputs': outputs_keys, 'values': output_values,
+                'jacobian': jacobian, 'elasticities': elasticities, 'table': table, 'not_analysed': not_analysed}
@@ -0,0 +1,68 @@
+import hashlib
+import json
+import pickle
+import sqlite3
+
+def get_inputs_hash(inputs):
+    """
+    Args:
+        inputs (dict): Inputs the results of the sweep depend on - the component data, the swept values, the catalog etc.
+    Returns:
+        (str): SHA-256 hash of the inputs.
+    """
+    # numpy arrays and numbers are hashed by their values
+    default = lambda value: value.tolist() if hasattr(value, 'tolist') else str(value)
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True, ensure_ascii=False, default=default).encode('utf-8')).hexdigest()
+
+class SweepCheckpoint():
+    """
+    Progress of the sweep stored in the SQLite database - the results of every completed chunk are written together
+    with its id and the hash of the sweep inputs in a single transaction, so an interrupted sweep loses at most
+    the chunks in progress. The chunks of the other inputs - e.g. the changed component data or catalog - are stale
+    and they are removed when the checkpoint is opened.
+    """
+    def __init__(self, database_path, inputs_hash):
+        """
+        Args:
+            database_path (str): Path to the checkpoint file - it is created if it does not exist.
+            inputs_hash (str): Hash of the inputs of the sweep - see get_inputs_hash.
+        """
+        self._inputs_hash = inputs_hash
+        self._conn = sqlite3.connect(database_path, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS chunks (id INTEGER PRIMARY KEY, inputs_hash TEXT NOT NULL, results BLOB NOT NULL)")
+        self._conn.execute("DELETE FROM chunks WHERE inputs_hash != ?", (inputs_hash,))
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def get_completed_chunks(self):
+        """
+        Returns:
+            (set): Ids of the completed chunks.
+        """
+        return {row[0] for row in self._conn.execute("SELECT id FROM chunks")}
+
+    def get_results(self):
+        """
+        Returns:
+            (generator): Lists of the results of the completed chunks in the order of their ids.
+        """
+        for (results,) in self._conn.execute("SELECT results FROM chunks ORDER BY id"):
+            yield pickle.loads(results)
+
+    def save_chunk(self, chunk_id, results):
+        """
+        Args:
+            chunk_id (int): Id of the chunk - its index in the sequence of the chunks of the sweep.
+            results (list): Results of the chunk.
+        """
+        # Pickle keeps the types of the results, e.g. the integer keys of the shaft sections
+        self._conn.execute("INSERT OR REPLACE INTO chunks VALUES (?, ?, ?)",
+                           (chunk_id, self._inputs_hash, pickle.dumps(results, protocol=pickle.HIGHEST_PROTOCOL)))
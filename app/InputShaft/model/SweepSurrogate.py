@@ -0,0 +1,188 @@
+import bisect
+import itertools
+import numpy as np
+
+from InputShaft.model.ParametricSweep import ParametricSweep, _evaluate_chunk
+
+class SweepSurrogate():
+    """
+    Answer the queries for the points between the results of the parametric sweep without rerunning the calculations.
+    The results on the grid of the sweep are interpolated multilinearly and the scattered results with the cubic radial
+    basis functions. Every answer comes with the estimate of the interpolation error.
+
+    The points outside the trust region - beyond the swept values, in the cells with the infeasible nodes or with
+    the estimated error above the tolerance - are calculated exactly by the calculators chain of the sweep and cached.
+    """
+    methods = ('linear', 'rbf')
+    # Largest number of the scattered results - the radial basis functions need the dense system of equations
+    max_rbf_points = 2000
+    # Largest number of the nodes of the grid of the multilinear interpolation
+    max_grid_nodes = 10**7
+
+    def __init__(self, base_data, results, keys=ParametricSweep.results_keys, method='linear', relative_tolerance=0.01):
+        """
+        Args:
+            base_data (dict): Component data the sweep was run with.
+            results (list): Results of the sweep - dicts with the swept parameters and the calculated values.
+            keys (iterable): Keys of the interpolated values.
+            method (str): 'linear' for the results on the grid of the sweep or 'rbf' for the scattered results.
+            relative_tolerance (float): Largest estimated interpolation error relative to the interpolated value.
+        """
+        if method not in self.methods:
+            raise ValueError(f'Unknown interpolation method {method}')
+        if not results:
+            raise ValueError('There are no results to interpolate')
+
+        self._base_data = base_data
+        self._keys = tuple(keys)
+        self._method = method
+        self._relative_tolerance = relative_tolerance
+        self._exact_results = {}
+
+        # Parameters with more than one value are interpolated, the remaining ones are fixed
+        self._parameters = []
+        self._fixed = {}
+        for key in ParametricSweep.sweep_keys:
+            if key in results[0]:
+                values = np.unique([result[key] for result in results])
+                if len(values) > 1:
+                    self._parameters.append(key)
+                else:
+                    self._fixed[key] = values[0].item()
+
+        points = np.array([[result[key] for key in self._parameters] for result in results], dtype=float).reshape(len(results), -1)
+        values = np.array([[result[key] for key in self._keys] for result in results], dtype=float)
+        if method == 'linear':
+            self._init_grid(points, values)
+        else:
+            self._init_rbf(points, values)
+
+    def get_parameters(self):
+        return list(self._parameters)
+
+    def _init_grid(self, points, values):
+        self._axes = [np.unique(points[:, axis]) for axis in range(points.shape[1])]
+        shape = tuple(len(axis) for axis in self._axes)
+        if np.prod(shape, dtype=float) > self.max_grid_nodes:
+            raise ValueError('The grid of the results is too large - use the rbf method')
+
+        # Values on the grid - the nodes without the results (the infeasible combinations) are NaN
+        self._grid = np.full(shape + (len(self._keys),), np.nan)
+        indices = tuple(np.searchsorted(axis, points[:, idx]) for idx, axis in enumerate(self._axes))
+        self._grid[indices] = values
+
+        # Offsets of the corners of a cell
+        self._corners = np.array(list(itertools.product((0, 1), repeat=len(self._axes)))).reshape(-1, len(self._axes))
+
+        # Error of the multilinear interpolation in a cell is at most h**2/8 * |f''| along every axis. The second
+        # derivatives are estimated at the inner nodes by the second divided differences
+        self._second_derivatives = np.full((len(self._axes),) + self._grid.shape, np.nan)
+        for idx, axis in enumerate(self._axes):
+            if len(axis) > 2:
+                h = np.diff(axis)
+                take = lambda start, stop: np.take(self._grid, range(start, stop), axis=idx)
+                shape = [1] * self._grid.ndim
+                shape[idx] = len(axis) - 2
+                h1, h2 = h[:-1].reshape(shape), h[1:].reshape(shape)
+                inner = 2 * ((take(2, len(axis)) - take(1, len(axis) - 1)) / h2 - (take(1, len(axis) - 1) - take(0, len(axis) - 2)) / h1) / (h1 + h2)
+                index = [slice(None)] * self._grid.ndim
+                index[idx] = slice(1, -1)
+                self._second_derivatives[idx][tuple(index)] = np.abs(inner)
+
+    def _init_rbf(self, points, values):
+        if len(points) > self.max_rbf_points:
+            raise ValueError(f'The rbf method supports up to {self.max_rbf_points} results')
+
+        # Coordinates are scaled to the unit cube, so that the parameters of different ranges have equal weights
+        self._lower = points.min(axis=0)
+        self._upper = points.max(axis=0)
+        self._points = (points - self._lower) / (self._upper - self._lower)
+
+        # Cubic radial basis functions with the linear polynomial
+        points_number, dimensions = self._points.shape
+        polynomial = np.hstack([np.ones((points_number, 1)), self._points])
+        system = np.zeros((points_number + dimensions + 1,) * 2)
+        system[:points_number, :points_number] = np.linalg.norm(self._points[:, np.newaxis] - self._points, axis=2)**3
+        system[:points_number, points_number:] = polynomial
+        system[points_number:, :points_number] = polynomial.T
+        self._inverse = np.linalg.inv(system)
+        self._coefficients = self._inverse[:, :points_number] @ values
+
+        # The error of the interpolation is at most the power function times the native norm of the interpolated function,
+        # which is estimated by the native norm of the interpolant
+        weights = self._coefficients[:points_number]
+        self._native_norms = np.sqrt(np.maximum(np.einsum('ik,ij,jk->k', weights, system[:points_number, :points_number], weights), 0))
+
+        # The points farther from the nodes than the largest distance between the neighbouring nodes are outside of the trust region
+        distances = np.linalg.norm(self._points[:, np.newaxis] - self._points, axis=2)
+        np.fill_diagonal(distances, np.inf)
+        self._trust_radius = distances.min(axis=1).max()
+
+    def _interpolate_grid(self, point):
+        indices = np.empty(len(self._axes), dtype=int)
+        weights = np.empty(len(self._axes))
+        steps = np.empty(len(self._axes))
+        for idx, (axis, value) in enumerate(zip(self._axes, point)):
+            if not axis[0] <= value <= axis[-1]:
+                return None
+            indices[idx] = min(max(bisect.bisect_right(axis, value) - 1, 0), len(axis) - 2)
+            steps[idx] = axis[indices[idx] + 1] - axis[indices[idx]]
+            weights[idx] = (value - axis[indices[idx]]) / steps[idx]
+
+        # Values in the corners of the cell - NaN if a corner is infeasible, then the point is outside of the trust region
+        nodes = tuple((indices + self._corners).T)
+        values = np.where(self._corners, weights, 1 - weights).prod(axis=1) @ self._grid[nodes]
+        # Largest curvatures in the corners along every axis - NaN if unknown, e.g. along the axis of two values
+        curvatures = np.fmax.reduce(self._second_derivatives[(slice(None),) + nodes], axis=1)
+        errors = steps**2 / 8 @ curvatures
+        return values, errors
+
+    def _interpolate_rbf(self, point):
+        point = (np.asarray(point) - self._lower) / (self._upper - self._lower)
+        if np.any((point < 0) | (point > 1)):
+            return None
+        distances = np.linalg.norm(self._points - point, axis=1)
+        if distances.min() > self._trust_radius:
+            return None
+        vector = np.concatenate((distances**3, [1], point))
+        values = vector @ self._coefficients
+        power_function = np.sqrt(max(-vector @ self._inverse @ vector, 0))
+        return values, power_function * self._native_norms
+
+    def _calculate_exact(self, combination):
+        cache_key = tuple(sorted(combination.items()))
+        if cache_key not in self._exact_results:
+            result = _evaluate_chunk(self._base_data, [combination])[0]
+            self._exact_results[cache_key] = {key: result[key] for key in self._keys}
+        return self._exact_results[cache_key]
+
+    def query(self, point):
+        """
+        Args:
+            point (dict): Values of the parameters - the interpolated ones and optionally the fixed ones.
+        Returns:
+            (dict): 'values' and 'errors' - the interpolated values and the estimates of their errors with the keys
+                    of the surrogate and 'exact' - True if the point was outside of the trust region and the values were calculated.
+        """
+        for key in point:
+            if key not in ParametricSweep.sweep_keys:
+                raise ValueError(f'Parameter {key} was not swept')
+        missing = [key for key in self._parameters if key not in point]
+        if missing:
+            raise ValueError(f"Missing values of the parameters {', '.join(missing)}")
+
+        answer = None
+        # The points with the other values of the fixed parameters are outside of the trust region
+        if all(point.get(key, value) == value for key, value in self._fixed.items()):
+            coordinates = [point[key] for key in self._parameters]
+            answer = self._interpolate_grid(coordinates) if self._method == 'linear' else self._interpolate_rbf(coordinates)
+
+        if answer is not None:
+            values, errors = answer
+            with np.errstate(invalid='ignore'):
+                trusted = np.all(errors <= self._relative_tolerance * np.abs(values))
+            if trusted:
+                return {'values': dict(zip(self._keys, values.tolist())), 'errors': dict(zip(self._keys, errors.tolist())), 'exact': False}
+
+        values = self._calculate_exact({**self._fixed, **point})
+        return {'values': dict(values), 'errors': dict.fromkeys(self._keys, 0.0), 'exact': True}
@@ -2,6 +2,7 @@ from ShaftDesigner.view.ShaftDesigner import ShaftDesigner
 
 from ShaftDesigner.model.ShaftCalculator import ShaftCalculator
 from ShaftDesigner.model.FunctionsCalculator import FunctionsCalculator
+from ShaftDesigner.model.ShaftOptimizer import ShaftOptimizer
 
 from ShaftDesigner.view.ShaftSection import ShaftSection, EccentricsSection
 
@@ -26,9 +27,14 @@ class ShaftDesignerController:
 
         # Set an instance of functions calculator
         self.functions_calculator = FunctionsCalculator()
+
+        # Set an instance of shaft optimizer
+        self.shaft_optimizer = ShaftOptimizer()
     
     def _connect_signals_and_slots(self):
         self._shaft_designer.confirm_draft_button.clicked.connect(self._on_finish_draft)
+        self._shaft_designer.deflection_method_selector.currentTextChanged.connect(self._on_deflection_method_changed)
+        self._shaft_designer.optimize_shaft_button.clicked.connect(self._on_optimize_shaft)
         for section_name, section in self._sections.items():
             section.subsection_data_signal.connect(self._handle_subsection_data)
             section.remove_subsection_plot_signal.connect(self._remove_shaft_subsection)
@@ -38,6 +44,7 @@ class ShaftDesignerController:
 
     def _init_ui(self):
         self._init_shaft_sections()
+        self._shaft_designer.deflection_method_selector.addItems(FunctionsCalculator.deflection_methods)
     
     def _init_shaft_sections(self):
         # Set instances of sidebar sections
@@ -165,15 +172,46 @@ class ShaftDesignerController:
         self._shaft_designer.plotter.set_functions_plots(shaft_functions['z'], plots)
 
     def _on_finish_draft(self):
+        # Save the critical speed of the confirmed shaft in the data - it is not calculated while the shaft is edited
+        self.functions_calculator.get_critical_speed()
         self.shaft_calculator.save_data(self._data)
         self._shaft_designer.set_draft_finished_title(True)
         MessageHandler.information(self._shaft_designer,'', 'Projekt został zatwierdzony')
         self._mediator.emit_shaft_designing_finished()
 
+    def _on_deflection_method_changed(self, method):
+        # Set the method selected for the project and recalculate the deflection of the designed shaft
+        self._data['Metoda ugięć'][0] = method
+        if self.is_whole_shaft_designed:
+            self._toogle_remaining_plots_visibility()
+
+    def _on_optimize_shaft(self):
+        # The sections beside the eccentrics are bounded by the eccentrics, so they have to be designed first
+        if len(self.shaft_calculator.shaft_sections.get('Mimośrody', {})) != self.eccentrics_number:
+            MessageHandler.information(self._shaft_designer, '', 'Najpierw zaprojektuj mimośrody')
+            return
+        
+        max_steps, accepted = self._shaft_designer.get_max_steps_number()
+        if not accepted:
+            return
+
+        sections = self.shaft_optimizer.optimize_shaft(self.shaft_calculator, self.functions_calculator, max_steps)
+
+        # Replace the subsections of the optimized sections with the proposed ones
+        for section_name in sections:
+            self._sections[section_name].clear_subsections()
+            self.shaft_calculator.shaft_sections.pop(section_name, None)
+        self.set_shaft_data(sections)
+
     def update_shaft_data(self, data):
         # Update shaft initial data
         self._data = data
 
+        # Set the deflection method selected for the project
+        self._shaft_designer.deflection_method_selector.blockSignals(True)
+        self._shaft_designer.deflection_method_selector.setCurrentText(data['Metoda ugięć'][0])
+        self._shaft_designer.deflection_method_selector.blockSignals(False)
+
         # (Re)calculate initial functions and attributes
         self.functions_calculator.calculate_initial_functions_and_attributes(data)
 
@@ -1,17 +1,58 @@
+import copy
+import hashlib
+import json
 import numpy as np
 from collections import OrderedDict
 from types import MappingProxyType
 
+from ShaftDesigner.model.PiecewisePolynomial import PiecewisePolynomial, subdivide
+from ShaftDesigner.model.TransferMatrixCalculator import TransferMatrixCalculator
+
 class FunctionsCalculator():
-    def __init__(self):
+    # Inputs the initial functions depend on - they form the key of the initial functions cache
+    initial_data_keys = ('L', 'LA', 'LB', 'L1', 'Lc', 'Fx', 'Fp', 'Mwe', 'Materiał', 'xz', 'qdop')
+    # Attributes set by calculate_initial_functions_and_attributes, which are stored in the cache
+    _initial_functions_attributes = ('_eccentrics_positions', '_planes_number', 'active_forces', 'support_reactions', '_all_forces',
+                                     '_functions', '_z_values',
+                                     'bending_moment', 'cutting_force', 'torque', 'equivalent_moment', 'd_min_by_torsional_strength',
+                                     'd_min_by_equivalent_stress', 'd_min_by_permissible_angle_of_twist', 'd_min')
+    # Methods of calculating the deflection of the shaft, selected for the project with the data key 'Metoda ugięć'
+    deflection_methods = ('Wał zastępczy', 'Macierze przeniesienia')
+    # Gravitational acceleration [m/s^2]
+    gravitational_acceleration = 9.81
+
+    def __init__(self, initial_functions_cache_size=16):
         self.d_min_by_permissible_deflection_angle = None
         self.d_min_by_permissible_deflection_arrow = None
         self.deflection_arrow = None
 
         self._min_diameters = {}
         self._initial_min_diameters = {}
+        self._steps_critical_speeds = None
+
+        self._transfer_matrix_calculator = TransferMatrixCalculator()
+
+        # Least recently used cache of the initial functions, keyed by the hash of the initial data
+        self._initial_functions_cache = OrderedDict()
+        self._initial_functions_cache_size = initial_functions_cache_size
+
+        # Shaft steps (z, l, d, e) for which the loads of the equivalent smooth shaft were calculated
+        self._shaft_steps_signatures = None
+        # Extrema of the deflection curves used as the breakpoints of the z arguments
+        self._deflection_extrema = None
+
+        # Maximal distance between the z arguments on intervals where the functions are polynomial [mm]
+        self._z_max_interval = 2
+        # Offset of the z arguments placed next to the functions discontinuities [mm]
+        self._z_discontinuity_offset = 0.001
 
     def _calculate_support_reactions(self):
+        self.support_reactions = self._get_support_reactions(self.active_forces)
+        # The bearings are loaded with the resultants of the reactions of both planes
+        self._data['Ra'][0] = self._get_resultant_values(self.support_reactions['Fa']['val'])
+        self._data['Rb'][0] = self._get_resultant_values(self.support_reactions['Fb']['val'])
+
+    def _get_support_reactions(self, active_forces):
         LA = self._data['LA'][0]
         LB =  self._data['LB'][0]
 
@@ -19,7 +60,7 @@ class FunctionsCalculator():
         sum_forces = 0
 
         # Add active forces and moments caused by active forces relative to support A
-        for force in self.active_forces.values():
+        for force in active_forces.values():
             distance_from_A = force['z'] - LA
             sum_moments_A += force['val'] * distance_from_A
             sum_forces += force['val']
@@ -30,53 +71,52 @@ class FunctionsCalculator():
         RB = (-sum_moments_A) / (LB - LA)
         RA = -sum_forces - RB
 
-        self.support_reactions = {'Fa': {'z': LA, 'val': RA}, 'Fb': {'z': LB, 'val': RB}}
+        return {'Fa': {'z': LA, 'val': RA}, 'Fb': {'z': LB, 'val': RB}}
+
+    def _combine_forces(self, active_forces, support_reactions):
+        all_forces = {}
+        for forces in (active_forces, support_reactions): all_forces.update(forces)
+        return OrderedDict(sorted(all_forces.items(), key=lambda x: x[1]['z']))
 
-        self._data['Ra'][0] = self.support_reactions['Fa']['val']
-        self._data['Rb'][0] = self.support_reactions['Fb']['val']
+    def _get_loads_arrays(self, loads):
+        # The values of the loads are the arrays of their components in the planes - the planes are the rows of the values
+        positions = np.array([load['z'] for load in loads.values()], dtype=float)
+        values = np.array([load['val'] for load in loads.values()], dtype=float).reshape(len(loads), self._planes_number).T
+        return positions, values
 
-    def _bending_moment_at_z(self, forces, z):
-        moment = 0
-        for force in forces.values():
-            if force['z'] <= z:
-                moment += force['val'] * (z - force['z']) * 0.001
-       
-        return moment
+    def _bending_moment_functions(self, forces):
+        positions, values = self._get_loads_arrays(forces)
+        return PiecewisePolynomial.stack_from_singularity_functions(0, self._data['L'][0], (positions, values * 0.001, 1))
     
-    def _cutting_force_at_z(self, loads, z):
-        cutting_force = 0
-        for load in loads.values():
-            if load['z'] <= z:
-                cutting_force += load['val']
-        return cutting_force
+    def _cutting_force_functions(self, loads):
+        positions, values = self._get_loads_arrays(loads)
+        return PiecewisePolynomial.stack_from_singularity_functions(0, self._data['L'][0], (positions, values, 0))
     
-    def _psi_at_z(self, loads, z):
-        # Funkcja do obliczania kąta ugięcia w punkcie z - bez stałych całkowania
-        deflection_angle = 0
-        for key, load in loads.items():
-            if load['z'] <= z:
-                if key.startswith('F') or key.startswith('Q'):
-                    deflection_angle += 1 / 2 * load['val'] * ((z - load['z']) * 0.001)**2
-                elif key.startswith('M'):
-                    deflection_angle += load['val'] * ((z - load['z']) * 0.001)
-        return deflection_angle
+    def _split_loads(self, loads):
+        # Separate concentrated forces (and shear force increments) from bending moment increments
+        forces = {key: load for key, load in loads.items() if key.startswith('F') or key.startswith('Q')}
+        moments = {key: load for key, load in loads.items() if key.startswith('M')}
+        return self._get_loads_arrays(forces), self._get_loads_arrays(moments)
+
+    def _psi_coefficients(self, loads):
+        # Funkcja kąta ugięcia - bez stałych całkowania (współczynniki wszystkich płaszczyzn)
+        (forces_z, forces_val), (moments_z, moments_val) = self._split_loads(loads)
+        return PiecewisePolynomial.singularity_functions_coefficients(0, self._data['L'][0],
+                                                                      (forces_z, 1 / 2 * forces_val * 0.001**2, 2),
+                                                                      (moments_z, moments_val * 0.001, 1))
     
-    def _phi_at_z(self, loads, z):
-        # Funkcja do obliczania strzałki ugięcia w punkcie z - bez stałych całkowania
-        deflection_arrow = 0
-        for key, load in loads.items():
-            if load['z'] <= z:
-                if key.startswith('F') or key.startswith('Q'):
-                    deflection_arrow += 1 / 6 * load['val'] * ((z - load['z']) * 0.001)**3
-                elif key.startswith('M'):
-                    deflection_arrow += 1 / 2 * load['val'] * ((z - load['z']) * 0.001)**2
-        return deflection_arrow
-
-    def _calculate_integration_constants(self):
+    def _phi_coefficients(self, loads):
+        # Funkcja strzałki ugięcia - bez stałych całkowania (współczynniki wszystkich płaszczyzn)
+        (forces_z, forces_val), (moments_z, moments_val) = self._split_loads(loads)
+        return PiecewisePolynomial.singularity_functions_coefficients(0, self._data['L'][0],
+                                                                      (forces_z, 1 / 6 * forces_val * 0.001**3, 3),
+                                                                      (moments_z, 1 / 2 * moments_val * 0.001**2, 2))
+
+    def _calculate_integration_constants(self, phi):
+        # The constants of all the planes - phi is the list of the functions of the planes
         LA = self._data['LA'][0]
         LB = self._data['LB'][0]
-        mA = self._phi_at_z(self._all_loads, LA)
-        mB = self._phi_at_z(self._all_loads, LB)
+        mA, mB = PiecewisePolynomial.evaluate_stacked(phi, [LA, LB]).T
 
         LA *= 0.001
         LB *= 0.001
@@ -86,59 +126,358 @@ class FunctionsCalculator():
 
         return {'C': C, 'D': D}
     
+    def _calculate_z_values(self, breakpoints=(), extrema=()):
+        """
+        Create the z arguments vector. The grid has exact breakpoints at the supports, the eccentrics, the given
+        breakpoints (e.g. shaft steps) and the zeros of the bending moment, and is refined around the extrema
+        and the discontinuities of the functions. Between the breakpoints the functions are polynomial, so the
+        remaining arguments are spread evenly with a spacing no larger than self._z_max_interval.
+
+        Args:
+            breakpoints (iterable): Additional coordinates that have to be included in the grid.
+            extrema (iterable): Additional coordinates of the functions extrema, around which the grid is refined.
+        Returns:
+            (np.ndarray): Sorted z arguments.
+        """
+        L = self._data['L'][0]
+        LA = self._data['LA'][0]
+        LB = self._data['LB'][0]
+        offset = self._z_discontinuity_offset
+
+        points = np.unique(np.clip(np.concatenate(([0, L, LA, LB], self._eccentrics_positions, breakpoints)), 0, L))
+
+        # Add the zeros of the bending moments (cusps of the dmin functions)
+        extrema = np.concatenate([function.roots() for function in self._get_planes_functions('Mg')] + [extrema])
+        points = np.unique(np.concatenate((points, extrema)))
+
+        # Spread the arguments evenly between the breakpoints
+        z_values = subdivide(points, self._z_max_interval)
+
+        # Refine the grid around the extrema and place the arguments at both sides of the discontinuities
+        refinement = self._z_max_interval * np.array([-1/4, -1/16, -1/64, 1/64, 1/16, 1/4])
+        refined = (extrema[:, np.newaxis] + refinement).ravel()
+        discontinuities = np.array([self._data['L1'][0] + offset, LA - offset, LB + offset])
+        z_values = np.concatenate((z_values, refined, discontinuities))
+
+        return np.unique(z_values[(z_values >= 0) & (z_values <= L)])
+
+    def _calculate_piecewise_functions(self):
+        # Represent the functions exactly - as piecewise polynomials of z
+        L = self._data['L'][0]
+        reduction_factor = np.sqrt(3) / 2
+        self._functions = {}
+        # The functions of both planes are calculated at once from the stacked loads
+        self._set_planes_functions('Mg', self._bending_moment_functions(self._all_forces))
+        self._set_planes_functions('Q', self._cutting_force_functions(self._all_forces))
+        self._functions['Ms'] = PiecewisePolynomial.from_singularity_functions(0, L, ([self._data['L1'][0]], [self._data['Mwe'][0]], 0))
+        # Square of the equivalent moment - the dMz function is monotonic with respect to it.
+        # The bending moments of both planes add up to the resultant bending moment
+        bending_moments = self._get_planes_functions('Mg')
+        self._functions['Mz^2'] = bending_moments[0] * bending_moments[0] + reduction_factor**2 * self._functions['Ms'] * self._functions['Ms']
+        for bending_moment in bending_moments[1:]:
+            self._functions['Mz^2'] = self._functions['Mz^2'] + bending_moment * bending_moment
+
+    def _calculate_initial_functions(self):
+        # Calculate functions
+        self._calculate_bending_moment_function()
+        self._calculate_cutting_force_function()
+        self._calculate_torque_function()
+        self._calculate_equivalent_moment_function()
+
+        # calculate d min by different conditions
+        self._calculate_dmin_function_by_torsional_strength()
+        self._calculate_dmin_function_by_equivalent_stress()
+        self._calculate_dmin_function_by_permissible_angle_of_twist()
+        
+        # calculate d min by all initial conditions
+        self.d_min = np.max(np.stack(list(function for function in self._initial_min_diameters.values() if function is not None)), axis=0)
+
+        self._calculate_minimal_shaft_diameter()
+
     def _calculate_bending_moment_function(self):
-        self.bending_moment = np.array([self._bending_moment_at_z(self._all_forces, z) for z in self._z_values])
+        self.bending_moment = self._get_resultant('Mg', self._z_values)
         self.bending_moment = np.around(self.bending_moment, decimals=2)
 
+    def _calculate_cutting_force_function(self):
+        self.cutting_force = self._get_resultant('Q', self._z_values)
+        self.cutting_force = np.around(self.cutting_force, decimals=2)
+
+    def _get_planes_suffixes(self):
+        # Suffixes of the functions of the planes in which the shaft is loaded - the plane y only if the forces are not coplanar
+        return ('', '_y')[:self._planes_number]
+
+    def _get_planes_functions(self, name):
+        return [self._functions[name + suffix] for suffix in self._get_planes_suffixes()]
+
+    def _set_planes_functions(self, name, functions):
+        for suffix, function in zip(self._get_planes_suffixes(), functions):
+            self._functions[name + suffix] = function
+
+    def _get_resultant_values(self, values):
+        # Resultant of the values of the planes - the planes are the rows of the values
+        if self._planes_number == 1:
+            return values[0]
+        return np.hypot(values[0], values[1])
+
+    def _get_resultant(self, name, z):
+        """
+        Args:
+            name (str): Name of the function of the plane x - the function of the plane y has the suffix '_y'.
+            z (np.ndarray): Arguments.
+        Returns:
+            (np.ndarray): Values of the function if the shaft is loaded in a single plane, otherwise the resultant values of both planes.
+        """
+        return self._get_resultant_values(PiecewisePolynomial.evaluate_stacked(self._get_planes_functions(name), z))
+
+    def _get_resultant_extremum(self, name, start=None, end=None):
+        """
+        Args:
+            name (str): Name of the function of the plane x - the function of the plane y has the suffix '_y'.
+            start (float): Start of the searched interval - by default the start of the shaft.
+            end (float): End of the searched interval - by default the end of the shaft.
+        Returns:
+            (tuple): Argument and value of the extremum with the largest absolute value - of the resultant of both planes
+                     if the shaft is not loaded in a single plane.
+        """
+        functions = self._get_planes_functions(name)
+        if start is not None or end is not None:
+            domain = functions[0].domain
+            functions = [function.restrict(domain[0] if start is None else start, domain[1] if end is None else end) for function in functions]
+        if len(functions) == 1:
+            return functions[0].max_abs()
+        # The square of the resultant is a polynomial, so its maximum is found in closed form
+        z, square = (functions[0] * functions[0] + functions[1] * functions[1]).maximum()
+        return z, np.sqrt(square)
+
     def _calculate_torque_function(self):
-        self.torque = np.array([self._data['Mwe'][0] if z > self._data['L1'][0] else 0 for z in self._z_values])
+        self.torque = np.where(self._z_values > self._data['L1'][0], self._data['Mwe'][0], 0)
         self.torque = np.around(self.torque, decimals=2)
 
     def _calculate_equivalent_moment_function(self):
         reductionFactor = np.sqrt(3)
         self.equivalent_moment = np.sqrt(np.power(self.bending_moment, 2) + np.power(reductionFactor / 2 * self.torque, 2))
         self.equivalent_moment = np.around(self.equivalent_moment, decimals=2)
-        
-    def _calculate_dmin_function_by_equivalent_stress(self):
-        # Calculate minimal shaft diameter based on equivalent stress condition
+
+    def _dmin_by_equivalent_stress(self, equivalent_moment):
         Zgo = self._data['Materiał']['Zgo'][0] * 10**6
         xz = self._data['xz'][0]  
         kgo = Zgo / xz
-        self.d_min_by_equivalent_stress = np.power(32 * self.equivalent_moment / (np.pi * kgo), 1 / 3) * 1000
-        self.d_min_by_equivalent_stress = np.ceil(self.d_min_by_equivalent_stress * 100) / 100
+        d_min = np.power(32 * equivalent_moment / (np.pi * kgo), 1 / 3) * 1000
+        return np.ceil(d_min * 100) / 100
+
+    def _dmin_by_torsional_strength(self, torque):
+        Zso = self._data['Materiał']['Zso'][0] * 10**6
+        xz = self._data['xz'][0]
+        kso = Zso / xz
+        d_min = np.power(16 * torque / (np.pi * kso), 1 / 3) * 1000
+        return np.ceil(d_min * 100) / 100
+
+    def _dmin_by_permissible_angle_of_twist(self, torque):
+        G = self._data['Materiał']['G'][0] * 10**6
+        qdop = self._data['qdop'][0]
+        d_min = np.sqrt(32 * torque / (np.pi * G * qdop)) * 1000
+        return np.ceil(d_min * 100) / 100
+
+    def _dmin_by_permissible_deflection_angle(self, integral):
+        E = self._data['Materiał']['E'][0] * 10**6
+        teta_dop = self._data['tetadop'][0]
+        d_min = (64 / (np.pi * E * teta_dop) * np.abs(integral))**(1 / 4) * 1000
+        return np.ceil(d_min * 100) / 100
+
+    def _dmin_by_permissible_deflection_arrow(self, double_integral):
+        E = self._data['Materiał']['E'][0] * 10**6
+        f_dop = self._data['fdop'][0]
+        d_min = (64 / (np.pi * E * f_dop * 0.001) * np.abs(double_integral))**(1 / 4) * 1000
+        return np.ceil(d_min * 100) / 100
+        
+    def _calculate_dmin_function_by_equivalent_stress(self):
+        # Calculate minimal shaft diameter based on equivalent stress condition
+        self.d_min_by_equivalent_stress = self._dmin_by_equivalent_stress(self.equivalent_moment)
         self._min_diameters['dMz'] = self.d_min_by_equivalent_stress
         self._initial_min_diameters['dMz'] = self.d_min_by_equivalent_stress
     
     def _calculate_dmin_function_by_torsional_strength(self):
         # Calculate minimal shaft diameter based on torsional strength condition
-        Zso = self._data['Materiał']['Zso'][0] * 10**6
-        xz = self._data['xz'][0]
-        kso = Zso / xz
-        self.d_min_by_torsional_strength = np.power(16 * self.torque / (np.pi * kso), 1 / 3) * 1000
-        self.d_min_by_torsional_strength = np.ceil(self.d_min_by_torsional_strength * 100) / 100
+        self.d_min_by_torsional_strength = self._dmin_by_torsional_strength(self.torque)
         self._min_diameters['dMs'] = self.d_min_by_torsional_strength
         self._initial_min_diameters['dMs'] = self.d_min_by_torsional_strength
 
     def _calculate_dmin_function_by_permissible_angle_of_twist(self):   
         # Calculate minimal shaft diameter d - based permissible angle of twist condition
-        G = self._data['Materiał']['G'][0] * 10**6
-        qdop = self._data['qdop'][0]
-        self.d_min_by_permissible_angle_of_twist = np.sqrt(32 * self.torque / (np.pi * G * qdop)) * 1000
-        self.d_min_by_permissible_angle_of_twist = np.ceil(self.d_min_by_permissible_angle_of_twist * 100) / 100
+        self.d_min_by_permissible_angle_of_twist = self._dmin_by_permissible_angle_of_twist(self.torque)
         self._min_diameters['dqdop'] = self.d_min_by_permissible_angle_of_twist
         self._initial_min_diameters['dqdop'] = self.d_min_by_permissible_angle_of_twist
 
     def _calculate_dmin_function_by_all_conditions(self):
-        self.d_min = np.max(np.stack(list(function for function in self._min_diameters.values() if function is not None)), axis=0)
+        # self.d_min always has the shape of the current z arguments vector, so it is updated in place
+        np.max(np.stack(list(function for function in self._min_diameters.values() if function is not None)), axis=0, out=self.d_min)
 
     def _calculate_minimal_shaft_diameter(self):
         e = self._data['e'][0]
-        self._data['dsc'][0] = max(self.d_min_by_equivalent_stress.max(),
-                                   self.d_min_by_torsional_strength.max(),
-                                   self.d_min_by_permissible_angle_of_twist.max())
+        # The deflection is not needed for the diameter, so only the maxima of the moments are calculated
+        maxima = self._get_moments_minimal_diameters_maxima()
+        self._data['dsc'][0] = max(maxima['dMz'], maxima['dMs'], maxima['dqdop'])
 
         self._data['dec'][0] = self._data['dsc'][0] + 2 * e
 
+    def _calculate_step_moment_of_inertia(self, step):
+        return np.pi * (step['d'] * 0.001)**4 / 64 + (np.pi * step['d']**2 * step['e']**2) / 4
+
+    def _get_deflection_method(self):
+        # Projects saved without the selected method use the equivalent smooth shaft
+        return self._data.get('Metoda ugięć', [self.deflection_methods[0]])[0]
+
+    def _calculate_deflection_by_equivalent_shaft(self, I):
+        # Calculate coefficients k=I/Ij for every shaft step
+        for step, inverse_moment_of_inertia in zip(self._shaft_steps, self._inverse_moments_of_inertia):
+            step['k'] = I * inverse_moment_of_inertia
+        all_loads = {}
+        for loads in (self._updated_forces, self._moment_gains, self._cutting_force_gains): all_loads.update(loads)
+        self._all_loads = OrderedDict(sorted(all_loads.items(), key=lambda x: x[1]['z']))
+        # Calculate the function ψ(z) (psi) - the integral of the bending moment, 
+        # and Φ(z) (phi) - the double integral of the bending moment (both divided by I) - of all the planes at once
+        breakpoints, psi = self._psi_coefficients(self._all_loads)
+        phi_breakpoints, phi = self._phi_coefficients(self._all_loads)
+        # Calculate the integration constants of the planes and add them to the coefficients: 
+        # C to ψ(z) and C * z + D to Φ(z), expressed relative to the left ends of the intervals
+        constants = self._calculate_integration_constants([PiecewisePolynomial(phi_breakpoints, coefficients) for coefficients in phi])
+        self.constants = {key: I * value for key, value in constants.items()}
+        C = self.constants['C'][:, np.newaxis]
+        D = self.constants['D'][:, np.newaxis]
+        psi = I * psi
+        psi[..., 0] += C
+        phi = I * phi
+        phi[..., 0] += C * 0.001 * phi_breakpoints[:-1] + D
+        phi[..., 1] += C * 0.001
+        return ([PiecewisePolynomial(breakpoints, coefficients) for coefficients in psi],
+                [PiecewisePolynomial(phi_breakpoints, coefficients) for coefficients in phi])
+
+    def _calculate_deflection_by_transfer_matrices(self, EI):
+        # Calculate the angle and the deflection of the stepped shaft and express them as ψ(z) = EIθ(z) and Φ(z) = EIf(z)
+        # of the equivalent smooth shaft, so that the minimal diameters are calculated the same way for both methods
+        E = self._data['Materiał']['E'][0] * 10**6
+        angles, deflections = self._transfer_matrix_calculator.calculate_deflection(self._shaft_steps, 1 / self._inverse_moments_of_inertia, E,
+                                                                                    self._get_planes_functions('Mg'), self._get_planes_functions('Q'),
+                                                                                    self._data['LA'][0], self._data['LB'][0])
+        return [EI * angle for angle in angles], [EI * deflection for deflection in deflections]
+
+    def compare_deflection_methods(self):
+        """
+        Cross-check the deflection of the designed shaft calculated with the equivalent smooth shaft and with the transfer matrices.
+
+        Returns:
+            (None or dict): Maximal absolute differences of the angle 'θ' [rad] and the deflection 'f' [mm] at the shaft steps,
+                            the loads and the z arguments, and the maximal absolute values of both functions.
+        """
+        if 'psi' not in self._functions:
+            return None
+        EI = self._EI
+        I = EI / (self._data['Materiał']['E'][0] * 10**6)
+        equivalent_shaft = self._calculate_deflection_by_equivalent_shaft(I)
+        transfer_matrices = self._calculate_deflection_by_transfer_matrices(EI)
+        z = np.unique(np.concatenate((self._z_values, equivalent_shaft[1][0].breakpoints, transfer_matrices[1][0].breakpoints)))
+
+        # The differences of both planes are compared at once
+        comparison = {}
+        for key, multiplier, first, second in (('θ', 1, equivalent_shaft[0], transfer_matrices[0]), ('f', 1000, equivalent_shaft[1], transfer_matrices[1])):
+            first_values = PiecewisePolynomial.evaluate_stacked(first, z)
+            comparison[key] = np.max(np.abs(first_values - PiecewisePolynomial.evaluate_stacked(second, z))) / EI * multiplier
+            comparison[f'max |{key}|'] = np.max(np.abs(first_values)) / EI * multiplier
+        return comparison
+
+    def _update_equivalent_shaft_loads(self):
+        """
+        Update the loads acting on the equivalent smooth shaft only for the shaft steps that changed since the last call.
+        The coefficients k=I/Ij depend on every step through the moment of inertia I of the equivalent shaft, so the loads
+        are stored divided by I (with the factors 1/Ij instead of k) - then a change of a single step only affects
+        the forces acting on it and the gains at its ends. Functions psi and phi are multiplied by I afterwards.
+
+        Returns:
+            (bool): True if the coordinates of the shaft steps changed and all the loads were recalculated.
+        """
+        signatures = [(step['z'], step['l'], step['d'], step['e']) for step in self._shaft_steps]
+        previous_signatures = self._shaft_steps_signatures
+        self._shaft_steps_signatures = signatures
+
+        coordinates_changed = previous_signatures is None or [signature[0] for signature in signatures] != [signature[0] for signature in previous_signatures]
+        if coordinates_changed:
+            changed_steps = set(range(len(signatures)))
+            lj = np.array([signature[0] for signature in signatures[1:]], dtype=float)
+            forces_positions, _ = self._get_loads_arrays(self._all_forces)
+            # Index of the shaft step on which every force acts
+            self._forces_steps = dict(zip(self._all_forces, np.searchsorted(lj, forces_positions, side='right')))
+            # Bending moments and shear forces at the beginning of each shaft step (j) in all the planes (rows) - they do not depend 
+            # on the diameters. A force acting at the beginning of a step is multiplied by k of that step, so the shear force before it is used
+            self._steps_beginnings_loads = (PiecewisePolynomial.evaluate_stacked(self._get_planes_functions('Mg'), lj),
+                                            PiecewisePolynomial.evaluate_stacked(self._get_planes_functions('Q'), lj, left_limits=True))
+            self._inverse_moments_of_inertia = np.zeros(len(signatures))
+            self._updated_forces = {}
+            self._moment_gains = {}
+            self._cutting_force_gains = {}
+        else:
+            changed_steps = {idx for idx, (signature, previous_signature) in enumerate(zip(signatures, previous_signatures)) if signature != previous_signature}
+
+        inverse_moments_of_inertia = self._inverse_moments_of_inertia
+        for idx in changed_steps:
+            inverse_moments_of_inertia[idx] = 1 / self._calculate_step_moment_of_inertia(self._shaft_steps[idx])
+
+        # Calculate equivalent forces acting on the changed shaft steps - the values are the components in all the planes
+        for key, force in self._all_forces.items():
+            idx = self._forces_steps[key]
+            if idx in changed_steps:
+                self._updated_forces[key] = {'z': force['z'], 'val': force['val'] * inverse_moments_of_inertia[idx]}
+
+        # Calculate the increments of bending moments and shear forces acting at the beginning of each changed shaft step (j)
+        # and of the steps following them
+        bending_moments, cutting_forces = self._steps_beginnings_loads
+        for j in {idx + shift for idx in changed_steps for shift in (0, 1)} & set(range(1, len(signatures))):
+            delta = inverse_moments_of_inertia[j] - inverse_moments_of_inertia[j-1]
+            z = signatures[j][0]
+            self._moment_gains[f'M{j}'] = {'z': z, 'val': bending_moments[:, j-1] * delta}
+            self._cutting_force_gains[f'Q{j}'] = {'z': z, 'val': cutting_forces[:, j-1] * delta}
+
+        return coordinates_changed
+
+    def _calculate_critical_speed(self):
+        # Estimate the first critical speed with the Rayleigh method: ω^2 = ∫ q(z) * f(z) dz / ∫ m(z) * f(z)^2 dz, where m(z) is
+        # the mass of the shaft per unit length. The mode shape f(z) is the static deflection under the own weight q(z) = m(z) * g -
+        # the forces of the eccentrics are shifted by 180 degrees, so the deflection under them is close to the second mode
+        L = self._data['L'][0]
+        LA = self._data['LA'][0]
+        LB = self._data['LB'][0]
+        E = self._data['Materiał']['E'][0] * 10**6
+        bounds = np.array([step['z'] for step in self._shaft_steps] + [L], dtype=float)
+        diameters = np.array([step['d'] for step in self._shaft_steps], dtype=float)
+        unit_masses = self._data['Materiał']['g'][0] * np.pi * (diameters * 0.001)**2 / 4
+        unit_weights = unit_masses * self.gravitational_acceleration
+
+        # Support reactions of the weight of the shaft steps and the bending moment - the distributed load changes
+        # at the beginnings of the shaft steps
+        weights = unit_weights * np.diff(bounds) * 0.001
+        RB = -np.sum(weights * ((bounds[:-1] + bounds[1:]) / 2 - LA)) / (LB - LA)
+        RA = -weights.sum() - RB
+        bending_moment = PiecewisePolynomial.from_singularity_functions(0, L, (bounds[:-1], np.diff(unit_weights, prepend=0) / 2 * 0.001**2, 2),
+                                                                        ([LA, LB], np.array([RA, RB]) * 0.001, 1))
+
+        # Integrate the curvature M/EIj of the stepped shaft twice and satisfy the conditions f(LA) = f(LB) = 0
+        inverse_stiffness = PiecewisePolynomial(bounds, self._inverse_moments_of_inertia[:, np.newaxis] / E)
+        deflection = (bending_moment * inverse_stiffness).antiderivative().antiderivative() * 0.001**2
+        fA, fB = deflection(np.array([LA, LB], dtype=float))
+        slope = -(fB - fA) / ((LB - LA) * 0.001)
+        deflection = deflection + PiecewisePolynomial.from_singularity_functions(0, L, ([0], [slope * 0.001], 1), ([0], [-fA - slope * LA * 0.001], 0))
+
+        # Work of the weight and the integrals of m(z) * f(z)^2 over every shaft step - both exact for the polynomials
+        masses = PiecewisePolynomial(bounds, unit_masses[:, np.newaxis])
+        work = ((masses * deflection).antiderivative() * 0.001 * self.gravitational_acceleration)(L)
+        steps_integrals = np.diff(((masses * deflection * deflection).antiderivative() * 0.001)(bounds))
+
+        # Critical speeds of the shaft steps - Dunkerley's sum of their inverse squares gives the critical speed of the shaft
+        to_rotational_speed = 60 / (2 * np.pi)
+        with np.errstate(divide='ignore'):
+            self._steps_critical_speeds = np.sqrt(work / steps_integrals) * to_rotational_speed
+        self._data['nkr'][0] = np.sqrt(work / steps_integrals.sum()) * to_rotational_speed
+        self._data['xkr'][0] = self._data['nkr'][0] / self._data['nwe'][0]
+
     def _check_if_whole_shaft_designed(self):
         total_length = 0
         for step in self._shaft_steps:
@@ -146,40 +485,79 @@ class FunctionsCalculator():
 
         return  total_length == self._data['L'][0]
         
+    def _get_initial_data_key(self):
+        # Canonical hash of the inputs of the initial functions - the projects without the components 'Fp' have no key for them
+        initial_data = {key: self._data.get(key) for key in self.initial_data_keys}
+        return hashlib.sha1(json.dumps(initial_data, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _save_initial_functions(self, key):
+        entry = {name: copy.copy(getattr(self, name)) for name in self._initial_functions_attributes}
+        entry['_functions'] = {name: function for name, function in self._functions.items() if name not in ('psi', 'phi', 'psi_y', 'phi_y')}
+        entry['data'] = {name: self._data[name][0] for name in ('Ra', 'Rb', 'dsc')}
+
+        self._initial_functions_cache[key] = entry
+        while len(self._initial_functions_cache) > self._initial_functions_cache_size:
+            self._initial_functions_cache.popitem(last=False)
+
+    def _load_initial_functions(self, key):
+        self._initial_functions_cache.move_to_end(key)
+        entry = self._initial_functions_cache[key]
+        # Copy the stored values, so that the functions updated in place do not change the cache
+        for name in self._initial_functions_attributes:
+            setattr(self, name, copy.copy(entry[name]))
+
+        self._min_diameters['dMz'] = self._initial_min_diameters['dMz'] = self.d_min_by_equivalent_stress
+        self._min_diameters['dMs'] = self._initial_min_diameters['dMs'] = self.d_min_by_torsional_strength
+        self._min_diameters['dqdop'] = self._initial_min_diameters['dqdop'] = self.d_min_by_permissible_angle_of_twist
+
+        for name, value in entry['data'].items():
+            self._data[name][0] = value
+        self._data['dec'][0] = self._data['dsc'][0] + 2 * self._data['e'][0]
+
+    def clear_cache(self):
+        """
+        Remove all the initial functions stored in the cache.
+        """
+        self._initial_functions_cache.clear()
+
     def calculate_initial_functions_and_attributes(self, data):
         self._data = data
+        # The loads of the equivalent smooth shaft have to be recalculated for the new data
+        self._shaft_steps_signatures = None
+
+        # Reuse the functions if they were already calculated for the same initial data
+        key = self._get_initial_data_key()
+        if key in self._initial_functions_cache:
+            self._load_initial_functions(key)
+            return
+
         # Extract necessary data
-        L, L1 = self._data['L'][0], self._data['L1'][0]
+        L1 = self._data['L1'][0]
         self._eccentrics_positions = [L1] + [value[0] for value in self._data['Lc'].values()]
 
-        # Organize data
-        self.active_forces = {force: {'z': position, 'val': value[0]} for position, (force, value) in zip(self._eccentrics_positions, self._data['Fx'].items())}
+        # Organize data - the values of the forces are the arrays of their components in the planes x and y.
+        # The shaft is loaded in the plane x only if all the components in the plane y are 0 (also for the projects without the components 'Fp')
+        planes_forces = [[value[0] for value in self._data['Fx'].values()]]
+        forces_y = [value[0][1] for value in self._data.get('Fp', {}).values()]
+        if any(forces_y):
+            planes_forces.append(forces_y)
+        self._planes_number = len(planes_forces)
+        self.active_forces = {force: {'z': position, 'val': np.array(values, dtype=float)}
+                              for position, force, values in zip(self._eccentrics_positions, self._data['Fx'], zip(*planes_forces))}
         # Calculate support reactions
         self._calculate_support_reactions()
 
         # Combine support reactions and active forces into one dict
-        self._all_forces = {}
-        for forces in (self.active_forces, self.support_reactions): self._all_forces.update(forces)
-        self._all_forces = OrderedDict(sorted(self._all_forces.items(), key=lambda x: x[1]['z']))
+        self._all_forces = self._combine_forces(self.active_forces, self.support_reactions)
 
-        # Create z arguments vector
-        interval = 0.1
-        self._z_values = np.arange(0,L + interval, interval)
+        # Represent the functions as piecewise polynomials and create z arguments vector
+        self._calculate_piecewise_functions()
+        self._z_values = self._calculate_z_values()
 
         # Calculate functions
-        self._calculate_bending_moment_function()
-        self._calculate_torque_function()
-        self._calculate_equivalent_moment_function()
-
-        # calculate d min by different conditions
-        self._calculate_dmin_function_by_torsional_strength()
-        self._calculate_dmin_function_by_equivalent_stress()
-        self._calculate_dmin_function_by_permissible_angle_of_twist()
-        
-        # calculate d min by all initial conditions
-        self.d_min = np.max(np.stack(list(function for function in self._initial_min_diameters.values() if function is not None)), axis=0)
+        self._calculate_initial_functions()
 
-        self._calculate_minimal_shaft_diameter()
+        self._save_initial_functions(key)
         
     def calculate_remaining_functions(self, shaft_steps):
         self._shaft_steps = shaft_steps
@@ -187,74 +565,59 @@ class FunctionsCalculator():
             L = self._data['L'][0]
             LA = self._data['LA'][0]
             LB = self._data['LB'][0]
-            teta_dop = self._data['tetadop'][0]
-            f_dop = self._data['fdop'][0]
             # Calculate the diameter and the moment of inertia of the equivalent smooth shaft
             d = sum(step['l'] * step['d'] for step in self._shaft_steps)/(sum(step['l'] for step in self._shaft_steps))
             E = self._data['Materiał']['E'][0] * 10**6
             I = np.pi * (d * 0.001)**4 / 64
             EI = E * I
-            # Calculate coefficients k=I/Ij for every shaft step
-            for step in self._shaft_steps:
-                Ij = np.pi * (step['d'] * 0.001)**4 / 64 + (np.pi * step['d']**2 * step['e']**2) / 4
-                step['k'] = I /  Ij
-            # Calculate equivalent forces acting on equivalent smooth shaft
-            self._updated_forces = {}
-            for key, force in self._all_forces.items():
-                for idx in range(len(self._shaft_steps)):
-                    if idx == len(self._shaft_steps) - 1 or force['z'] < self._shaft_steps[idx+1]['z']:
-                        self._updated_forces[key] = {'z': force['z'], 'val': force['val'] * self._shaft_steps[idx]['k']}
-                        break
-            # Calculate the increments of bending moments and shear forces acting at the beginning of each shaft step (j)
-            self._moment_gains = {}
-            self._cutting_force_gains = {}
-            for idx, step in enumerate(self._shaft_steps[:-1]):
-                # Coordinate of the shaft step start n + 1 = j
-                lj = self._shaft_steps[idx+1]['z']
-                # Increment of bending moment
-                bending_moment = self._bending_moment_at_z(self._all_forces, lj)
-                deltaM = {'z': lj, 'val': bending_moment * (self._shaft_steps[idx+1]['k'] - self._shaft_steps[idx]['k'])}
-                self._moment_gains[f'M{idx+1}'] = deltaM
-                # increment of shear force
-                cutting_force = self._cutting_force_at_z(self._all_forces, lj)
-                deltaQ = {'z': lj, 'val': cutting_force * (self._shaft_steps[idx+1]['k'] - self._shaft_steps[idx]['k'])}
-                self._cutting_force_gains[f'Q{idx+1}'] = deltaQ
-                # Add the increments of bending moments and shear forces to the remaining forces
-                self._all_loads = {}
-                for loads in (self._updated_forces, self._moment_gains, self._cutting_force_gains): self._all_loads.update(loads)
-                self._all_loads = OrderedDict(sorted(self._all_loads.items(), key=lambda x: x[1]['z']))
-                # Calculate the function ψ(z) (psi) - the integral of the bending moment, 
-                # and Φ(z) (phi) - the double integral of the bending moment (but without integration constants)
-                psi = np.array([self._psi_at_z(self._all_loads, z)  for z in self._z_values])
-                phi = np.array([(self._phi_at_z(self._all_loads, z)) for z in self._z_values])
-            # Calculate the angle θ(z) (theta) and the deflection curve f(z)
-            # First, calculate the integration constants
-            self.constants = self._calculate_integration_constants()
-            C = self.constants['C']
-            D = self.constants['D']
-            # Add the integration constants to ψ(z) and Φ(z) - to obtain the integral and the double integral
-            integral = psi + C
-            double_integral = np.array([phi_at_z + C * z * 0.001 + D for z, phi_at_z in zip(self._z_values, phi)])
-            self.deflection_angle = integral / EI
-            self.deflection_arrow = double_integral / EI * 1000
+            # Update the loads of the equivalent smooth shaft related to the changed shaft steps
+            coordinates_changed = self._update_equivalent_shaft_loads()
+            # Calculate the angle θ(z) (theta) and the deflection curve f(z) of all the planes at once with the method selected for the project
+            if self._get_deflection_method() == self.deflection_methods[1]:
+                psi, phi = self._calculate_deflection_by_transfer_matrices(EI)
+            else:
+                psi, phi = self._calculate_deflection_by_equivalent_shaft(I)
+            self._set_planes_functions('psi', psi)
+            self._set_planes_functions('phi', phi)
+            self._EI = EI
+            # If the shaft steps coordinates or the extrema of the deflection curves changed, recreate the z arguments vector 
+            # with them as breakpoints and recalculate the initial functions with it - otherwise only the deflection related 
+            # arrays are updated in place
+            extrema = np.concatenate([function.roots() for function in self._get_planes_functions('psi')])
+            reuse_z_values = (not coordinates_changed and self.deflection_arrow is not None
+                              and np.array_equal(extrema, self._deflection_extrema))
+            self._deflection_extrema = extrema
+            if not reuse_z_values:
+                steps_coordinates = [step['z'] for step in self._shaft_steps]
+                self._z_values = self._calculate_z_values(steps_coordinates, extrema)
+                self._calculate_initial_functions()
+            # With both planes loaded the minimal diameters depend on the resultant angle and deflection
+            integral = self._get_resultant('psi', self._z_values)
+            double_integral = self._get_resultant('phi', self._z_values)
             ## Calculate the minimum diameters with respect to the angle θ(z) (theta) and the deflection curve f(z)
-            self.d_min_by_permissible_deflection_angle = (64 / (np.pi * E * teta_dop) * np.sqrt(integral**2))**(1 / 4) * 1000
-            self.d_min_by_permissible_deflection_angle = np.ceil(self.d_min_by_permissible_deflection_angle * 100) / 100
-
-            self.d_min_by_permissible_deflection_arrow = [] 
-            for z, di_at_z in zip(self._z_values, double_integral):
-                if LA <= z <= LB:
-                    self.d_min_by_permissible_deflection_arrow.append((64 / (np.pi * E * f_dop * 0.001) * np.sqrt(di_at_z**2))**(1 / 4) * 1000)
-                else:
-                    self.d_min_by_permissible_deflection_arrow.append(0)
-            self.d_min_by_permissible_deflection_arrow = np.array(self.d_min_by_permissible_deflection_arrow)
-            self.d_min_by_permissible_deflection_arrow = np.ceil(self.d_min_by_permissible_deflection_arrow * 100) / 100
-
-            self._calculate_minimal_shaft_diameter()
+            between_supports = (LA <= self._z_values) & (self._z_values <= LB)
+            d_min_by_permissible_deflection_arrow = np.where(between_supports, self._dmin_by_permissible_deflection_arrow(double_integral), 0)
+            if reuse_z_values:
+                np.divide(integral, EI, out=self.deflection_angle)
+                np.multiply(double_integral, 1000 / EI, out=self.deflection_arrow)
+                self.d_min_by_permissible_deflection_angle[:] = self._dmin_by_permissible_deflection_angle(integral)
+                self.d_min_by_permissible_deflection_arrow[:] = d_min_by_permissible_deflection_arrow
+            else:
+                self.deflection_angle = integral / EI
+                self.deflection_arrow = double_integral / EI * 1000
+                self.d_min_by_permissible_deflection_angle = self._dmin_by_permissible_deflection_angle(integral)
+                self.d_min_by_permissible_deflection_arrow = d_min_by_permissible_deflection_arrow
         else:
             self.d_min_by_permissible_deflection_angle = None
             self.d_min_by_permissible_deflection_arrow = None
             self.deflection_arrow = None
+            for name in ('psi', 'phi', 'psi_y', 'phi_y'):
+                self._functions.pop(name, None)
+        # The critical speed needs another solve under the own weight of the shaft, so it is only calculated
+        # when it is requested - see get_critical_speed
+        self._steps_critical_speeds = None
+        self._data['nkr'][0] = None
+        self._data['xkr'][0] = None
         
         self._min_diameters['dkdop'] = self.d_min_by_permissible_deflection_angle
         self._min_diameters['dfdop'] = self.d_min_by_permissible_deflection_arrow
@@ -279,6 +642,85 @@ class FunctionsCalculator():
            
         return functions
 
+    def get_piecewise_functions(self):
+        """
+        Get the exact representation of the shaft functions: bending moment 'Mg', shear force 'Q', torque 'Ms',
+        squared equivalent moment 'Mz^2' and - if the whole shaft is designed - the integral 'psi' (EIθ) 
+        and the double integral 'phi' (EIf) of the bending moment, including the integration constants.
+        If the forces on the eccentrics are not coplanar, the functions of the plane y have the suffix '_y'
+        ('Mg_y', 'Q_y', 'psi_y', 'phi_y') and 'Mz^2' includes the bending moments of both planes.
+
+        Returns:
+            (MappingProxyType): Piecewise polynomial functions of z [mm].
+        """
+        return MappingProxyType(self._functions)
+
+    def get_minimal_diameters_maxima(self):
+        """
+        Calculate the maxima of the minimal diameter functions in closed form - every function is monotonic
+        with respect to the absolute value of one of the piecewise polynomial functions, so its maximum
+        is found from the polynomials extrema instead of the sampled arrays.
+
+        Returns:
+            (dict): Maxima of the minimal diameter functions available for the current data.
+        """
+        maxima = self._get_moments_minimal_diameters_maxima()
+
+        if 'psi' in self._functions:
+            LA = self._data['LA'][0]
+            LB = self._data['LB'][0]
+            maxima['dkdop'] = self._dmin_by_permissible_deflection_angle(self._get_resultant_extremum('psi')[1])
+            maxima['dfdop'] = self._dmin_by_permissible_deflection_arrow(self._get_resultant_extremum('phi', LA, LB)[1])
+
+        return maxima
+
+    def _get_moments_minimal_diameters_maxima(self):
+        # Evaluate the moments at the extrema candidates of the squared equivalent moment. The torque acts for z > L1, as in
+        # the sampled functions, and the candidates include the limit from the right of its step: the bending moment at L1
+        # with the full torque - the supremum the samples approach just after L1
+        z, _ = self._functions['Mz^2'].extrema()
+        bending_moment = np.around(self._get_resultant('Mg', z), decimals=2)
+        torque = np.around(self._functions['Ms'](z), decimals=2)
+        equivalent_moment = np.around(np.sqrt(bending_moment**2 + (np.sqrt(3) / 2 * torque)**2), decimals=2).max()
+        torque = torque.max()
+
+        return {'dMs': self._dmin_by_torsional_strength(torque),
+                'dMz': self._dmin_by_equivalent_stress(equivalent_moment),
+                'dqdop': self._dmin_by_permissible_angle_of_twist(torque)}
+
+    def get_deflection_arrow_extremum(self):
+        """
+        Returns:
+            (None or tuple): Coordinate [mm] and value [mm] of the largest deflection of the designed shaft.
+        """
+        if 'phi' not in self._functions:
+            return None
+        z, double_integral = self._get_resultant_extremum('phi')
+        return z, double_integral / self._EI * 1000
+
+    def get_deflection_angle_extremum(self):
+        """
+        Returns:
+            (None or tuple): Coordinate [mm] and value [rad] of the largest deflection angle of the designed shaft.
+        """
+        if 'psi' not in self._functions:
+            return None
+        z, integral = self._get_resultant_extremum('psi')
+        return z, integral / self._EI
+
+    def get_critical_speed(self):
+        """
+        Returns:
+            (None or dict): First critical speed of the designed shaft 'nkr' [obr/min], its ratio to the input speed 'xkr' and 
+                            the critical speeds of the single shaft steps 'steps' [obr/min] - the lowest ones indicate the steps, 
+                            whose mass contributes the most to the resonance. The critical speed is also saved in the data.
+        """
+        if self._steps_critical_speeds is None:
+            if 'psi' not in self._functions:
+                return None
+            self._calculate_critical_speed()
+        return {'nkr': self._data['nkr'][0], 'xkr': self._data['xkr'][0], 'steps': self._steps_critical_speeds}
+
     def get_shaft_initial_attributes(self):
         shaft_data = {
             'L': self._data['L'][0],
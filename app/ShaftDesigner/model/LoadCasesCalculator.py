@@ -0,0 +1,154 @@
+import numpy as np
+
+from ShaftDesigner.model.FunctionsCalculator import FunctionsCalculator
+from ShaftDesigner.model.PiecewisePolynomial import subdivide
+
+class LoadCasesCalculator(FunctionsCalculator):
+    """
+    Calculate the initial shaft functions for many load cases at once. Every input is a column of
+    the load cases, so the same formulas as for a single case broadcast to arrays of shape (cases, z).
+    """
+    # Keys of the load cases arrays. 'Lc', 'Fx' and 'Fy' have one column for every eccentric (without the first one for 'Lc')
+    # and the remaining keys have one value for every load case. 'Fy' - the forces in the plane y - is optional
+    load_cases_keys = ('L', 'LA', 'LB', 'L1', 'Lc', 'Fx', 'Fy', 'Mwe', 'e', 'xz', 'qdop', 'Zgo', 'Zso', 'G')
+
+    @staticmethod
+    def stack_load_cases(data):
+        """
+        Convert the data of the single load cases (structured as the data of InputShaftCalculator) into the load cases arrays.
+
+        Args:
+            data (list): Data dicts of the load cases. All of them have to have the same number of eccentrics.
+        Returns:
+            (dict): Load cases arrays.
+        """
+        load_cases = {}
+        for key in ('L', 'LA', 'LB', 'L1', 'Mwe', 'e', 'xz', 'qdop'):
+            load_cases[key] = np.array([case[key][0] for case in data], dtype=float)
+        for key in ('Zgo', 'Zso', 'G'):
+            load_cases[key] = np.array([case['Materiał'][key][0] for case in data], dtype=float)
+        for key in ('Lc', 'Fx'):
+            values = [[value[0] for value in case[key].values()] for case in data]
+            if len({len(case_values) for case_values in values}) > 1:
+                raise ValueError('All load cases have to have the same number of eccentrics')
+            load_cases[key] = np.array(values, dtype=float).reshape(len(data), -1)
+        if all(case.get('Fp') for case in data):
+            load_cases['Fy'] = np.array([[value[0][1] for value in case['Fp'].values()] for case in data], dtype=float).reshape(len(data), -1)
+        return load_cases
+
+    def _set_load_cases(self, load_cases):
+        Fx = np.atleast_2d(np.asarray(load_cases['Fx'], dtype=float))
+        cases_number = max([Fx.shape[0]] + [np.size(load_cases[key]) for key in self.load_cases_keys if key not in ('Lc', 'Fx', 'Fy')])
+        Fx = np.broadcast_to(Fx, (cases_number, Fx.shape[1]))
+        # The plane y is only calculated if any of the load cases has a force in it
+        Fy = load_cases.get('Fy')
+        Fy = None if Fy is None or not np.any(Fy) else np.broadcast_to(np.atleast_2d(np.asarray(Fy, dtype=float)), Fx.shape)
+        Lc = np.broadcast_to(np.asarray(load_cases.get('Lc', np.empty((1, 0))), dtype=float).reshape(-1, Fx.shape[1] - 1), (cases_number, Fx.shape[1] - 1))
+
+        # Store the values as columns, so that they broadcast along the z axis
+        column = lambda key: np.broadcast_to(np.asarray(load_cases[key], dtype=float).reshape(-1, 1), (cases_number, 1))
+        self._data = {key: [column(key), None] for key in ('L', 'LA', 'LB', 'L1', 'Mwe', 'e', 'xz', 'qdop')}
+        self._data['Materiał'] = {key: [column(key), None] for key in ('Zgo', 'Zso', 'G')}
+        self._eccentrics_positions = np.hstack((self._data['L1'][0], Lc))
+        self._active_forces = Fx
+        self._active_forces_y = Fy
+
+    def _get_support_reactions(self, active_forces):
+        LA = self._data['LA'][0]
+        LB = self._data['LB'][0]
+        # Equation of moments relative to A and equation of vertical forces for every load case
+        sum_moments_A = np.sum(active_forces * (self._eccentrics_positions - LA), axis=1, keepdims=True)
+        sum_forces = np.sum(active_forces, axis=1, keepdims=True)
+        RB = (-sum_moments_A) / (LB - LA)
+        RA = -sum_forces - RB
+        return RA, RB
+
+    def _calculate_support_reactions(self):
+        RA, RB = self._get_support_reactions(self._active_forces)
+        self._forces_positions = np.hstack((self._eccentrics_positions, self._data['LA'][0], self._data['LB'][0]))
+        self._forces_values = np.hstack((self._active_forces, RA, RB))
+        self._forces_values_y = None
+        # The bearings are loaded with the resultants of the reactions of both planes
+        if self._active_forces_y is not None:
+            RA_y, RB_y = self._get_support_reactions(self._active_forces_y)
+            self._forces_values_y = np.hstack((self._active_forces_y, RA_y, RB_y))
+            RA, RB = np.hypot(RA, RA_y), np.hypot(RB, RB_y)
+
+        self.support_reactions = {'Fa': RA[:, 0], 'Fb': RB[:, 0]}
+
+    def _calculate_z_values(self):
+        # Common z arguments vector with exact breakpoints at the supports and the eccentrics of every load case
+        L = self._data['L'][0]
+        offset = self._z_discontinuity_offset
+        points = np.unique(np.concatenate((self._forces_positions.ravel(), L.ravel(), [0])))
+        discontinuities = np.concatenate(((self._data['L1'][0] + offset).ravel(),
+                                          (self._data['LA'][0] - offset).ravel(), (self._data['LB'][0] + offset).ravel()))
+        z_values = np.unique(np.concatenate((subdivide(points, self._z_max_interval), discontinuities)))
+        return z_values[(z_values >= 0) & (z_values <= L.max())]
+
+    def _calculate_maximal_equivalent_moment(self):
+        # The bending moments are piecewise linear, so the equivalent moment (also with the resultant of both planes, whose square
+        # is convex between the forces) reaches its maximum at one of the forces. The torque acts from L1 on, the same as at
+        # the candidates of the single case calculation
+        z = self._forces_positions
+        bending_moment = np.around(self._bending_moment_at(z), decimals=2)
+        torque = np.around(np.where(z >= self._data['L1'][0], self._data['Mwe'][0], 0), decimals=2)
+        return np.around(np.sqrt(bending_moment**2 + (np.sqrt(3) / 2 * torque)**2), decimals=2).max(axis=1, keepdims=True)
+
+    def _bending_moment_at(self, z):
+        # Bending moment of every load case at its own arguments z of shape (cases, points) - the resultant of both planes
+        # if any of the load cases has a force in the plane y
+        bending_moments = []
+        for forces_values in (self._forces_values, self._forces_values_y):
+            if forces_values is None:
+                continue
+            bending_moment = np.zeros(z.shape)
+            for positions, values in zip(self._forces_positions.T, forces_values.T):
+                bending_moment += values[:, np.newaxis] * np.maximum(z - positions[:, np.newaxis], 0) * 0.001
+            bending_moments.append(bending_moment)
+        return bending_moments[0] if len(bending_moments) == 1 else np.hypot(*bending_moments)
+
+    def calculate_load_cases(self, load_cases, z_values=None):
+        """
+        Calculate the bending moment, the torque, the equivalent moment and the minimal diameters
+        for all load cases at once.
+
+        Args:
+            load_cases (dict): Load cases arrays with the keys from load_cases_keys - see stack_load_cases.
+                               Single values are broadcast to all load cases.
+            z_values (np.ndarray): Common z arguments [mm]. By default the grid includes the supports and the eccentrics of every load case.
+        Returns:
+            (dict): 'z' arguments, functions of shape (cases, z) - 'Mg', 'Ms', 'Mz', 'dMs', 'dMz', 'dqdop', 'dmin'
+                    (NaN beyond the shaft length of a load case) and values of shape (cases,) - 'Ra', 'Rb', 'dsc', 'dec'.
+                    With the forces 'Fy' the bending moment and the support reactions are the resultants of both planes.
+        """
+        self._set_load_cases(load_cases)
+        self._calculate_support_reactions()
+        z = self._calculate_z_values() if z_values is None else np.asarray(z_values, dtype=float)
+        on_shaft = z <= self._data['L'][0]
+
+        bending_moment = np.around(self._bending_moment_at(np.broadcast_to(z, (len(self._forces_values), len(z)))), decimals=2)
+        torque = np.around(np.where(z > self._data['L1'][0], self._data['Mwe'][0], 0), decimals=2)
+        equivalent_moment = np.around(np.sqrt(bending_moment**2 + (np.sqrt(3) / 2 * torque)**2), decimals=2)
+
+        functions = {'Mg': bending_moment,
+                     'Ms': torque,
+                     'Mz': equivalent_moment,
+                     'dMs': self._dmin_by_torsional_strength(torque),
+                     'dMz': self._dmin_by_equivalent_stress(equivalent_moment),
+                     'dqdop': self._dmin_by_permissible_angle_of_twist(torque)}
+        functions['dmin'] = np.maximum.reduce([functions['dMs'], functions['dMz'], functions['dqdop']])
+        results = {key: np.where(on_shaft, function, np.nan) for key, function in functions.items()}
+
+        # Calculate the minimal shaft diameters from the exact maxima of the functions
+        torque = np.around(self._data['Mwe'][0], decimals=2)
+        dsc = np.maximum.reduce([self._dmin_by_equivalent_stress(self._calculate_maximal_equivalent_moment()),
+                                 self._dmin_by_torsional_strength(torque),
+                                 self._dmin_by_permissible_angle_of_twist(torque)])[:, 0]
+
+        results['z'] = z
+        results['Ra'] = self.support_reactions['Fa']
+        results['Rb'] = self.support_reactions['Fb']
+        results['dsc'] = dsc
+        results['dec'] = dsc + 2 * self._data['e'][0][:, 0]
+        return results
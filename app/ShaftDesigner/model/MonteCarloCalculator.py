@@ -0,0 +1,164 @@
+import copy
+import numpy as np
+
+from InputShaft.model.InputShaftCalculator import InputShaftCalculator
+from InputShaft.Tabs.BearingsTabCalculator import BearingsTabCalculator
+from ShaftDesigner.model.FunctionsCalculator import FunctionsCalculator
+from ShaftDesigner.model.LoadCasesCalculator import LoadCasesCalculator
+
+class MonteCarloCalculator(LoadCasesCalculator):
+    """
+    Tolerance analysis of the shaft - the loads and the material limits are drawn from the given distributions
+    and the minimal diameters, the deflection and the bearings load capacity are calculated for all samples at once.
+
+    The coordinates of the shaft are exact, so the deflection of the designed shaft is linear in the force
+    on the eccentrics and inversely proportional to E. It is calculated once for the unit force and scaled
+    for every sample, while the remaining functions are calculated as the load cases of shape (samples, z).
+    """
+    # Keys of the sampled values - the material limits are taken from the data key 'Materiał'
+    samples_keys = ('Fwzx', 'Fwzy', 'Fwm', 'Mwe', 'Zgo', 'Zso', 'E', 'G')
+    material_keys = ('Zgo', 'Zso', 'E', 'G')
+    # Number of the (samples, z) arrays present at once during the calculation of a chunk of the samples
+    _arrays_per_sample = 16
+
+    def __init__(self, memory_budget=256 * 2**20):
+        """
+        Args:
+            memory_budget (int): Limit of the memory of the (samples, z) arrays [B] - the per-z results of all the samples
+                                 (float32 'dmin', 'θ' and 'f'), which are kept to calculate the exact percentiles, the copy
+                                 sorted by np.percentile and the intermediate arrays of a chunk of the samples. The values
+                                 of shape (samples,) are not included. If the results of all the samples do not fit into
+                                 the budget, calculate raises ValueError instead of exceeding it.
+        """
+        super().__init__(initial_functions_cache_size=0)
+        self._memory_budget = memory_budget
+
+    def draw_samples(self, data, distributions, samples_number, seed=None):
+        """
+        Args:
+            data (dict): Component data - the nominal values of the keys without the distribution.
+            distributions (dict): Distributions of the sampled values - {key: (name, parameters)}, where name is the name
+                                  of the numpy.random.Generator method and parameters are the dict of its arguments, e.g.
+                                  {'Fwm': ('normal', {'loc': 5602.25, 'scale': 150})}.
+            samples_number (int): Number of the samples.
+            seed (int): Seed of the random numbers generator.
+        Returns:
+            (dict): Arrays of the samples with the keys from samples_keys.
+        """
+        generator = np.random.default_rng(seed)
+        samples = {}
+        for key in self.samples_keys:
+            if key in distributions:
+                name, parameters = distributions[key]
+                samples[key] = getattr(generator, name)(size=samples_number, **parameters).astype(float)
+            else:
+                nominal = data['Materiał'][key][0] if key in self.material_keys else data[key][0]
+                samples[key] = np.full(samples_number, nominal, dtype=float)
+        return samples
+
+    def _calculate_unit_deflection(self, data, shaft_steps):
+        # Deflection of the designed shaft for the unit force on the eccentrics and the nominal E
+        unit_data = copy.deepcopy(data)
+        directions = InputShaftCalculator.get_eccentrics_directions(data['n'][0], data['αe'][0])
+        for idx, (key, force) in enumerate(unit_data['Fx'].items()):
+            force[0] = directions[0][idx]
+            unit_data['Fp'][key] = [[directions[0][idx], directions[1][idx]], 'N']
+
+        functions_calculator = FunctionsCalculator(initial_functions_cache_size=0)
+        functions_calculator.calculate_initial_functions_and_attributes(unit_data)
+        functions_calculator.calculate_remaining_functions(shaft_steps)
+        if functions_calculator.deflection_arrow is None:
+            raise ValueError('The shaft steps have to cover the whole shaft length')
+
+        z = functions_calculator.get_shaft_functions()['z']
+        functions = functions_calculator.get_piecewise_functions()
+        # With both planes loaded the minimal diameters depend on the resultant angle and deflection
+        resultant = lambda name: np.hypot(functions[name](z), functions[name + '_y'](z)) if name + '_y' in functions else functions[name](z)
+        return z, {'psi': resultant('psi'), 'phi': resultant('phi'),
+                   'θ': functions_calculator.deflection_angle.copy(), 'f': functions_calculator.deflection_arrow.copy()}
+
+    def _calculate_chunk(self, data, samples, z, unit_deflection):
+        F = np.hypot(samples['Fwzx'], samples['Fwm'] - samples['Fwzy'])
+        load_cases = {key: data[key][0] for key in ('L', 'LA', 'LB', 'L1', 'e', 'xz', 'qdop')}
+        if data['Lc']:
+            load_cases['Lc'] = [value[0] for value in data['Lc'].values()]
+        # Consecutive eccentrics are shifted by the angle αe
+        directions = InputShaftCalculator.get_eccentrics_directions(data['n'][0], data['αe'][0])
+        load_cases['Fx'] = F[:, np.newaxis] * directions[0]
+        load_cases['Fy'] = F[:, np.newaxis] * directions[1]
+        load_cases.update({key: samples[key] for key in ('Mwe', 'Zgo', 'Zso', 'G')})
+        results = self.calculate_load_cases(load_cases, z)
+        z = results['z']
+
+        chunk = {'dsc': results['dsc'], 'dec': results['dec']}
+        d_min = results['dmin']
+        if unit_deflection is not None:
+            # The minimal diameters by the deflection conditions use E of the samples
+            E = samples['E'][:, np.newaxis]
+            self._data['Materiał']['E'] = [E, None]
+            self._data['tetadop'] = [data['tetadop'][0], None]
+            self._data['fdop'] = [data['fdop'][0], None]
+            between_supports = (data['LA'][0] <= z) & (z <= data['LB'][0])
+            d_min_by_deflection_angle = self._dmin_by_permissible_deflection_angle(F[:, np.newaxis] * unit_deflection['psi'])
+            d_min_by_deflection_arrow = np.where(between_supports, self._dmin_by_permissible_deflection_arrow(F[:, np.newaxis] * unit_deflection['phi']), 0)
+            d_min = np.maximum.reduce([d_min, d_min_by_deflection_angle, d_min_by_deflection_arrow])
+
+            scale = F[:, np.newaxis] * data['Materiał']['E'][0] / E
+            chunk['θ'] = (scale * unit_deflection['θ']).astype(np.float32)
+            chunk['f'] = (scale * unit_deflection['f']).astype(np.float32)
+            chunk['θmax'] = np.abs(chunk['θ']).max(axis=1)
+            chunk['fmax'] = np.abs(chunk['f']).max(axis=1)
+        chunk['dmin'] = d_min.astype(np.float32)
+
+        # Load capacity of the bearings with the set durability factors
+        component_data = {'nwe': data['nwe'], 'Bearings': {'support_A': {'F': [results['Ra']]}, 'support_B': {'F': [results['Rb']]},
+                                                           'eccentrics': {'F': [F]}}}
+        bearings_calculator = BearingsTabCalculator()
+        bearings_calculator.init_data(component_data, None, None)
+        for bearing_section_id, attributes in data['Bearings'].items():
+            if all(attributes[key][0] is not None for key in ('Lh', 'fd', 'ft')):
+                chunk[f'C_{bearing_section_id}'] = bearings_calculator.calculate_bearing_load_capacity(bearing_section_id, data)
+        return chunk, z
+
+    def calculate(self, data, samples, shaft_steps=None, percentiles=(5, 50, 95)):
+        """
+        Calculate the percentiles of the results of all samples.
+
+        Args:
+            data (dict): Component data.
+            samples (dict): Arrays of the samples - see draw_samples.
+            shaft_steps (list): Designed shaft steps covering the whole shaft - without them the deflection is not calculated.
+            percentiles (iterable): Percentiles to report [%].
+        Returns:
+            (dict): 'z' arguments [mm], 'percentiles' and the percentiles of the results - functions of shape (percentiles, z):
+                    'dmin' and if the shaft steps are given 'θ' and 'f' and values of shape (percentiles,): 'dsc', 'dec',
+                    'θmax' and 'fmax' (the largest absolute values) and 'C_<bearing_section_id>' of every bearing with the set durability factors.
+        """
+        if shaft_steps is None:
+            # The z arguments include the supports and the eccentrics - the same for all samples
+            z, unit_deflection = None, None
+            z_number = int(data['L'][0] / self._z_max_interval) + 2 * (data['n'][0] + 3)
+        else:
+            z, unit_deflection = self._calculate_unit_deflection(data, shaft_steps)
+            z_number = len(z)
+
+        # The per-z results of all the samples are kept for the exact percentiles - together with the copy of one of them
+        # sorted by np.percentile they take (functions + 1) float32 arrays of shape (samples, z)
+        samples_number = len(samples['Fwzx'])
+        functions_number = 1 if unit_deflection is None else 3
+        results_size = (functions_number + 1) * samples_number * z_number * np.dtype(np.float32).itemsize
+        # Split the samples into chunks, whose arrays fit into the rest of the memory budget
+        chunk_size = (self._memory_budget - results_size) // (self._arrays_per_sample * z_number * 8)
+        if chunk_size < 1:
+            raise ValueError(f'The results of {samples_number} samples do not fit into the memory budget of {self._memory_budget} B - '
+                             f'at least {results_size + self._arrays_per_sample * z_number * 8} B are needed')
+        chunks = []
+        for start in range(0, samples_number, chunk_size):
+            chunk, z = self._calculate_chunk(data, {key: values[start:start + chunk_size] for key, values in samples.items()}, z, unit_deflection)
+            chunks.append(chunk)
+
+        results = {'z': z, 'percentiles': np.asarray(percentiles)}
+        for key in list(chunks[0]):
+            # The chunks of the result are released once they are joined
+            results[key] = np.percentile(np.concatenate([chunk.pop(key) for chunk in chunks]), percentiles, axis=0)
+        return results
@@ -0,0 +1,352 @@
+import numpy as np
+from math import comb
+
+def subdivide(points, max_interval):
+    """
+    Spread arguments evenly between the sorted points, so that the distance between
+    consecutive arguments is no larger than max_interval. Every point is kept.
+
+    Args:
+        points (np.ndarray): Sorted, unique points.
+        max_interval (float): Maximal distance between consecutive arguments.
+    Returns:
+        (np.ndarray): Sorted arguments.
+    """
+    points = np.asarray(points, dtype=float)
+    lengths = np.diff(points)
+    counts = np.maximum(np.ceil(lengths / max_interval), 1).astype(int)
+    starts = np.repeat(points[:-1], counts)
+    steps = np.repeat(lengths / counts, counts)
+    indices = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.append(starts + indices * steps, points[-1])
+
+class PiecewisePolynomial:
+    """
+    Function of z defined by sorted breakpoints and a table of polynomial coefficients.
+
+    On the interval [breakpoints[i], breakpoints[i+1]) the function is equal to
+    sum(coefficients[i, k] * (z - breakpoints[i])**k). The intervals are right-continuous,
+    the last one is closed. Point evaluation costs a single binary search and the extrema
+    and roots are found in closed form for every interval, so the function does not have
+    to be sampled densely.
+    """
+    def __init__(self, breakpoints, coefficients):
+        self.breakpoints = np.asarray(breakpoints, dtype=float)
+        self.coefficients = np.atleast_2d(np.asarray(coefficients, dtype=float))
+
+    @classmethod
+    def from_singularity_functions(cls, start, end, *terms):
+        """
+        Create the function equal to the sum of singularity functions values * <z - positions>^order on [start, end].
+
+        Args:
+            start (float): Start of the function domain.
+            end (float): End of the function domain.
+            terms (tuple): Every term is a tuple (positions, values, order).
+        Returns:
+            (PiecewisePolynomial): The sum of the singularity functions.
+        """
+        return cls(*cls.singularity_functions_coefficients(start, end, *terms))
+
+    @classmethod
+    def stack_from_singularity_functions(cls, start, end, *terms):
+        """
+        Create the functions of several load cases (e.g. the planes of the shaft) at once - the values of every term
+        have the shape (cases, positions) and the coefficients of all the cases are calculated in a single pass.
+
+        Args:
+            start (float): Start of the functions domain.
+            end (float): End of the functions domain.
+            terms (tuple): Every term is a tuple (positions, values, order).
+        Returns:
+            (list): Functions of the cases, sharing the breakpoints.
+        """
+        breakpoints, coefficients = cls.singularity_functions_coefficients(start, end, *terms)
+        return [cls(breakpoints, case_coefficients) for case_coefficients in coefficients]
+
+    @staticmethod
+    def singularity_functions_coefficients(start, end, *terms):
+        """
+        Args:
+            start (float): Start of the function domain.
+            end (float): End of the function domain.
+            terms (tuple): Every term is a tuple (positions, values, order) - the values may have leading axes of the load cases.
+        Returns:
+            (tuple): Breakpoints and coefficients of shape (..., intervals, order + 1) of the sum of the singularity functions.
+        """
+        terms = [(np.asarray(positions, dtype=float), np.asarray(values, dtype=float), order) for positions, values, order in terms]
+        positions = np.concatenate([term[0] for term in terms] + [np.empty(0)])
+        breakpoints = np.unique(np.concatenate(([start, end], positions[(positions > start) & (positions < end)])))
+        left = breakpoints[:-1, np.newaxis]
+
+        max_order = max([term[2] for term in terms], default=0)
+        cases_shape = np.broadcast_shapes(*[term[1].shape[:-1] for term in terms])
+        coefficients = np.zeros(cases_shape + (len(breakpoints) - 1, max_order + 1))
+        for positions, values, order in terms:
+            # <z - a>^n = sum(C(n, k) * (z - b)^k * (b - a)^(n-k)) for every load acting at or before b
+            distance = left - positions
+            active = distance >= 0
+            values = values[..., np.newaxis, :]
+            for k in range(order + 1):
+                coefficients[..., k] += np.sum(np.where(active, comb(order, k) * values * distance**(order - k), 0), axis=-1)
+
+        return breakpoints, coefficients
+
+    @property
+    def order(self):
+        return self.coefficients.shape[1] - 1
+
+    @property
+    def domain(self):
+        return self.breakpoints[0], self.breakpoints[-1]
+
+    def _find_intervals(self, z):
+        return np.clip(np.searchsorted(self.breakpoints, z, side='right') - 1, 0, len(self.coefficients) - 1)
+
+    def _evaluate_local(self, intervals, local_z):
+        result = np.zeros(np.shape(local_z))
+        for k in range(self.order, -1, -1):
+            result = result * local_z + self.coefficients[intervals, k]
+        return result
+
+    def __call__(self, z):
+        z = np.asarray(z, dtype=float)
+        intervals = self._find_intervals(z)
+        return self._evaluate_local(intervals, z - self.breakpoints[intervals])
+
+    def left_limit(self, z):
+        """
+        Args:
+            z (np.ndarray): Arguments.
+        Returns:
+            (np.ndarray): Limits of the function from the left side of the arguments.
+        """
+        z = np.asarray(z, dtype=float)
+        intervals = np.clip(np.searchsorted(self.breakpoints, z, side='left') - 1, 0, len(self.coefficients) - 1)
+        return self._evaluate_local(intervals, z - self.breakpoints[intervals])
+
+    @staticmethod
+    def evaluate_stacked(functions, z, left_limits=False):
+        """
+        Evaluate several functions at the same arguments at once - the intervals of the arguments are found
+        a single time if the functions share the breakpoints.
+
+        Args:
+            functions (list): Piecewise polynomial functions.
+            z (np.ndarray): Arguments.
+            left_limits (bool): If True, the limits of the functions from the left side of the arguments are returned.
+        Returns:
+            (np.ndarray): Values of the functions of shape (functions, z).
+        """
+        breakpoints = functions[0].breakpoints
+        if not all(np.array_equal(function.breakpoints, breakpoints) for function in functions[1:]):
+            breakpoints = np.unique(np.concatenate([function.breakpoints for function in functions]))
+            functions = [function._rebase(breakpoints) for function in functions]
+        order = max(function.order for function in functions)
+        coefficients = np.zeros((len(functions), len(breakpoints) - 1, order + 1))
+        for case_coefficients, function in zip(coefficients, functions):
+            case_coefficients[:, :function.order + 1] = function.coefficients
+
+        z = np.asarray(z, dtype=float)
+        intervals = np.clip(np.searchsorted(breakpoints, z, side='left' if left_limits else 'right') - 1, 0, len(breakpoints) - 2)
+        local_z = z - breakpoints[intervals]
+        result = np.zeros((len(functions),) + z.shape)
+        for k in range(order, -1, -1):
+            result = result * local_z + coefficients[:, intervals, k]
+        return result
+
+    def _rebase(self, breakpoints):
+        # Express the function with the coefficients related to the given breakpoints (a superset of its own)
+        left = breakpoints[:-1]
+        intervals = self._find_intervals(left)
+        shift = left - self.breakpoints[intervals]
+        coefficients = np.zeros((len(left), self.order + 1))
+        for k in range(self.order + 1):
+            for j in range(k + 1):
+                coefficients[:, j] += self.coefficients[intervals, k] * comb(k, j) * shift**(k - j)
+        return PiecewisePolynomial(breakpoints, coefficients)
+
+    def _align(self, other):
+        breakpoints = np.union1d(self.breakpoints, other.breakpoints)
+        return self._rebase(breakpoints), other._rebase(breakpoints)
+
+    def __add__(self, other):
+        if isinstance(other, PiecewisePolynomial):
+            first, second = self._align(other)
+            order = max(first.order, second.order)
+            coefficients = np.zeros((len(first.coefficients), order + 1))
+            coefficients[:, :first.order + 1] += first.coefficients
+            coefficients[:, :second.order + 1] += second.coefficients
+            return PiecewisePolynomial(first.breakpoints, coefficients)
+        coefficients = self.coefficients.copy()
+        coefficients[:, 0] += other
+        return PiecewisePolynomial(self.breakpoints, coefficients)
+
+    def __radd__(self, other):
+        return self + other
+
+    def __neg__(self):
+        return PiecewisePolynomial(self.breakpoints, -self.coefficients)
+
+    def __sub__(self, other):
+        return self + (-other)
+
+    def __rsub__(self, other):
+        return -self + other
+
+    def __mul__(self, other):
+        if isinstance(other, PiecewisePolynomial):
+            first, second = self._align(other)
+            coefficients = np.zeros((len(first.coefficients), first.order + second.order + 1))
+            for k in range(first.order + 1):
+                for j in range(second.order + 1):
+                    coefficients[:, k + j] += first.coefficients[:, k] * second.coefficients[:, j]
+            return PiecewisePolynomial(first.breakpoints, coefficients)
+        return PiecewisePolynomial(self.breakpoints, self.coefficients * other)
+
+    def __rmul__(self, other):
+        return self * other
+
+    def derivative(self):
+        """
+        Returns:
+            (PiecewisePolynomial): Derivative of the function inside the intervals.
+        """
+        if self.order == 0:
+            return PiecewisePolynomial(self.breakpoints, np.zeros_like(self.coefficients))
+        return PiecewisePolynomial(self.breakpoints, self.coefficients[:, 1:] * np.arange(1, self.order + 1))
+
+    def antiderivative(self):
+        """
+        Returns:
+            (PiecewisePolynomial): Continuous antiderivative of the function equal to 0 at the start of the domain.
+        """
+        coefficients = np.zeros((len(self.coefficients), self.order + 2))
+        coefficients[:, 1:] = self.coefficients / np.arange(1, self.order + 2)
+        lengths = np.diff(self.breakpoints)
+        increments = PiecewisePolynomial(self.breakpoints, coefficients)._evaluate_local(np.arange(len(lengths)), lengths)
+        coefficients[:, 0] = np.concatenate(([0], np.cumsum(increments)[:-1]))
+        return PiecewisePolynomial(self.breakpoints, coefficients)
+
+    def restrict(self, start, end):
+        """
+        Args:
+            start (float): Start of the new domain.
+            end (float): End of the new domain.
+        Returns:
+            (PiecewisePolynomial): The function restricted to [start, end].
+        """
+        inner = self.breakpoints[(self.breakpoints > start) & (self.breakpoints < end)]
+        return self._rebase(np.unique(np.concatenate(([start, end], inner))))
+
+    def roots(self):
+        """
+        Returns:
+            (np.ndarray): Sorted arguments at which the function is equal to 0. Intervals on which
+                          the function is identically 0 are skipped.
+        """
+        if self.order > 2:
+            return self._find_roots_numerically()
+
+        # Solve the linear and quadratic equations of all intervals at once
+        coefficients = np.zeros((len(self.coefficients), 3))
+        coefficients[:, :self.order + 1] = self.coefficients
+        c0, c1, c2 = coefficients.T
+        candidates = np.full((len(c0), 2), np.nan)
+
+        linear = (c2 == 0) & (c1 != 0)
+        candidates[linear, 0] = -c0[linear] / c1[linear]
+
+        discriminant = c1**2 - 4 * c2 * c0
+        quadratic = (c2 != 0) & (discriminant >= 0)
+        # Numerically stable form of the quadratic formula
+        q = -0.5 * (c1[quadratic] + np.copysign(np.sqrt(discriminant[quadratic]), c1[quadratic]))
+        candidates[quadratic, 0] = q / c2[quadratic]
+        candidates[quadratic, 1] = np.divide(c0[quadratic], q, out=q / c2[quadratic], where=q != 0)
+
+        lengths = np.diff(self.breakpoints)[:, np.newaxis]
+        with np.errstate(invalid='ignore'):
+            valid = (candidates >= 0) & (candidates <= lengths)
+        return np.unique((self.breakpoints[:-1, np.newaxis] + candidates)[valid])
+
+    def _find_roots_numerically(self):
+        # Eigenvalues of the companion matrices (as in np.roots) of all the intervals with the same degree at once
+        coefficients = self.coefficients
+        nonzero = coefficients != 0
+        # Degree of every interval and the number of its roots at the left end (the lowest zero coefficients)
+        degrees = np.where(nonzero.any(axis=1), self.order - np.argmax(nonzero[:, ::-1], axis=1), 0)
+        zero_roots = np.argmax(nonzero, axis=1)
+        lengths = np.diff(self.breakpoints)
+        roots = [self.breakpoints[:-1][(degrees >= 1) & (zero_roots > 0)]]
+        for degree, zeros in set(zip(degrees - zero_roots, zero_roots)):
+            intervals = np.flatnonzero((degrees - zero_roots == degree) & (zero_roots == zeros) & (degrees >= 1))
+            if degree < 1 or len(intervals) == 0:
+                continue
+            polynomials = coefficients[intervals, zeros:zeros + degree + 1][:, ::-1]
+            companion = np.zeros((len(intervals), degree, degree))
+            companion[:, 1:, :-1] = np.eye(degree - 1)
+            companion[:, 0, :] = -polynomials[:, 1:] / polynomials[:, :1]
+            local_roots = np.linalg.eigvals(companion)
+            scale = np.maximum(1, np.abs(local_roots.real))
+            valid = (np.abs(local_roots.imag) <= 1e-9 * scale) & (local_roots.real >= 0) & (local_roots.real <= lengths[intervals, np.newaxis])
+            roots.append((self.breakpoints[intervals, np.newaxis] + local_roots.real)[valid])
+        return np.unique(np.concatenate(roots))
+
+    def extrema(self):
+        """
+        Find the candidates for the extrema of the function: the interval ends (with the limits from
+        both sides of every breakpoint) and the zeros of the derivative inside the intervals.
+
+        Returns:
+            (tuple): Arguments and values of the candidates.
+        """
+        lengths = np.diff(self.breakpoints)
+        intervals = np.arange(len(lengths))
+
+        stationary_points = self.derivative().roots()
+        stationary_intervals = self._find_intervals(stationary_points)
+
+        z = np.concatenate((self.breakpoints[:-1], self.breakpoints[1:], stationary_points))
+        values = np.concatenate((self.coefficients[:, 0],
+                                 self._evaluate_local(intervals, lengths),
+                                 self._evaluate_local(stationary_intervals, stationary_points - self.breakpoints[stationary_intervals])))
+        return z, values
+
+    def maximum(self):
+        """
+        Returns:
+            (tuple): Argument and value of the maximum of the function.
+        """
+        z, values = self.extrema()
+        idx = np.argmax(values)
+        return z[idx], values[idx]
+
+    def minimum(self):
+        """
+        Returns:
+            (tuple): Argument and value of the minimum of the function.
+        """
+        z, values = self.extrema()
+        idx = np.argmin(values)
+        return z[idx], values[idx]
+
+    def max_abs(self):
+        """
+        Returns:
+            (tuple): Argument and value of the extremum with the largest absolute value.
+        """
+        z, values = self.extrema()
+        idx = np.argmax(np.abs(values))
+        return z[idx], values[idx]
+
+    def resample(self, max_interval):
+        """
+        Sample the function at every breakpoint and evenly in between.
+
+        Args:
+            max_interval (float): Maximal distance between the samples.
+        Returns:
+            (tuple): Arguments and values of the function.
+        """
+        z = subdivide(self.breakpoints, max_interval)
+        return z, self(z)
@@ -184,6 +184,32 @@ class ShaftCalculator:
 
         return self.limits
 
+    def get_sections_bounds(self):
+        """
+        Get the bounds of the shaft sections beside the eccentrics - requires the designed eccentrics.
+
+        Returns:
+            (dict): Start and end [mm] of every section, the direction of the subsections numbering (1 along z, -1 otherwise)
+                    and the limits of its first subsection.
+        """
+        Li = self._shaft_attributes['Li']
+        Bx = self._shaft_attributes['Bx']
+        section_names = ['Przed Mimośrodami'] + (['Pomiędzy Mimośrodami'] if len(Li) >= 2 else []) + ['Za Mimośrodami']
+        limits = self.calculate_limits({section_name: [None] for section_name in section_names})
+
+        sections_bounds = {}
+        for section_name in section_names:
+            section_limits = limits[section_name][0]
+            length = section_limits['l']['max']
+            if section_name == 'Przed Mimośrodami':
+                end = Li[0] - 0.5 * Bx[0]
+                sections_bounds[section_name] = (end - length, end, -1, section_limits)
+            else:
+                start = Li[0] + 0.5 * Bx[0] if section_name == 'Pomiędzy Mimośrodami' else Li[-1] + 0.5 * Bx[-1]
+                sections_bounds[section_name] = (start, start + length, 1, section_limits)
+
+        return sections_bounds
+
     def calculate_bearings(self, bearing_attributes={}):
         self._set_bearings_attributes(bearing_attributes)
 
@@ -0,0 +1,142 @@
+import copy
+import numpy as np
+
+class ShaftOptimizer():
+    """
+    Propose the shaft steps of the sections next to the eccentrics with the minimal mass,
+    which stay above the envelope of the minimal diameters.
+
+    Every section is divided at candidate coordinates spread evenly along it. The diameter of a step
+    is the maximum of the envelope over the step rounded up, so the mass of every possible step
+    (candidate i to candidate j) forms one matrix. The best layouts with 1, 2, ... steps are found by
+    dynamic programming - every layer scores all the layouts ending at all the candidates at once.
+    """
+    def __init__(self, length_increment=1, diameter_increment=0.5, max_candidates=400):
+        """
+        Args:
+            length_increment (float): Increment of the steps lengths [mm].
+            diameter_increment (float): Increment of the steps diameters [mm].
+            max_candidates (int): Maximal number of the candidate coordinates in a section - the length
+                                  increment is enlarged for longer sections.
+        """
+        self._length_increment = length_increment
+        self._diameter_increment = diameter_increment
+        self._max_candidates = max_candidates
+
+    def _get_candidates(self, start, end):
+        # Candidates are spread from the eccentric, so that only the last step has the remaining length
+        length = end - start
+        increment = max(self._length_increment, np.ceil(length / self._max_candidates / self._length_increment) * self._length_increment)
+        distances = np.arange(0, length, increment)
+        return np.append(distances, length)
+
+    def _get_steps_diameters(self, candidates, z, d_min, limits):
+        # Maximum of the envelope between every pair of consecutive candidates, including both of them
+        inner = z[(z > candidates[0]) & (z < candidates[-1])]
+        arguments = np.union1d(candidates, inner)
+        values = np.interp(arguments, z, d_min)
+        indices = np.searchsorted(arguments, candidates)
+        blocks = np.maximum(np.maximum.reduceat(values, indices[:-1]), values[indices[1:]])
+
+        # Maximum of the envelope over every possible step (from candidate i to candidate j > i)
+        count = len(candidates)
+        maxima = np.where(np.arange(count - 1) >= np.arange(count - 1)[:, np.newaxis], blocks, -np.inf)
+        maxima = np.maximum.accumulate(maxima, axis=1)
+
+        diameters = np.ceil(np.round(maxima / self._diameter_increment, 9)) * self._diameter_increment
+        return np.clip(diameters, limits['d']['min'], limits['d']['max'])
+
+    def _optimize_section(self, start, end, direction, z, d_min, limits, max_steps):
+        # Measure the coordinates from the eccentric
+        if direction > 0:
+            distances, envelope = z - start, d_min
+        else:
+            distances, envelope = (end - z)[::-1], d_min[::-1]
+        candidates = self._get_candidates(start, end)
+        count = len(candidates)
+        diameters = self._get_steps_diameters(candidates, distances, envelope, limits)
+
+        # Mass of every possible step is proportional to l * d^2: costs[i, j] for the step from candidate i to candidate j + 1
+        lengths = candidates[1:] - candidates[:-1, np.newaxis]
+        costs = np.where(np.isfinite(diameters), np.maximum(lengths, 0) * diameters**2, np.inf)
+
+        # Dynamic programming over the number of steps - best[j] is the minimal mass of the layout ending at candidate j + 1
+        best = costs[0].copy()
+        layers = [(best.copy(), None)]
+        for _ in range(max_steps - 1):
+            totals = np.concatenate(([np.inf], best[:-1]))[:, np.newaxis] + costs
+            previous = np.argmin(totals, axis=0)
+            best = totals[previous, np.arange(count - 1)]
+            layers.append((best.copy(), previous))
+
+        # Choose the number of steps with the minimal mass and trace the layout back
+        steps_number = int(np.argmin([layer[0][-1] for layer in layers]))
+        ends = [count - 1]
+        for layer_idx in range(steps_number, 0, -1):
+            ends.append(layers[layer_idx][1][ends[-1] - 1])
+        ends = [0] + ends[::-1]
+
+        steps = []
+        for step_start, step_end in zip(ends[:-1], ends[1:]):
+            diameter = diameters[step_start, step_end - 1]
+            length = candidates[step_end] - candidates[step_start]
+            if steps and steps[-1]['d'] == diameter:
+                steps[-1]['l'] += length
+            else:
+                steps.append({'d': float(diameter), 'l': float(length)})
+        # The last step gets the remaining length of the section
+        steps[-1]['l'] = float(limits['l']['max'] - sum(step['l'] for step in steps[:-1]))
+        return steps
+
+    def optimize(self, sections_bounds, z, d_min, max_steps):
+        """
+        Args:
+            sections_bounds (dict): For every section - start and end [mm] of the section, the direction (1 if the steps are numbered
+                                    along z, -1 otherwise) and the limits of the first subsection from ShaftCalculator.calculate_limits.
+            z (np.ndarray): Arguments of the minimal diameters envelope [mm].
+            d_min (np.ndarray): Minimal diameters envelope [mm].
+            max_steps (int): Maximal number of the steps in every section.
+        Returns:
+            (dict): Steps of every section - {section_name: {subsection_number: {'d': d, 'l': l}}}, numbered from the eccentric.
+        """
+        sections = {}
+        for section_name, (start, end, direction, limits) in sections_bounds.items():
+            if end - start <= 0:
+                continue
+            steps = self._optimize_section(start, end, direction, z, d_min, limits, max_steps)
+            sections[section_name] = {idx: step for idx, step in enumerate(steps)}
+        return sections
+
+    def optimize_shaft(self, shaft_calculator, functions_calculator, max_steps, max_iterations=10):
+        """
+        Propose the steps of the shaft with the designed eccentrics. The minimal diameters by the deflection conditions
+        depend on the designed steps, so the layout is recalculated with the envelope of all the proposed shafts
+        until it does not change - the envelope only grows, so the final layout stays above its own minimal diameters.
+
+        Args:
+            shaft_calculator (ShaftCalculator): Calculator of the shaft with the designed eccentrics.
+            functions_calculator (FunctionsCalculator): Calculator with the initial functions of the shaft.
+            max_steps (int): Maximal number of the steps in every section.
+            max_iterations (int): Maximal number of the recalculations of the layout.
+        Returns:
+            (dict): Steps of every section - {section_name: {subsection_number: {'d': d, 'l': l}}}, numbered from the eccentric.
+        """
+        sections_bounds = shaft_calculator.get_sections_bounds()
+        proposed_shaft = copy.deepcopy(shaft_calculator)
+        sections = None
+        envelopes = []
+        for _ in range(max_iterations):
+            functions = functions_calculator.get_shaft_functions()
+            z = functions['z']
+            envelopes.append((z, functions['dmin(z)']['dmin']['function'].copy()))
+            d_min = np.max([np.interp(z, *envelope) for envelope in envelopes], axis=0)
+
+            new_sections = self.optimize(sections_bounds, z, d_min, max_steps)
+            if new_sections == sections:
+                break
+            sections = new_sections
+            # Calculate the minimal diameters of the proposed shaft
+            proposed_shaft.shaft_sections = {'Mimośrody': shaft_calculator.shaft_sections['Mimośrody'], **copy.deepcopy(sections)}
+            proposed_shaft.calculate_shaft_sections()
+            functions_calculator.calculate_remaining_functions(proposed_shaft.get_shaft_attributes())
+        return sections
@@ -0,0 +1,65 @@
+import numpy as np
+
+from ShaftDesigner.model.PiecewisePolynomial import PiecewisePolynomial
+
+class TransferMatrixCalculator():
+    """
+    Calculate the deflection of the stepped shaft directly, without the equivalent smooth shaft.
+
+    The shaft is divided into fields at the shaft steps, the forces and the supports. The bending moment
+    is known from the statics and every field has a constant stiffness EIj, so the state (f, θ) is transferred
+    over a field of length l by:
+        θ1 = θ0 + (M0 * l + Q * l^2 / 2) / EIj
+        f1 = f0 + θ0 * l + (M0 * l^2 / 2 + Q * l^3 / 6) / EIj
+    The transfer is linear in the initial state (f(0), θ(0)), which is found from the conditions f(LA) = f(LB) = 0.
+    The cost is proportional to the number of fields and the result is exact - the deflection of every
+    field is the cubic polynomial given above.
+    """
+    def calculate_deflection(self, shaft_steps, moments_of_inertia, E, bending_moments, cutting_forces, LA, LB):
+        """
+        Args:
+            shaft_steps (list): Shaft steps - dicts with the step start 'z' and length 'l' [mm], sorted by 'z'.
+            moments_of_inertia (iterable): Moment of inertia of every shaft step [m^4].
+            E (float): Young modulus [Pa].
+            bending_moments (list): Bending moment [Nm] of every plane as a function of z [mm] (PiecewisePolynomial).
+            cutting_forces (list): Shear force [N] of every plane as a function of z [mm] (PiecewisePolynomial).
+            LA (float): Coordinate of the support A [mm].
+            LB (float): Coordinate of the support B [mm].
+        Returns:
+            (tuple): Lists of the angle θ(z) [rad] and the deflection f(z) [m] of every plane as piecewise polynomials of z [mm].
+        """
+        starts = np.array([step['z'] for step in shaft_steps], dtype=float)
+        L = shaft_steps[-1]['z'] + shaft_steps[-1]['l']
+
+        # Nodes of the fields - the bending moment is linear and the stiffness is constant between them
+        nodes = np.unique(np.concatenate([starts, [L, LA, LB]] + [function.breakpoints for function in (*bending_moments, *cutting_forces)]))
+        nodes = nodes[(nodes >= 0) & (nodes <= L)]
+        left = nodes[:-1]
+        lengths = np.diff(nodes) * 0.001
+
+        # The planes are the rows of the arrays - they are transferred at once
+        EI = E * np.asarray(moments_of_inertia, dtype=float)[np.searchsorted(starts[1:], left, side='right')]
+        M0 = PiecewisePolynomial.evaluate_stacked(bending_moments, left)
+        Q = PiecewisePolynomial.evaluate_stacked(cutting_forces, left)
+
+        # Transfer of the state (f, θ) with the zero initial state - the particular solution
+        angle_increments = (M0 * lengths + Q * lengths**2 / 2) / EI
+        angles = np.concatenate((np.zeros((len(M0), 1)), np.cumsum(angle_increments, axis=1)), axis=1)
+        deflection_increments = angles[:, :-1] * lengths + (M0 * lengths**2 / 2 + Q * lengths**3 / 6) / EI
+        deflections = np.concatenate((np.zeros((len(M0), 1)), np.cumsum(deflection_increments, axis=1)), axis=1)
+
+        # Initial state from the support conditions: f0 + θ0 * z + f_particular(z) = 0 at z = LA and z = LB (both are nodes)
+        fA, fB = deflections[:, np.searchsorted(nodes, [LA, LB])].T
+        theta0 = -(fB - fA) / ((LB - LA) * 0.001)
+        f0 = -fA - theta0 * LA * 0.001
+
+        angles += theta0[:, np.newaxis]
+        deflections += f0[:, np.newaxis] + theta0[:, np.newaxis] * nodes * 0.001
+
+        # Local polynomials of the fields in z [mm]
+        scale = 0.001**np.arange(4)
+        deflection_coefficients = np.stack((deflections[:, :-1], angles[:, :-1], M0 / (2 * EI), Q / (6 * EI)), axis=-1) * scale
+        angle_coefficients = np.stack((angles[:, :-1], M0 / EI, Q / (2 * EI)), axis=-1) * scale[:3]
+
+        return ([PiecewisePolynomial(nodes, coefficients) for coefficients in angle_coefficients],
+                [PiecewisePolynomial(nodes, coefficients) for coefficients in deflection_coefficients])
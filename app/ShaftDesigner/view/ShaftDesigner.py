@@ -1,6 +1,6 @@
 from PyQt6.QtCore import Qt, QSize
 from PyQt6.QtGui import QFont, QIcon 
-from PyQt6.QtWidgets import (QHBoxLayout, QMainWindow, QSizePolicy, QSpacerItem, QPushButton,
+from PyQt6.QtWidgets import (QComboBox, QHBoxLayout, QInputDialog, QMainWindow, QSizePolicy, QSpacerItem, QPushButton,
                              QVBoxLayout, QWidget, QScrollArea)
 
 from ShaftDesigner.view.Chart.Chart import Chart
@@ -218,6 +218,20 @@ class ShaftDesigner(QMainWindow):
         self._toggle_bearings_plot_button.clicked.connect(self._toggle_bearings)
         self.toolbar_layout.addWidget(self._toggle_bearings_plot_button)
 
+        # Set button for proposing the shaft steps
+        self.optimize_shaft_button = QPushButton(self)
+        self.optimize_shaft_button.setStyleSheet(self.toolbar_buttons_style)
+        self.optimize_shaft_button.setFixedHeight(30)
+        self.optimize_shaft_button.setText("Optymalizuj")
+        self.optimize_shaft_button.setToolTip("Zaproponuj stopnie wału o minimalnej masie")
+        self.toolbar_layout.addWidget(self.optimize_shaft_button)
+
+        # Set selector of the method of calculating the shaft deflection
+        self.deflection_method_selector = QComboBox(self)
+        self.deflection_method_selector.setFixedHeight(30)
+        self.deflection_method_selector.setToolTip("Metoda obliczania ugięć wału")
+        self.toolbar_layout.addWidget(self.deflection_method_selector)
+
         # Set button for confirming shaft project:
         self.confirm_draft_button = QPushButton(self)
         self.confirm_draft_button.setStyleSheet("""                         
@@ -302,6 +316,15 @@ class ShaftDesigner(QMainWindow):
                 section.deleteLater()
                 break
 
+    def get_max_steps_number(self):
+        """
+        Ask for the maximal number of the shaft steps in every section.
+
+        Returns:
+            (tuple): Number of the steps and True if it was accepted.
+        """
+        return QInputDialog.getInt(self, APP_NAME, 'Maksymalna liczba stopni w sekcji:', 3, 1, 10)
+
     def set_draft_finished_title(self, is_finished):
         if is_finished:
             self.setWindowTitle(self._window_title + ' (Projekt Zatwierdzony)')
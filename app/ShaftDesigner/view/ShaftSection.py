@@ -168,6 +168,14 @@ class ShaftSection(Section):
         
         self.remove_subsection_plot_signal.emit(self._name, subsection_number)
 
+    def clear_subsections(self):
+        # Remove all the subsections without removing their plots
+        for subsection in self.subsections:
+            self._content_layout.removeWidget(subsection)
+            subsection.deleteLater()
+        self.subsections = []
+        self.subsection_count = 0
+
     def set_limits(self, limits):
         for subsection_number, attributes in limits.items():
             self.subsections[subsection_number].set_limits(attributes)
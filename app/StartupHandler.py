@@ -1,9 +1,7 @@
 
-import json
-import os
-
 from PyQt6.QtWidgets import QFileDialog
 
+from Core.ProjectFile import get_project_title, read_project_file
 from StartupWindow import StartupWindow
 from Utility.MessageHandler import MessageHandler
 
@@ -25,7 +23,7 @@ class StartupHandler():
         result = self._is_data_valid(data)
         if result:
             self.new_project = False
-            self._project_title = self._get_project_title(self.file_path)
+            self._project_title = get_project_title(self.file_path)
             self._startup_window.accept()
 
     def _load_json_data(self):
@@ -34,8 +32,7 @@ class StartupHandler():
         if file_dialog.exec():
             self.file_path = file_dialog.selectedFiles()[0]
             try:
-                with open(self.file_path, 'r') as read_file:
-                    data = json.load(read_file)
+                data = read_project_file(self.file_path)
                 MessageHandler.information(self._startup_window, 'Dane Wczytane', 'Dane zostały wczytane.')
             except Exception as e:
                 MessageHandler.critical(self._startup_window, 'Błąd', f'Wystąpił błąd podczas wczytywania pliku: {str(e)}')
@@ -52,9 +49,6 @@ class StartupHandler():
             MessageHandler.critical(self._startup_window, 'Błąd', f'Wczytane dane są niepoprawne.')
             return False
 
-    def _get_project_title(self, file_path):
-        return os.path.splitext(os.path.basename(file_path))[0]
-    
     def startup(self):
         self.new_project = True
         result = self._startup_window.exec()
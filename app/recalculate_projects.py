@@ -0,0 +1,84 @@
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from Core.ProjectRecalculator import ProjectRecalculator, recalculate_project_file
+from DbHandler.model.ResultStore import ResultStore
+
+def get_project_files(paths):
+    """
+    Args:
+        paths (list): Directories with the project files, paths or glob patterns of the project files.
+    Returns:
+        (list): Sorted paths of the project files.
+    """
+    files = set()
+    for path in paths:
+        if os.path.isdir(path):
+            files.update(glob.glob(os.path.join(path, '*.json')))
+        else:
+            files.update(glob.glob(path))
+    return sorted(files)
+
+def write_summary_database(results, output_path, batch_size=1000):
+    # The summaries are appended to the results table - the rows are written in batches
+    columns = {'project': 'TEXT', 'file': 'TEXT', **dict.fromkeys(ProjectRecalculator.summary_keys, 'REAL'), 'error': 'TEXT'}
+    with ResultStore(output_path, columns=columns) as store:
+        batch = []
+        for result in results:
+            batch.append(result)
+            if len(batch) == batch_size:
+                store.writeResults(batch)
+                batch = []
+            yield result
+        store.writeResults(batch)
+
+def write_summary(results, output_path, output_format):
+    if output_format == 'sqlite':
+        yield from write_summary_database(results, output_path)
+        return
+    fieldnames = ['project', 'file', *ProjectRecalculator.summary_keys, 'error']
+    with open(output_path, 'w', newline='', encoding='utf-8') as output_file:
+        if output_format == 'csv':
+            writer = csv.DictWriter(output_file, fieldnames=fieldnames)
+            writer.writeheader()
+        for result in results:
+            if output_format == 'csv':
+                writer.writerow(result)
+            else:
+                output_file.write(json.dumps(result, ensure_ascii=False) + '\n')
+            yield result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Przelicz zapisane projekty bez interfejsu graficznego.')
+    parser.add_argument('paths', nargs='+', help='Katalogi, ścieżki lub wzorce glob plików projektów (.json)')
+    parser.add_argument('-o', '--output', required=True, help='Plik podsumowania (.csv, .jsonl lub baza danych .db)')
+    parser.add_argument('-f', '--format', choices=('csv', 'jsonl', 'sqlite'), help='Format podsumowania - domyślnie na podstawie rozszerzenia pliku')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='Liczba procesów - domyślnie liczba procesorów')
+    args = parser.parse_args(argv)
+
+    files = get_project_files(args.paths)
+    if not files:
+        sys.stderr.write('Nie znaleziono plików projektów.\n')
+        return 1
+    extensions_formats = {'.jsonl': 'jsonl', '.db': 'sqlite', '.sqlite': 'sqlite'}
+    output_format = args.format or extensions_formats.get(os.path.splitext(args.output)[1], 'csv')
+
+    # The projects are recalculated in parallel and their results are written in the order of the files
+    errors = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        results = executor.map(recalculate_project_file, files, chunksize=max(1, len(files) // (8 * (args.workers or os.cpu_count()))))
+        for result in write_summary(results, args.output, output_format):
+            if result['error']:
+                errors += 1
+                sys.stderr.write(f"{result['file']}: {result['error']}\n")
+
+    print(f'Przeliczono projekty: {len(files) - errors}/{len(files)}')
+    return 1 if errors else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
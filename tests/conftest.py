@@ -0,0 +1,83 @@
+import copy
+import os
+import shutil
+import sys
+
+import pytest
+
+# The modules of the application are imported relative to the app directory - the same as when it runs
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app'))
+
+from DbHandler.model import DatabaseHandler as database_handler_module
+from DbHandler.model.CreateDatabase import DatabaseCreator
+from DbHandler.model.DatabaseHandler import DatabaseHandler
+from InputShaft.model.InputShaftCalculator import InputShaftCalculator
+
+MATERIAL = {'Oznaczenie': ['C45', ''], 'Rm': [700, 'MPa'], 'Re': [430, 'MPa'], 'Zgj': [580, 'MPa'], 'Zgo': [250, 'MPa'],
+            'Zsj': [330, 'MPa'], 'Zso': [150, 'MPa'], 'E': [210000, 'MPa'], 'G': [80750, 'MPa'], 'g': [7860, 'kg/m3']}
+
+def create_component_data(L=300, LA=20, LB=280, L1=120, n=2, **values):
+    """
+    Args:
+        L, LA, LB, L1 (float): Coordinates of the shaft [mm].
+        n (int): Number of the eccentrics.
+        values: Values of the other data keys, e.g. Mwe=30.
+    Returns:
+        (dict): Component data of InputShaftCalculator prepared the same way as by the preliminary data tab.
+    """
+    calculator = InputShaftCalculator()
+    data = calculator.get_data()
+    for key, value in dict(L=L, LA=LA, LB=LB, L1=L1, n=n, xz=2, qdop=0.0044, tetadop=0.001, fdop=0.05, **values).items():
+        data[key][0] = value
+    data['Materiał'] = copy.deepcopy(MATERIAL)
+    calculator.set_initial_data()
+    for idx, position in enumerate(data['Lc'].values()):
+        position[0] = data['L1'][0] + (idx + 1) * (data['x'][0] + data['B'][0])
+    return data
+
+def create_shaft_steps(data, d=25, de=None, l_before=None):
+    """
+    Args:
+        data (dict): Component data - see create_component_data.
+        d (float): Diameter of the steps beside the eccentrics [mm].
+        de (float): Diameter of the eccentrics steps [mm] - by default d + 6.
+        l_before (float): Length of the first step - by default it ends at the first eccentric.
+    Returns:
+        (list): Shaft steps covering the whole shaft, the same as returned by ShaftCalculator.get_shaft_attributes.
+    """
+    de = d + 6 if de is None else de
+    B = data['B'][0]
+    positions = [data['L1'][0]] + [value[0] for value in data['Lc'].values()]
+    start = positions[0] - B / 2
+    steps = []
+    if l_before is not None and l_before < start:
+        steps.append({'z': 0, 'l': l_before, 'd': d + 2, 'e': 0})
+    steps.append({'z': steps[-1]['l'] if steps else 0, 'l': start - (steps[-1]['l'] if steps else 0), 'd': d, 'e': 0})
+    for idx, position in enumerate(positions):
+        if idx:
+            steps.append({'z': positions[idx - 1] + B / 2, 'l': position - positions[idx - 1] - B, 'd': d, 'e': 0})
+        steps.append({'z': position - B / 2, 'l': B, 'd': de, 'e': data['e'][0] * (-1)**idx})
+    steps.append({'z': positions[-1] + B / 2, 'l': data['L'][0] - positions[-1] - B / 2, 'd': d, 'e': 0})
+    return steps
+
+@pytest.fixture
+def component_data():
+    return create_component_data()
+
+@pytest.fixture(scope='session')
+def catalog_database_path(tmp_path_factory):
+    # The catalog is built from the csv files of the application into the temporary database
+    database_path = str(tmp_path_factory.mktemp('catalog') / 'baza_elementow.db')
+    DatabaseCreator(database_path).build()
+    return database_path
+
+@pytest.fixture
+def database_handler(catalog_database_path, tmp_path, monkeypatch):
+    """
+    Handler of the copy of the catalog, which is also returned by getDatabaseHandler - the tests can modify the catalog.
+    """
+    database_path = str(tmp_path / 'baza_elementow.db')
+    shutil.copyfile(catalog_database_path, database_path)
+    handler = DatabaseHandler(database_path)
+    monkeypatch.setattr(database_handler_module, '_databaseHandler', handler)
+    return handler
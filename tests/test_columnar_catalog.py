@@ -0,0 +1,138 @@
+import sqlite3
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from DbHandler.controller.DBController import ViewDbTablesController, ViewSelectItemController
+from DbHandler.model.ColumnarCatalog import ColumnarCatalog
+
+BEARINGS_TABLE = 'wał czynny-łożyska-podporowe-kulkowe'
+
+LIMITS = {
+    'no limits': {},
+    'inner diameter': {'Dw': {'min': 20, 'max': 30}},
+    'zero limit': {'Dw': {'min': 0, 'max': None}, 'B': {'min': None, 'max': 0}},
+    'two attributes': {'C': {'min': 10, 'max': None}, 'Dz': {'min': None, 'max': 62}},
+    'text column': {'elementy toczne': {'min': 'kulki', 'max': 'kulki'}},
+}
+
+def get_limits(database_handler, table_name, limits):
+    table_limits = database_handler.getTableItemsFilters(table_name)
+    for attribute, attribute_limits in limits.items():
+        table_limits[attribute].update(attribute_limits)
+    return table_limits
+
+@pytest.mark.parametrize('table_name', ['wał czynny-łożyska-podporowe-kulkowe', 'wał czynny-łożyska-centralne-igiełkowe'])
+@pytest.mark.parametrize('name', LIMITS)
+def test_filtered_results_match_the_database_query(database_handler, table_name, name):
+    limits = get_limits(database_handler, table_name, LIMITS[name])
+
+    results = ColumnarCatalog(database_handler).getFilteredResults(table_name, limits)
+
+    pd.testing.assert_frame_equal(results, database_handler.getFilteredResults(table_name, limits), check_dtype=False)
+
+def test_zero_limit_is_applied(database_handler):
+    catalog = ColumnarCatalog(database_handler)
+    all_items = database_handler.getFilteredResults(BEARINGS_TABLE, database_handler.getTableItemsFilters(BEARINGS_TABLE))
+
+    limits = get_limits(database_handler, BEARINGS_TABLE, {'Dw': {'min': None, 'max': 0}})
+
+    assert len(all_items) > 0
+    assert len(catalog.getFilteredResults(BEARINGS_TABLE, limits)) == 0
+    assert len(database_handler.getFilteredResults(BEARINGS_TABLE, limits)) == 0
+
+def add_items_with_missing_values(database_handler, table_name):
+    # Items with NULL in the numeric and the text columns
+    with sqlite3.connect(database_handler._databaseAbsPath) as connection:
+        connection.execute(f'INSERT INTO "{table_name}" VALUES (9990, 20, NULL, 12, 10.5, NULL, 20000, NULL)')
+        connection.execute(f'INSERT INTO "{table_name}" VALUES (9991, NULL, 47, NULL, NULL, 6.1, NULL, \'kulki\')')
+    connection.close()
+
+@pytest.mark.parametrize('limits', [{},
+                                    {'Dz': {'min': 40, 'max': None}},
+                                    {'Dw': {'min': 15, 'max': 25}, 'C0': {'min': None, 'max': 8}},
+                                    {'elementy toczne': {'min': 'kulki', 'max': None}, 'B': {'min': 10, 'max': None}},
+                                    {'elementy toczne': {'min': None, 'max': 'm'}, 'n max': {'min': 0, 'max': 30000}}])
+def test_missing_values_are_filtered_the_same_as_by_the_database(database_handler, limits):
+    add_items_with_missing_values(database_handler, BEARINGS_TABLE)
+    limits = get_limits(database_handler, BEARINGS_TABLE, limits)
+
+    results = ColumnarCatalog(database_handler).getFilteredResults(BEARINGS_TABLE, limits)
+
+    expected = database_handler.getFilteredResults(BEARINGS_TABLE, limits)
+    pd.testing.assert_frame_equal(results, expected, check_dtype=False)
+    if not any(attribute_limits['min'] is not None or attribute_limits['max'] is not None for attribute_limits in limits.values()):
+        assert {9990, 9991} <= set(results['Kod'])
+
+class LineEdit:
+    def __init__(self):
+        self.value = ''
+
+    def text(self):
+        return self.value
+
+def create_tables_window():
+    # Stand-in of the tables browser window with the widgets used by the controller
+    window = SimpleNamespace(results=[])
+    signal = SimpleNamespace(connect=lambda slot: None)
+    window.tablesTreeView = SimpleNamespace(tableSelectedSignal=signal, updateActiveTable=lambda table: None)
+    window.TableItemsView = SimpleNamespace(updateItemsView=window.results.append)
+    window.ItemsFiltersView = SimpleNamespace(filterResultsButton=SimpleNamespace(clicked=signal))
+
+    def view_filters(attributes):
+        window.ItemsFiltersView.filtersLineEdits = {attribute: {'min': LineEdit(), 'max': LineEdit()} for attribute, _ in attributes}
+    window.ItemsFiltersView.updateFiltersView = view_filters
+    window.viewTablesTree = lambda tables: None
+    window.viewFilters = view_filters
+    window.viewTableItems = window.results.append
+    return window
+
+def test_tables_browser_filters_the_items_of_the_active_table(database_handler):
+    window = create_tables_window()
+    controller = ViewDbTablesController(database_handler, window)
+    controller._switchActiveTableEvent(BEARINGS_TABLE)
+
+    # The empty filters do not limit the items
+    controller._updateResultsEvent()
+    pd.testing.assert_frame_equal(window.results[-1], database_handler.getFilteredResults(BEARINGS_TABLE, {}), check_dtype=False)
+
+    window.ItemsFiltersView.filtersLineEdits['Dw']['min'].value = '20'
+    window.ItemsFiltersView.filtersLineEdits['Dw']['max'].value = '30'
+    controller._updateResultsEvent()
+    limits = get_limits(database_handler, BEARINGS_TABLE, LIMITS['inner diameter'])
+    pd.testing.assert_frame_equal(window.results[-1], database_handler.getFilteredResults(BEARINGS_TABLE, limits), check_dtype=False)
+    assert 0 < len(window.results[-1]) < len(window.results[-2])
+
+def create_select_item_window():
+    # Stand-in of the item selection dialog with the widgets used by the controller
+    window = SimpleNamespace(results=[])
+    signal = SimpleNamespace(connect=lambda slot: None)
+    window.TableItemsView = SimpleNamespace(itemsTable=SimpleNamespace(itemClicked=signal), updateItemsView=window.results.append,
+                                            getItemCode=lambda item: item)
+    window.activeTableSelector = SimpleNamespace(currentIndexChanged=signal)
+    window.okBtn = SimpleNamespace(clicked=signal, setEnabled=lambda enabled: None)
+    window.cancelBtn = SimpleNamespace(clicked=signal)
+    window.viewActiveTableSelector = lambda tables: None
+    window.viewTableItems = window.results.append
+    window.viewFunctionButtons = lambda: None
+    return window
+
+def test_item_selection_shows_the_filtered_items_of_the_group(database_handler):
+    group = 'wał czynny-łożyska-podporowe'
+    limits = database_handler.getTableItemsFilters(group)
+    limits['Dw']['min'], limits['Dw']['max'] = 20, 30
+    window = create_select_item_window()
+
+    controller = ViewSelectItemController(database_handler, window, group, limits)
+    for idx in range(len(database_handler.getAvailableTables(group)) - 1, -1, -1):
+        controller._switchActiveTableEvent(idx)
+
+    tables = database_handler.getAvailableTables(group)
+    assert len(window.results) == len(tables) + 1
+    for table_name, results in zip([tables[0]] + tables[::-1], window.results):
+        pd.testing.assert_frame_equal(results, database_handler.getFilteredResults(table_name, limits), check_dtype=False)
+        assert len(results) > 0
+    code = window.results[-1].iloc[0, 0]
+    controller._selectItemEvent(code)
+    assert controller.selectedItemAttributes == database_handler.getSingleItem(tables[0], code)
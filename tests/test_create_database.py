@@ -0,0 +1,98 @@
+import copy
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+from config import resource_path
+from DbHandler.model.CreateDatabase import DatabaseCreator, database_tables
+from DbHandler.model.DatabaseHandler import SOURCES_TABLE_NAME
+
+TABLES_NAMES = ('wał czynny-łożyska-podporowe-kulkowe', 'wał czynny-elementy toczne-kulki')
+
+@pytest.fixture
+def tables(tmp_path):
+    # Definitions of the tables with the copies of their csv files - the absolute paths replace the paths relative to the data directory
+    tables = []
+    for table in database_tables:
+        if table['name'] in TABLES_NAMES:
+            table = copy.deepcopy(table)
+            csv_path = str(tmp_path / table['csvName'])
+            shutil.copyfile(resource_path(table['csvName']), csv_path)
+            table['csvName'] = csv_path
+            tables.append(table)
+    return tables
+
+def read_database(database_path):
+    # Rows of the tables, the schema and the recorded sources
+    with sqlite3.connect(database_path) as connection:
+        contents = {name: connection.execute(f'SELECT * FROM "{name}"').fetchall() for name in TABLES_NAMES}
+        contents['schema'] = sorted(connection.execute("SELECT name, sql FROM sqlite_master WHERE type IN ('table', 'index')").fetchall())
+        contents['sources'] = sorted(connection.execute(f'SELECT name, csvHash, definitionHash FROM "{SOURCES_TABLE_NAME}"').fetchall())
+    connection.close()
+    return contents
+
+def append_row(csv_path, row):
+    with open(csv_path, 'r+', encoding='utf-8') as file:
+        contents = file.read()
+        file.write(('' if contents.endswith('\n') else '\n') + row + '\n')
+
+def test_only_the_changed_tables_are_rebuilt(tables, tmp_path, monkeypatch):
+    database_path = str(tmp_path / 'catalog.db')
+    creator = DatabaseCreator(database_path, tables)
+
+    assert creator.build() == list(TABLES_NAMES)
+    assert creator.build() == []
+
+    append_row(tables[1]['csvName'], 'Ø99;99')
+    statements = []
+    sqlite_connect = sqlite3.connect
+    def connect(*args, **kwargs):
+        connection = sqlite_connect(*args, **kwargs)
+        connection.set_trace_callback(statements.append)
+        return connection
+    monkeypatch.setattr(sqlite3, 'connect', connect)
+    rebuilt_tables = creator.build()
+    monkeypatch.undo()
+
+    assert rebuilt_tables == [TABLES_NAMES[1]]
+    assert read_database(database_path)[TABLES_NAMES[1]][-1] == ('Ø99', 99)
+    # The table is rebuilt in a single transaction
+    assert statements[0] == 'BEGIN IMMEDIATE' and statements[-1] == 'COMMIT'
+    assert sum(statement in ('BEGIN IMMEDIATE', 'COMMIT') for statement in statements) == 2
+    assert not any(TABLES_NAMES[0] in statement for statement in statements if statement.startswith(('DROP', 'CREATE', 'INSERT INTO "wał')))
+
+def test_touched_source_is_not_rebuilt(tables, tmp_path):
+    creator = DatabaseCreator(str(tmp_path / 'catalog.db'), tables)
+    creator.build()
+
+    # The modification time changes, but the contents are the same - the hash is compared
+    stat = os.stat(tables[0]['csvName'])
+    os.utime(tables[0]['csvName'], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert creator.build() == []
+
+def test_changed_definition_is_rebuilt(tables, tmp_path):
+    database_path = str(tmp_path / 'catalog.db')
+    DatabaseCreator(database_path, tables).build()
+
+    tables[0]['indexes'] = tables[0]['indexes'][:1]
+
+    assert DatabaseCreator(database_path, tables).build() == [TABLES_NAMES[0]]
+    indexes = [name for name, _ in read_database(database_path)['schema'] if name.startswith(TABLES_NAMES[0] + '-')]
+    assert indexes == [f'{TABLES_NAMES[0]}-Dw']
+
+def test_failed_build_leaves_the_database_unchanged(tables, tmp_path):
+    database_path = str(tmp_path / 'catalog.db')
+    creator = DatabaseCreator(database_path, tables)
+    creator.build()
+    contents = read_database(database_path)
+
+    # The first table is rebuilt before the source of the second one fails
+    append_row(tables[0]['csvName'], '9999;10;26;8;4,75;1,96;40000;kulki')
+    append_row(tables[1]['csvName'], 'Ø99;99;1')
+    with pytest.raises(Exception):
+        creator.build()
+
+    assert read_database(database_path) == contents
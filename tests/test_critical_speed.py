@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from conftest import create_component_data
+from ShaftDesigner.model.FunctionsCalculator import FunctionsCalculator
+
+E = 210000 * 10**6
+DENSITY = 7860
+
+def calculate_critical_speed(data, shaft_steps):
+    calculator = FunctionsCalculator(initial_functions_cache_size=0)
+    calculator.calculate_initial_functions_and_attributes(data)
+    calculator.calculate_remaining_functions(shaft_steps)
+    return calculator.get_critical_speed()
+
+def first_critical_speed_by_finite_elements(shaft_steps, LA, LB, elements_per_mm=1):
+    # Beam elements with the cubic shape functions and the consistent mass matrices, pinned at the supports
+    nodes = np.unique(np.concatenate([np.linspace(step['z'], step['z'] + step['l'], int(step['l'] * elements_per_mm) + 1) for step in shaft_steps] + [[LA, LB]]))
+    starts = np.array([step['z'] for step in shaft_steps[1:]])
+    stiffness = np.zeros((2 * len(nodes),) * 2)
+    mass = np.zeros_like(stiffness)
+    for idx, l in enumerate(np.diff(nodes) * 0.001):
+        d = shaft_steps[np.searchsorted(starts, (nodes[idx] + nodes[idx + 1]) / 2)]['d'] * 0.001
+        EI = E * np.pi * d**4 / 64
+        m = DENSITY * np.pi * d**2 / 4
+        k = EI / l**3 * np.array([[12, 6*l, -12, 6*l], [6*l, 4*l**2, -6*l, 2*l**2], [-12, -6*l, 12, -6*l], [6*l, 2*l**2, -6*l, 4*l**2]])
+        M = m * l / 420 * np.array([[156, 22*l, 54, -13*l], [22*l, 4*l**2, 13*l, -3*l**2], [54, 13*l, 156, -22*l], [-13*l, -3*l**2, -22*l, 4*l**2]])
+        dofs = slice(2 * idx, 2 * idx + 4)
+        stiffness[dofs, dofs] += k
+        mass[dofs, dofs] += M
+    free = np.setdiff1d(np.arange(2 * len(nodes)), 2 * np.searchsorted(nodes, [LA, LB]))
+    eigenvalues = np.linalg.eigvals(np.linalg.solve(mass[np.ix_(free, free)], stiffness[np.ix_(free, free)]))
+    return np.sqrt(np.min(eigenvalues.real)) * 60 / (2 * np.pi)
+
+def test_uniform_simply_supported_shaft_matches_closed_form():
+    data = create_component_data(L=260, LA=0, LB=260, L1=120)
+    d = 0.03
+    expected = (np.pi / 0.26)**2 * np.sqrt(E * np.pi * d**4 / 64 / (DENSITY * np.pi * d**2 / 4)) * 60 / (2 * np.pi)
+
+    critical_speed = calculate_critical_speed(data, [{'z': 0, 'l': 260, 'd': 30, 'e': 0}])
+
+    # The Rayleigh quotient is an upper bound - with the static deflection under the own weight it is 0.07 % above the exact value
+    assert expected == pytest.approx(54048.6, rel=1e-4)
+    assert expected <= critical_speed['nkr'] <= 1.001 * expected
+    assert critical_speed['xkr'] == pytest.approx(critical_speed['nkr'] / data['nwe'][0])
+
+@pytest.mark.parametrize('signs', [(1, -1), (1, 1), (-1, 1)])
+def test_critical_speed_does_not_depend_on_the_phase_of_the_forces(signs):
+    data = create_component_data(L=260, LA=0, LB=260, L1=120)
+    for sign, force in zip(signs, data['Fx'].values()):
+        force[0] = sign * abs(force[0])
+
+    critical_speed = calculate_critical_speed(data, [{'z': 0, 'l': 260, 'd': 30, 'e': 0}])
+
+    assert critical_speed['nkr'] == pytest.approx(54087.2, rel=1e-4)
+
+def test_stepped_shaft_with_overhangs_matches_finite_elements():
+    data = create_component_data(L=300, LA=20, LB=280, L1=120)
+    shaft_steps = [{'z': 0, 'l': 100, 'd': 25, 'e': 0}, {'z': 100, 'l': 50, 'd': 32, 'e': 0}, {'z': 150, 'l': 150, 'd': 22, 'e': 0}]
+    expected = first_critical_speed_by_finite_elements(shaft_steps, 20, 280)
+
+    critical_speed = calculate_critical_speed(data, shaft_steps)
+
+    assert expected <= critical_speed['nkr'] <= 1.01 * expected
+    # Dunkerley's sum of the critical speeds of the steps gives the critical speed of the shaft
+    assert np.sum(critical_speed['steps']**-2.0) == pytest.approx(critical_speed['nkr']**-2.0)
+
+def test_critical_speed_is_only_calculated_when_requested(monkeypatch):
+    data = create_component_data(L=300, LA=20, LB=280, L1=120)
+    shaft_steps = [{'z': 0, 'l': 100, 'd': 25, 'e': 0}, {'z': 100, 'l': 50, 'd': 32, 'e': 0}, {'z': 150, 'l': 150, 'd': 22, 'e': 0}]
+    calculator = FunctionsCalculator()
+    calculator.calculate_initial_functions_and_attributes(data)
+    calls = []
+    calculate = FunctionsCalculator._calculate_critical_speed
+    monkeypatch.setattr(FunctionsCalculator, '_calculate_critical_speed', lambda self: calls.append(1) or calculate(self))
+
+    for d in (25, 27, 30):
+        shaft_steps[0]['d'] = d
+        calculator.calculate_remaining_functions(shaft_steps)
+    assert calls == [] and data['nkr'][0] is None
+
+    critical_speed = calculator.get_critical_speed()
+    assert critical_speed == calculator.get_critical_speed()
+    assert calls == [1]
+    assert critical_speed['nkr'] == pytest.approx(calculate_critical_speed(create_component_data(L=300, LA=20, LB=280, L1=120), shaft_steps)['nkr'])
+    assert (data['nkr'][0], data['xkr'][0]) == (critical_speed['nkr'], critical_speed['xkr'])
+
+    # The critical speed of the shaft which is not designed as a whole is not known
+    calculator.calculate_remaining_functions(shaft_steps[:2])
+    assert calculator.get_critical_speed() is None and data['nkr'][0] is None
@@ -0,0 +1,185 @@
+import multiprocessing
+import os
+import shutil
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pytest
+
+from DbHandler.model.DatabaseHandler import getDatabaseHandler
+
+BEARINGS_TABLE = 'wał czynny-łożyska-podporowe-kulkowe'
+
+LIMITS = [{'Dw': {'min': 20, 'max': 30}},
+          {'Dz': {'min': 40, 'max': None}, 'C': {'min': None, 'max': 15.5}},
+          {'B': {'min': 0, 'max': 12}, 'n max': {'min': 10000, 'max': 30000}},
+          {'elementy toczne': {'min': 'kulki', 'max': 'kulki'}, 'Dw': {'min': 10, 'max': None}}]
+
+def get_limits(database_handler, limits):
+    table_limits = database_handler.getTableItemsFilters(BEARINGS_TABLE)
+    for attribute, attribute_limits in limits.items():
+        table_limits[attribute].update(attribute_limits)
+    return table_limits
+
+def get_literal_query(database_handler, limits):
+    # Query with the limits written into the statement - the same conditions as the bound parameters
+    columns = database_handler._getColumns(BEARINGS_TABLE)[1:]
+    conditions = []
+    for attribute, attribute_limits in limits.items():
+        column = next(column for column in columns if column.startswith(attribute))
+        for limit, operator in (('min', '>='), ('max', '<=')):
+            value = attribute_limits[limit]
+            if value is not None:
+                conditions.append(f'"{column}" {operator} ' + (f"'{value}'" if isinstance(value, str) else str(value)))
+    return f'SELECT * FROM "{BEARINGS_TABLE}"' + (' WHERE ' + ' AND '.join(conditions) if conditions else '')
+
+def test_connection_and_schema_are_reused(database_handler):
+    statements = []
+    connection = database_handler._getConnection()
+    connection.set_trace_callback(statements.append)
+
+    for _ in range(3):
+        database_handler.getAvailableTables()
+        database_handler.getTableItemsAttributes(BEARINGS_TABLE)
+        database_handler.getSingleItem(BEARINGS_TABLE, '6204')
+
+    assert database_handler._getConnection() is connection
+    # The schema is read once - only the items are queried again
+    assert sum('sqlite_master' in statement for statement in statements) <= 1
+    assert sum('PRAGMA table_info' in statement for statement in statements) <= 1
+    assert sum(statement.startswith('SELECT * FROM') for statement in statements) == 3
+
+def test_modified_database_is_read_again(database_handler):
+    connection = database_handler._getConnection()
+    tables = database_handler.getAvailableTables()
+
+    with sqlite3.connect(database_handler._databaseAbsPath) as other_connection:
+        other_connection.execute('CREATE TABLE "wał czynny-nowa tabela" ("Kod" TEXT, "D" INTEGER)')
+    other_connection.close()
+
+    assert database_handler.getAvailableTables() == tables + ['wał czynny-nowa tabela']
+    assert database_handler._getConnection() is not connection
+
+def test_replaced_database_is_read_again(database_handler, tmp_path):
+    items = database_handler.getTableItems(BEARINGS_TABLE)
+    # The rebuilt database replaces the file - the new file has other items
+    replacement_path = str(tmp_path / 'replacement.db')
+    shutil.copyfile(database_handler._databaseAbsPath, replacement_path)
+    with sqlite3.connect(replacement_path) as connection:
+        connection.execute(f'DELETE FROM "{BEARINGS_TABLE}" WHERE rowid > 1')
+    connection.close()
+    os.replace(replacement_path, database_handler._databaseAbsPath)
+
+    assert database_handler.getTableItems(BEARINGS_TABLE) == items[:1]
+
+def read_in_forked_process(table_name):
+    # The handler of the parent process is inherited by the fork
+    handler = getDatabaseHandler()
+    inherited_connection = handler._conn
+    rows = handler.getTableData(table_name)[1]
+    return handler._conn is not inherited_connection, handler._pid == os.getpid(), len(rows)
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='The processes can not be forked')
+def test_forked_process_connects_again(database_handler):
+    rows = database_handler.getTableData(BEARINGS_TABLE)[1]
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('fork')) as executor:
+        reconnected, own_connection, rows_number = executor.submit(read_in_forked_process, BEARINGS_TABLE).result()
+
+    assert reconnected and own_connection
+    assert rows_number == len(rows)
+    # The connection of the parent process is still used
+    assert database_handler._pid == os.getpid()
+    assert database_handler.getTableData(BEARINGS_TABLE)[1] == rows
+
+@pytest.mark.parametrize('limits', LIMITS)
+def test_bound_limits_give_the_rows_of_the_literal_query(database_handler, limits):
+    limits = get_limits(database_handler, limits)
+
+    results = database_handler.getFilteredResults(BEARINGS_TABLE, limits)
+
+    expected = pd.read_sql_query(get_literal_query(database_handler, limits) + ' ORDER BY rowid', database_handler._getConnection())
+    expected.columns = [column.replace('[', '\n[') for column in expected.columns]
+    assert len(results) > 0
+    pd.testing.assert_frame_equal(results, expected)
+
+@pytest.mark.parametrize('limits', LIMITS)
+def test_results_keep_the_order_of_the_table(database_handler, limits):
+    limits = get_limits(database_handler, limits)
+    literal_query = get_literal_query(database_handler, limits)
+    codes = {row[0] for row in database_handler._getConnection().execute(literal_query)}
+
+    results = database_handler.getFilteredResults(BEARINGS_TABLE, limits)
+
+    _, rows = database_handler.getTableData(BEARINGS_TABLE)
+    assert list(results['Kod']) == [row[0] for row in rows if row[0] in codes]
+
+@pytest.mark.parametrize('attribute', ['Dw', 'C', 'n max'])
+def test_query_plan_uses_the_index_of_the_limited_column(database_handler, attribute):
+    column_values = sorted(row[0] for row in database_handler._getConnection().execute(
+        f'SELECT "{next(column for column in database_handler._getColumns(BEARINGS_TABLE) if column.startswith(attribute))}" FROM "{BEARINGS_TABLE}"'))
+    # A narrow range of the column - the index is more selective than the scan of the table
+    limits = get_limits(database_handler, {attribute: {'min': column_values[1], 'max': column_values[2]}})
+
+    plan = database_handler.getQueryPlan(BEARINGS_TABLE, limits)
+
+    assert any(f'USING INDEX {BEARINGS_TABLE}-{attribute} ' in step for step in plan), plan
+    assert len(database_handler.getFilteredResults(BEARINGS_TABLE, limits)) > 0
+
+def test_zero_limit_is_applied_and_none_is_not(database_handler):
+    all_items = database_handler.getFilteredResults(BEARINGS_TABLE, database_handler.getTableItemsFilters(BEARINGS_TABLE))
+
+    assert all(limit is None for attribute_limits in database_handler.getTableItemsFilters(BEARINGS_TABLE).values()
+               for limit in attribute_limits.values())
+    assert len(all_items) == len(database_handler.getTableData(BEARINGS_TABLE)[1])
+    assert len(database_handler.getFilteredResults(BEARINGS_TABLE, get_limits(database_handler, {'Dw': {'min': None, 'max': 0}}))) == 0
+    assert len(database_handler.getFilteredResults(BEARINGS_TABLE, get_limits(database_handler, {'Dw': {'min': 0, 'max': None}}))) == len(all_items)
+
+GROUP_LIMITS = [{},
+                {'Dw': {'min': 20, 'max': 40}},
+                {'C': {'min': 10, 'max': None}, 'n max': {'min': None, 'max': 12000}},
+                {'Dw': {'min': 1000, 'max': None}}]
+
+def get_expected_merged_results(database_handler, table_group_name, limits):
+    # Results of the separate tables joined one after another - the columns missing in a table are filled with NaN
+    tables_results = []
+    for table_name in database_handler.getAvailableTables(table_group_name):
+        table_results = database_handler.getFilteredResults(table_name, limits)
+        table_results.insert(0, 'tabela', table_name)
+        tables_results.append(table_results)
+    return pd.concat(tables_results, ignore_index=True)
+
+@pytest.mark.parametrize('table_group_name', ['wał czynny-łożyska', 'wał czynny-łożyska-centralne'])
+@pytest.mark.parametrize('limits', GROUP_LIMITS)
+def test_group_query_gives_the_results_of_the_separate_tables(database_handler, table_group_name, limits):
+    tables_results, merged_results = database_handler.getGroupFilteredResults(table_group_name, limits)
+
+    assert list(tables_results) == database_handler.getAvailableTables(table_group_name)
+    for table_name, table_results in tables_results.items():
+        pd.testing.assert_frame_equal(table_results, database_handler.getFilteredResults(table_name, limits), check_dtype=False)
+    expected_results = get_expected_merged_results(database_handler, table_group_name, limits)
+    pd.testing.assert_frame_equal(merged_results, expected_results[merged_results.columns], check_dtype=False)
+    assert sorted(merged_results.columns) == sorted(expected_results.columns)
+
+def test_missing_columns_of_the_group_are_null(database_handler):
+    _, merged_results = database_handler.getGroupFilteredResults('wał czynny-łożyska', {})
+
+    assert merged_results.columns[0] == 'tabela'
+    centre_bearings = merged_results['tabela'].str.startswith('wał czynny-łożyska-centralne')
+    assert merged_results.loc[~centre_bearings, 'E \n[mm]'].isna().all()
+    assert merged_results.loc[centre_bearings, 'E \n[mm]'].notna().all()
+
+@pytest.mark.parametrize('sort_by', ['C', 'E', 'Dz'])
+def test_sorted_group_results_keep_the_order_of_the_tables_for_equal_values(database_handler, sort_by):
+    limits = {'Dw': {'min': 20, 'max': 60}}
+    _, merged_results = database_handler.getGroupFilteredResults('wał czynny-łożyska', limits, sortBy=sort_by)
+
+    expected_results = get_expected_merged_results(database_handler, 'wał czynny-łożyska', limits)
+    sort_column = next(column for column in expected_results.columns if column.startswith(sort_by))
+    expected_results = expected_results.sort_values(sort_column, kind='stable', na_position='last', ignore_index=True)
+    pd.testing.assert_frame_equal(merged_results, expected_results[merged_results.columns], check_dtype=False)
+
+def test_group_results_cannot_be_sorted_by_a_missing_attribute(database_handler):
+    with pytest.raises(ValueError):
+        database_handler.getGroupFilteredResults('wał czynny-łożyska', {}, sortBy='X')
@@ -0,0 +1,153 @@
+import copy
+
+import numpy as np
+import pytest
+
+from conftest import create_component_data, create_shaft_steps
+from ShaftDesigner.model.FunctionsCalculator import FunctionsCalculator
+
+def calculate(data, shaft_steps):
+    calculator = FunctionsCalculator(initial_functions_cache_size=0)
+    calculator.calculate_initial_functions_and_attributes(data)
+    calculator.calculate_remaining_functions(shaft_steps)
+    return calculator
+
+def calculate_baseline_deflection(data, shaft_steps, z_values):
+    """
+    Reference implementation - the equivalent smooth shaft evaluated load by load at every argument,
+    the same as before the deflection functions were calculated in a single pass.
+
+    Returns:
+        (tuple): Integral and double integral of the bending moment with the integration constants,
+                 and the minimal diameters by the permissible deflection angle and arrow.
+    """
+    LA = data['LA'][0]
+    LB = data['LB'][0]
+    E = data['Materiał']['E'][0] * 10**6
+    positions = [data['L1'][0]] + [value[0] for value in data['Lc'].values()]
+    forces = [{'z': position, 'val': value[0]} for position, value in zip(positions, data['Fx'].values())]
+    RB = -sum(force['val'] * (force['z'] - LA) for force in forces) / (LB - LA)
+    RA = -sum(force['val'] for force in forces) - RB
+    forces += [{'z': LA, 'val': RA}, {'z': LB, 'val': RB}]
+    bending_moment_at = lambda z: sum(force['val'] * (z - force['z']) * 0.001 for force in forces if force['z'] <= z)
+    cutting_force_at = lambda z: sum(force['val'] for force in forces if force['z'] <= z)
+
+    d = sum(step['l'] * step['d'] for step in shaft_steps) / sum(step['l'] for step in shaft_steps)
+    I = np.pi * (d * 0.001)**4 / 64
+    k = [I / (np.pi * (step['d'] * 0.001)**4 / 64 + (np.pi * step['d']**2 * step['e']**2) / 4) for step in shaft_steps]
+    # Forces (F) and shear force increments (Q) are integrated as <z - a>^0 loads and bending moment increments (M) as <z - a>^1 loads
+    loads = []
+    for force in forces:
+        idx = next(idx for idx in range(len(shaft_steps)) if idx == len(shaft_steps) - 1 or force['z'] < shaft_steps[idx+1]['z'])
+        loads.append(('F', force['z'], force['val'] * k[idx]))
+    for idx in range(len(shaft_steps) - 1):
+        lj = shaft_steps[idx+1]['z']
+        loads.append(('M', lj, bending_moment_at(lj) * (k[idx+1] - k[idx])))
+        loads.append(('Q', lj, cutting_force_at(lj) * (k[idx+1] - k[idx])))
+
+    def psi_at(z):
+        return sum(1 / 2 * val * ((z - a) * 0.001)**2 if kind != 'M' else val * (z - a) * 0.001 for kind, a, val in loads if a <= z)
+
+    def phi_at(z):
+        return sum(1 / 6 * val * ((z - a) * 0.001)**3 if kind != 'M' else 1 / 2 * val * ((z - a) * 0.001)**2 for kind, a, val in loads if a <= z)
+
+    C = (phi_at(LB) - phi_at(LA)) / ((LA - LB) * 0.001)
+    D = -phi_at(LB) - C * LB * 0.001
+    integral = np.array([psi_at(z) + C for z in z_values])
+    double_integral = np.array([phi_at(z) + C * z * 0.001 + D for z in z_values])
+
+    d_min_by_angle = (64 / (np.pi * E * data['tetadop'][0]) * np.abs(integral))**(1 / 4) * 1000
+    d_min_by_arrow = [(64 / (np.pi * E * data['fdop'][0] * 0.001) * abs(value))**(1 / 4) * 1000 if LA <= z <= LB else 0
+                      for z, value in zip(z_values, double_integral)]
+    return integral, double_integral, np.ceil(d_min_by_angle * 100) / 100, np.ceil(np.array(d_min_by_arrow) * 100) / 100
+
+# Reference shafts - none of the forces acts exactly at the beginning of a shaft step, where the reference implementation
+# scaled the force with k of the following step, but took the shear force increment from its right side
+REFERENCE_SHAFTS = {
+    'two steps': (dict(L=260, LA=10, LB=250, L1=100, n=2), [{'z': 0, 'l': 130, 'd': 28, 'e': 0}, {'z': 130, 'l': 130, 'd': 24, 'e': 0}]),
+    'eccentrics with overhangs': (dict(L=300, LA=20, LB=280, L1=120, n=2, Mwe=30), 'steps'),
+    'three eccentrics': (dict(L=340, LA=15, LB=320, L1=110, n=3, Mwe=40), 'steps'),
+}
+
+@pytest.mark.parametrize('name', REFERENCE_SHAFTS)
+def test_deflection_matches_the_reference_implementation(name):
+    coordinates, shaft_steps = REFERENCE_SHAFTS[name]
+    data = create_component_data(**coordinates)
+    if shaft_steps == 'steps':
+        shaft_steps = create_shaft_steps(data, d=26, l_before=45)
+
+    calculator = calculate(data, shaft_steps)
+    z = calculator.get_shaft_functions()['z']
+    integral, double_integral, d_min_by_angle, d_min_by_arrow = calculate_baseline_deflection(data, shaft_steps, z)
+
+    EI = calculator._EI
+    assert calculator.deflection_angle == pytest.approx(integral / EI, rel=1e-10, abs=1e-15)
+    assert calculator.deflection_arrow == pytest.approx(double_integral / EI * 1000, rel=1e-10, abs=1e-12)
+    # The minimal diameters are rounded up to 0.01 mm - the round-off errors (e.g. of the zero deflection at the supports)
+    # can only move them by a single step
+    np.testing.assert_allclose(calculator.d_min_by_permissible_deflection_angle, d_min_by_angle, rtol=0, atol=0.01 + 1e-9)
+    np.testing.assert_allclose(calculator.d_min_by_permissible_deflection_arrow, d_min_by_arrow, rtol=0, atol=0.01 + 1e-9)
+    assert np.mean(calculator.d_min_by_permissible_deflection_arrow == d_min_by_arrow) > 0.95
+
+def integrate_deflection_numerically(calculator, shaft_steps, data, points=300001):
+    # Deflection [mm] of the stepped shaft - the curvature M/EIj integrated twice with the trapezoidal rule
+    z = np.linspace(0, data['L'][0], points)
+    starts = np.array([step['z'] for step in shaft_steps[1:]])
+    EI = data['Materiał']['E'][0] * 10**6 * np.array([calculator._calculate_step_moment_of_inertia(step) for step in shaft_steps])
+    curvature = calculator.get_piecewise_functions()['Mg'](z) / EI[np.searchsorted(starts, z, side='right')]
+    h = (z[1] - z[0]) * 0.001
+    angle = np.concatenate(([0], np.cumsum((curvature[1:] + curvature[:-1]) / 2 * h)))
+    deflection = np.concatenate(([0], np.cumsum((angle[1:] + angle[:-1]) / 2 * h)))
+    fA, fB = np.interp([data['LA'][0], data['LB'][0]], z, deflection)
+    deflection -= fA + (fB - fA) * (z - data['LA'][0]) / (data['LB'][0] - data['LA'][0])
+    return z, deflection * 1000
+
+@pytest.mark.parametrize('method', FunctionsCalculator.deflection_methods)
+def test_deflection_with_a_step_beginning_at_the_support(method):
+    # The reaction of the support A acts at the beginning of the second step - the reference implementation
+    # took the shear force increment of that step from its right side and gave the largest deflection of 0.01475 mm
+    data = create_component_data(Mwe=30, **{'Metoda ugięć': method})
+    shaft_steps = create_shaft_steps(data, d=26, l_before=data['LA'][0])
+
+    calculator = calculate(data, shaft_steps)
+    z, deflection = integrate_deflection_numerically(calculator, shaft_steps, data)
+
+    z_max, f_max = calculator.get_deflection_arrow_extremum()
+    assert f_max == pytest.approx(-0.0283050, rel=1e-5)
+    assert z_max == pytest.approx(183.463, abs=1e-3)
+    assert f_max == pytest.approx(deflection[np.argmax(np.abs(deflection))], rel=1e-4)
+    assert calculator.get_minimal_diameters_maxima()['dfdop'] == 23.26
+
+    # Both methods give the same angle and deflection
+    comparison = calculator.compare_deflection_methods()
+    assert comparison['θ'] <= 1e-12 * comparison['max |θ|']
+    assert comparison['f'] <= 1e-12 * comparison['max |f|']
+
+@pytest.mark.parametrize('method', FunctionsCalculator.deflection_methods)
+@pytest.mark.parametrize('αe', [180, 90])
+def test_diameters_changes_give_the_deflection_of_the_new_calculation(method, αe):
+    # Only the changed shaft steps are recalculated when the coordinates of the steps stay the same
+    data = create_component_data(Mwe=30, **{'αe': αe, 'Metoda ugięć': method})
+    shaft_steps = create_shaft_steps(data, l_before=40)
+    calculator = calculate(data, shaft_steps)
+
+    for idx, d in ((1, 28), (2, 34), (1, 25), (0, 20)):
+        shaft_steps = [dict(step) for step in shaft_steps]
+        shaft_steps[idx]['d'] = d
+        calculator.calculate_remaining_functions(shaft_steps)
+        expected = calculate(copy.deepcopy(data), shaft_steps)
+
+        functions = calculator.get_piecewise_functions()
+        expected_functions = expected.get_piecewise_functions()
+        z = expected.get_shaft_functions()['z']
+        assert np.array_equal(calculator.get_shaft_functions()['z'], z)
+        for name in ('psi', 'phi', 'psi_y', 'phi_y')[:2 * expected._planes_number]:
+            assert functions[name](z) == pytest.approx(expected_functions[name](z), rel=1e-12, abs=1e-15)
+        assert calculator.deflection_arrow == pytest.approx(expected.deflection_arrow, rel=1e-12, abs=1e-15)
+        assert calculator.deflection_angle == pytest.approx(expected.deflection_angle, rel=1e-12, abs=1e-15)
+        assert calculator.d_min == pytest.approx(expected.d_min, rel=1e-12)
+        assert calculator.get_minimal_diameters_maxima() == pytest.approx(expected.get_minimal_diameters_maxima(), rel=1e-12)
+        critical_speed, expected_critical_speed = calculator.get_critical_speed(), expected.get_critical_speed()
+        assert critical_speed['nkr'] == pytest.approx(expected_critical_speed['nkr'], rel=1e-12)
+        assert critical_speed['steps'] == pytest.approx(expected_critical_speed['steps'], rel=1e-12)
+    assert ('psi_y' in calculator.get_piecewise_functions()) == (αe != 180)
@@ -0,0 +1,99 @@
+import copy
+
+import numpy as np
+import pytest
+
+from conftest import create_component_data, create_shaft_steps
+from ShaftDesigner.model.FunctionsCalculator import FunctionsCalculator
+from ShaftDesigner.model.LoadCasesCalculator import LoadCasesCalculator
+from ShaftDesigner.model.TransferMatrixCalculator import TransferMatrixCalculator
+
+def calculate(data, shaft_steps):
+    calculator = FunctionsCalculator(initial_functions_cache_size=0)
+    calculator.calculate_initial_functions_and_attributes(data)
+    calculator.calculate_remaining_functions(shaft_steps)
+    return calculator
+
+def get_plane_data(data, plane):
+    # Data of the shaft loaded only with the components of the forces in the given plane (0 - x, 1 - y)
+    plane_data = copy.deepcopy(data)
+    for key, components in plane_data['Fp'].items():
+        plane_data['Fx'][key][0] = components[0][plane]
+        components[0] = [components[0][plane], 0.0]
+    return plane_data
+
+def test_default_phase_loads_the_shaft_in_a_single_plane():
+    data = create_component_data(n=3)
+
+    assert [force[0] for force in data['Fx'].values()] == [data['F'][0], -data['F'][0], data['F'][0]]
+    assert all(components[0][1] == 0 for components in data['Fp'].values())
+    assert 'Mg_y' not in calculate(data, create_shaft_steps(data)).get_piecewise_functions()
+
+@pytest.mark.parametrize('method', FunctionsCalculator.deflection_methods)
+def test_planes_of_perpendicular_forces_are_superposed(method):
+    data = create_component_data(Mwe=30, **{'αe': 90, 'Metoda ugięć': method})
+    shaft_steps = create_shaft_steps(data, l_before=40)
+
+    calculator = calculate(data, shaft_steps)
+    plane_x = calculate(get_plane_data(data, 0), shaft_steps)
+    plane_y = calculate(get_plane_data(data, 1), shaft_steps)
+
+    functions = calculator.get_piecewise_functions()
+    z = calculator.get_shaft_functions()['z']
+    for name in ('Mg', 'psi', 'phi'):
+        assert functions[name](z) == pytest.approx(plane_x.get_piecewise_functions()[name](z), abs=1e-12)
+        # The deflection of the plane y is calculated with the method selected for the project
+        assert functions[name + '_y'](z) == pytest.approx(plane_y.get_piecewise_functions()[name](z), abs=1e-12)
+    EI = plane_x._EI
+    assert calculator.deflection_arrow == pytest.approx(np.hypot(plane_x.get_piecewise_functions()['phi'](z),
+                                                                 plane_y.get_piecewise_functions()['phi'](z)) / EI * 1000)
+    assert data['Ra'][0] == pytest.approx(np.hypot(plane_x._data['Ra'][0], plane_y._data['Ra'][0]))
+
+    # The minimal diameters use the resultant moment and deflection - they are not smaller than in any of the planes
+    maxima = calculator.get_minimal_diameters_maxima()
+    for plane in (plane_x, plane_y):
+        for key, value in plane.get_minimal_diameters_maxima().items():
+            assert maxima[key] >= value
+    dense_z = np.linspace(0, data['L'][0], 20001)
+    resultant = np.hypot(functions['Mg'](dense_z), functions['Mg_y'](dense_z))
+    equivalent_moment = np.sqrt(resultant**2 + 3 / 4 * functions['Ms'](dense_z)**2).max()
+    assert maxima['dMz'] == pytest.approx(calculator._dmin_by_equivalent_stress(equivalent_moment), abs=0.011)
+    assert calculator.get_deflection_arrow_extremum()[1] == pytest.approx(np.abs(calculator.deflection_arrow).max(), rel=1e-3)
+
+@pytest.mark.parametrize('method', FunctionsCalculator.deflection_methods)
+def test_both_planes_are_calculated_in_a_single_pass(method, monkeypatch):
+    data = create_component_data(n=3, Mwe=30, **{'αe': 120, 'Metoda ugięć': method})
+    shaft_steps = create_shaft_steps(data, d=26, l_before=45)
+    plane_x = calculate(get_plane_data(data, 0), shaft_steps)
+    plane_y = calculate(get_plane_data(data, 1), shaft_steps)
+
+    # Count the deflection solves of the stacked planes
+    solves = []
+    for owner, name in ((TransferMatrixCalculator, 'calculate_deflection'), (FunctionsCalculator, '_phi_coefficients')):
+        solve = getattr(owner, name)
+        monkeypatch.setattr(owner, name, lambda self, *args, solve=solve: solves.append(args) or solve(self, *args))
+    calculator = calculate(data, shaft_steps)
+
+    assert len(solves) == 1
+    functions = calculator.get_piecewise_functions()
+    z = calculator.get_shaft_functions()['z']
+    for name in ('Mg', 'Q', 'psi', 'phi'):
+        np.testing.assert_allclose(functions[name](z), plane_x.get_piecewise_functions()[name](z), rtol=1e-12, atol=1e-15)
+        np.testing.assert_allclose(functions[name + '_y'](z), plane_y.get_piecewise_functions()[name](z), rtol=1e-12, atol=1e-15)
+    for key in ('Ra', 'Rb'):
+        assert data[key][0] == pytest.approx(np.hypot(plane_x._data[key][0], plane_y._data[key][0]), rel=1e-12)
+    EI = calculator._EI
+    np.testing.assert_allclose(calculator.deflection_angle, np.hypot(plane_x.get_piecewise_functions()['psi'](z),
+                                                                     plane_y.get_piecewise_functions()['psi'](z)) / EI, rtol=1e-12, atol=1e-15)
+
+@pytest.mark.parametrize('n, angle', [(2, 90), (3, 120)])
+def test_load_cases_match_the_single_case_calculation(n, angle):
+    data = create_component_data(n=n, Mwe=30, **{'αe': angle})
+    calculator = FunctionsCalculator(initial_functions_cache_size=0)
+    calculator.calculate_initial_functions_and_attributes(data)
+
+    results = LoadCasesCalculator(initial_functions_cache_size=0).calculate_load_cases(LoadCasesCalculator.stack_load_cases([data]))
+
+    assert results['Ra'][0] == pytest.approx(data['Ra'][0])
+    assert results['Rb'][0] == pytest.approx(data['Rb'][0])
+    assert results['dsc'][0] == data['dsc'][0]
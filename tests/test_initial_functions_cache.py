@@ -0,0 +1,102 @@
+import copy
+
+import pytest
+
+from conftest import create_component_data, create_shaft_steps
+from ShaftDesigner.model.FunctionsCalculator import FunctionsCalculator
+
+def calculate(calculator, data, shaft_steps):
+    calculator.calculate_initial_functions_and_attributes(data)
+    calculator.calculate_remaining_functions(shaft_steps)
+    return {'z': calculator.get_shaft_functions()['z'], 'd_min': calculator.d_min, 'deflection_arrow': calculator.deflection_arrow,
+            'maxima': calculator.get_minimal_diameters_maxima(), 'Ra': data['Ra'][0], 'Rb': data['Rb'][0], 'dsc': data['dsc'][0]}
+
+def assert_results_equal(results, expected):
+    for name, value in expected.items():
+        assert results[name] == pytest.approx(value, rel=1e-12, abs=1e-15), name
+
+def set_value(key, value):
+    def modify(data):
+        data[key][0] = value
+    return modify
+
+def set_material_value(key, value):
+    def modify(data):
+        data['Materiał'][key][0] = value
+    return modify
+
+def set_force_component(plane, value):
+    def modify(data):
+        components = data['Fp']['F2'][0]
+        components[plane] = value
+        if plane == 0:
+            data['Fx']['F2'][0] = value
+    return modify
+
+def set_eccentrics_phase(value):
+    def modify(data):
+        # The forces are calculated from the phase the same way as by the preliminary data tab
+        data.update({key: create_component_data(Mwe=30, **{'αe': value})[key] for key in ('αe', 'Fx', 'Fp')})
+    return modify
+
+MODIFICATIONS = {'L1': set_value('L1', 110), 'LA': set_value('LA', 30), 'Mwe': set_value('Mwe', 45), 'xz': set_value('xz', 3),
+                 'qdop': set_value('qdop', 0.003), 'Zgo': set_material_value('Zgo', 200), 'Zso': set_material_value('Zso', 120),
+                 'G': set_material_value('G', 79000), 'Fx': set_force_component(0, 900.0), 'Fp': set_force_component(1, 300.0),
+                 'αe': set_eccentrics_phase(120)}
+
+@pytest.mark.parametrize('modification', MODIFICATIONS)
+def test_changed_initial_data_is_not_read_from_the_cache(modification):
+    data = create_component_data(Mwe=30)
+    shaft_steps = create_shaft_steps(data, l_before=40)
+    calculator = FunctionsCalculator()
+    results = calculate(calculator, data, shaft_steps)
+
+    # The data is modified in place, as by the tabs of the application
+    modified_data = copy.deepcopy(data)
+    MODIFICATIONS[modification](data)
+    MODIFICATIONS[modification](modified_data)
+    modified_results = calculate(calculator, data, shaft_steps)
+
+    assert_results_equal(modified_results, calculate(FunctionsCalculator(initial_functions_cache_size=0), modified_data, shaft_steps))
+    # Every modification changes the results - the cached ones would not match
+    assert modified_results['maxima'] != results['maxima'] or modified_results['Ra'] != results['Ra']
+    assert len(calculator._initial_functions_cache) == 2
+
+def test_cached_initial_functions_give_the_results_of_the_new_calculation():
+    data = create_component_data(Mwe=30, **{'αe': 90})
+    shaft_steps = create_shaft_steps(data, l_before=40)
+    calculator = FunctionsCalculator()
+    expected = calculate(FunctionsCalculator(initial_functions_cache_size=0), copy.deepcopy(data), shaft_steps)
+    calculate(calculator, data, shaft_steps)
+
+    # The functions updated in place by the remaining functions do not change the cached ones
+    calculate(calculator, data, create_shaft_steps(data, d=30, l_before=60))
+    set_value('L1', 110)(data)
+    calculate(calculator, data, shaft_steps)
+    set_value('L1', 120)(data)
+
+    assert_results_equal(calculate(calculator, data, shaft_steps), expected)
+    assert len(calculator._initial_functions_cache) == 2
+
+def test_least_recently_used_initial_functions_are_removed():
+    data = create_component_data(Mwe=30)
+    calculator = FunctionsCalculator(initial_functions_cache_size=2)
+    keys = []
+    for L1 in (100, 110, 100, 120):
+        data['L1'][0] = L1
+        calculator.calculate_initial_functions_and_attributes(data)
+        keys.append(calculator._get_initial_data_key())
+
+    assert list(calculator._initial_functions_cache) == [keys[0], keys[3]]
+
+def test_project_without_the_components_of_the_forces_is_cached():
+    # The projects saved before the forces components were introduced have no 'Fp' data
+    data = create_component_data(Mwe=30)
+    del data['Fp']
+    shaft_steps = create_shaft_steps(data, l_before=40)
+    calculator = FunctionsCalculator()
+
+    results = calculate(calculator, data, shaft_steps)
+
+    assert_results_equal(calculate(calculator, data, shaft_steps), results)
+    assert 'Mg_y' not in calculator.get_piecewise_functions()
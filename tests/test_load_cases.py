@@ -0,0 +1,59 @@
+import copy
+
+import numpy as np
+import pytest
+
+from conftest import MATERIAL, create_component_data
+from ShaftDesigner.model.FunctionsCalculator import FunctionsCalculator
+from ShaftDesigner.model.LoadCasesCalculator import LoadCasesCalculator
+
+def create_load_cases():
+    # Load cases of different coordinates, loads and materials - some of them loaded in both planes
+    cases = []
+    for idx, (L, LA, LB, L1, Mwe, angle, Zgo) in enumerate([(300, 20, 280, 120, 30, 180, 250), (320, 15, 300, 110, 45, 180, 200),
+                                                           (280, 25, 255, 100, 10, 120, 250), (340, 30, 320, 140, 60, 90, 300)]):
+        data = create_component_data(L=L, LA=LA, LB=LB, L1=L1, n=3, Mwe=Mwe, Fwm=1000 + 500 * idx, **{'αe': angle})
+        data['Materiał'] = copy.deepcopy(MATERIAL)
+        data['Materiał']['Zgo'][0] = Zgo
+        cases.append(data)
+    return cases
+
+def calculate_single_case(data):
+    calculator = FunctionsCalculator(initial_functions_cache_size=0)
+    calculator.calculate_initial_functions_and_attributes(data)
+    return calculator
+
+@pytest.mark.parametrize('case', range(4))
+def test_load_cases_match_the_single_case_calculation(case):
+    cases = create_load_cases()
+    calculator = calculate_single_case(cases[case])
+    functions = calculator.get_shaft_functions()
+    z = functions['z']
+
+    results = LoadCasesCalculator(initial_functions_cache_size=0).calculate_load_cases(LoadCasesCalculator.stack_load_cases(cases), z_values=z)
+
+    # Some of the load cases are loaded in both planes, so the reactions and the bending moments of all of them are the resultants
+    assert results['Ra'][case] == pytest.approx(abs(cases[case]['Ra'][0]))
+    assert results['Rb'][case] == pytest.approx(abs(cases[case]['Rb'][0]))
+    assert results['dsc'][case] == cases[case]['dsc'][0]
+    assert results['dec'][case] == cases[case]['dec'][0]
+    # The moments are rounded to 0.01 Nm and the diameters up to 0.01 mm - the round-off can only move them by a single step
+    for group, key in (('f(z)', 'Mg'), ('f(z)', 'Ms'), ('f(z)', 'Mz'), ('dmin(z)', 'dMs'), ('dmin(z)', 'dMz'), ('dmin(z)', 'dqdop')):
+        expected = np.abs(functions[group][key]['function']) if key == 'Mg' else functions[group][key]['function']
+        np.testing.assert_allclose(results[key][case], expected, rtol=0, atol=0.01 + 1e-9, err_msg=key)
+
+def test_single_values_are_broadcast_to_all_load_cases():
+    cases = create_load_cases()[:2]
+    load_cases = LoadCasesCalculator.stack_load_cases(cases)
+    load_cases['Mwe'] = cases[0]['Mwe'][0]
+    cases[1]['Mwe'][0] = cases[0]['Mwe'][0]
+
+    results = LoadCasesCalculator(initial_functions_cache_size=0).calculate_load_cases(load_cases)
+
+    for case, data in enumerate(cases):
+        calculate_single_case(data)
+        assert results['dsc'][case] == data['dsc'][0]
+
+def test_load_cases_with_different_numbers_of_eccentrics_are_rejected():
+    with pytest.raises(ValueError):
+        LoadCasesCalculator.stack_load_cases([create_component_data(n=2), create_component_data(n=3)])
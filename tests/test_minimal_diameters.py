@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from conftest import create_component_data
+from ShaftDesigner.model.FunctionsCalculator import FunctionsCalculator
+
+def calculate(data):
+    calculator = FunctionsCalculator(initial_functions_cache_size=0)
+    calculator.calculate_initial_functions_and_attributes(data)
+    return calculator
+
+# Diameters of the reference shafts calculated on the uniform 0.1 mm grid of the previous implementation
+@pytest.mark.parametrize('values, dsc, dec', [({'Mwe': 30}, 17.58, 23.58),
+                                              ({'Mwe': 30, 'n': 3}, 28.61, 34.61),
+                                              ({'Mwe': 30, 'L1': 100}, 18.28, 24.28),
+                                              ({'Mwe': 150, 'n': 1}, 30.51, 36.51),
+                                              ({'Mwe': 150, 'n': 1, 'L1': 100, 'LA': 60}, 26.0, 32.0)])
+def test_reference_shafts_diameters(values, dsc, dec):
+    data = create_component_data(**values)
+
+    calculate(data)
+
+    assert data['dsc'][0] == dsc
+    assert data['dec'][0] == pytest.approx(dec)
+
+def test_torque_step_gives_the_supremum_from_the_right():
+    # A single eccentric - the equivalent moment is the largest just after the torque step at L1
+    data = create_component_data(n=1, Mwe=150)
+    calculator = calculate(data)
+    L1 = data['L1'][0]
+
+    z, _ = calculator.get_piecewise_functions()['Mz^2'].maximum()
+    bending_moment = round(float(calculator.get_piecewise_functions()['Mg'](L1)), 2)
+
+    assert z == L1
+    assert data['dsc'][0] == calculator._dmin_by_equivalent_stress(np.sqrt(bending_moment**2 + 3 / 4 * data['Mwe'][0]**2))
+    # The sampled torque acts for z > L1 and the sampled diameters stay below dsc
+    functions = calculator.get_shaft_functions()
+    assert functions['f(z)']['Ms']['function'][functions['z'] == L1] == [0]
+    assert functions['dmin(z)']['dMz']['function'].max() <= data['dsc'][0]
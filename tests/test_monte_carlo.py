@@ -0,0 +1,112 @@
+import copy
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from conftest import create_component_data, create_shaft_steps
+from ShaftDesigner.model.FunctionsCalculator import FunctionsCalculator
+from ShaftDesigner.model.MonteCarloCalculator import MonteCarloCalculator
+
+def calculate(data, shaft_steps):
+    calculator = FunctionsCalculator(initial_functions_cache_size=0)
+    calculator.calculate_initial_functions_and_attributes(data)
+    calculator.calculate_remaining_functions(shaft_steps)
+    return calculator
+
+def calculate_deflection_at(calculator, z):
+    # Deflection angle and arrow of the single case at the given arguments - the resultants of both planes if they are loaded
+    functions = calculator.get_piecewise_functions()
+    resultant = lambda name: np.hypot(functions[name](z), functions[name + '_y'](z)) if name + '_y' in functions else functions[name](z)
+    return resultant('psi') / calculator._EI, resultant('phi') / calculator._EI * 1000
+
+def get_sample(data):
+    return {key: np.array([data['Materiał'][key][0] if key in MonteCarloCalculator.material_keys else data[key][0]], dtype=float)
+            for key in MonteCarloCalculator.samples_keys}
+
+@pytest.mark.parametrize('angle', [180, 90])
+def test_sample_matches_the_single_case_calculation(angle):
+    data = create_component_data(Mwe=30, **{'αe': angle})
+    shaft_steps = create_shaft_steps(data, d=26, l_before=45)
+    # The sample differs from the nominal data in the loads and the material - the deflection is scaled from the nominal shaft
+    sample_data = create_component_data(Mwe=36, Fwm=data['Fwm'][0] * 1.3, **{'αe': angle})
+    sample_data['Materiał']['E'][0] = 190000
+    sample_data['Materiał']['Zgo'][0] = 220
+
+    results = MonteCarloCalculator().calculate(data, get_sample(sample_data), shaft_steps, percentiles=(50,))
+    calculator = calculate(sample_data, shaft_steps)
+
+    assert results['dsc'][0] == pytest.approx(sample_data['dsc'][0])
+    assert results['dec'][0] == pytest.approx(sample_data['dec'][0])
+    # The functions are sampled at the arguments of the nominal shaft - the grid of the single case is refined at other points
+    deflection_angle, deflection_arrow = calculate_deflection_at(calculator, results['z'])
+    np.testing.assert_allclose(results['θ'][0], deflection_angle, rtol=1e-5, atol=1e-9)
+    np.testing.assert_allclose(results['f'][0], deflection_arrow, rtol=1e-5, atol=1e-9)
+    assert results['θmax'][0] == pytest.approx(np.abs(deflection_angle).max(), rel=1e-5)
+    assert results['fmax'][0] == pytest.approx(np.abs(deflection_arrow).max(), rel=1e-5)
+    assert results['fmax'][0] == pytest.approx(abs(calculator.get_deflection_arrow_extremum()[1]), rel=1e-3)
+    # The minimal diameters are rounded up to 0.01 mm - the round-off can only move them by a single step
+    z, indices, sample_indices = np.intersect1d(results['z'], calculator.get_shaft_functions()['z'], return_indices=True)
+    np.testing.assert_allclose(results['dmin'][0][indices], calculator.d_min[sample_indices], rtol=0, atol=0.01 + 1e-4)
+
+def test_nominal_samples_give_the_nominal_results():
+    data = create_component_data(Mwe=30)
+    monte_carlo_calculator = MonteCarloCalculator()
+    samples = monte_carlo_calculator.draw_samples(data, {}, 10)
+
+    results = monte_carlo_calculator.calculate(copy.deepcopy(data), samples)
+    FunctionsCalculator(initial_functions_cache_size=0).calculate_initial_functions_and_attributes(data)
+
+    assert np.all(results['dsc'] == data['dsc'][0])
+    assert np.all(results['dec'] == data['dec'][0])
+    assert 'fmax' not in results
+
+def test_results_do_not_depend_on_the_chunks():
+    data = create_component_data(Mwe=30)
+    shaft_steps = create_shaft_steps(data, d=26, l_before=45)
+    distributions = {'Fwm': ('normal', {'loc': data['Fwm'][0], 'scale': 150}), 'E': ('uniform', {'low': 200000, 'high': 215000})}
+    samples = MonteCarloCalculator().draw_samples(data, distributions, 200, seed=1)
+
+    results = MonteCarloCalculator().calculate(data, samples, shaft_steps)
+    chunked_results = MonteCarloCalculator(memory_budget=2**20).calculate(data, samples, shaft_steps)
+
+    for key, values in results.items():
+        np.testing.assert_array_equal(chunked_results[key], values, err_msg=key)
+    # The percentiles of the larger forces give the larger diameters and deflection
+    assert np.all(np.diff(results['fmax']) > 0)
+    assert np.all(np.diff(results['dsc']) >= 0)
+
+def test_peak_memory_stays_within_the_budget():
+    data = create_component_data(Mwe=30)
+    shaft_steps = create_shaft_steps(data, d=26, l_before=45)
+    monte_carlo_calculator = MonteCarloCalculator(memory_budget=8 * 2**20)
+    samples = monte_carlo_calculator.draw_samples(data, {'Fwm': ('normal', {'loc': data['Fwm'][0], 'scale': 150})}, 2000, seed=1)
+
+    tracemalloc.start()
+    try:
+        monte_carlo_calculator.calculate(data, samples, shaft_steps)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert peak <= 8 * 2**20
+
+def test_results_larger_than_the_budget_are_rejected():
+    data = create_component_data(Mwe=30)
+    monte_carlo_calculator = MonteCarloCalculator(memory_budget=2**22)
+    samples = monte_carlo_calculator.draw_samples(data, {}, 2000)
+
+    with pytest.raises(ValueError):
+        monte_carlo_calculator.calculate(data, samples, create_shaft_steps(data, d=26, l_before=45))
+
+def test_samples_are_reproducible_with_the_seed():
+    data = create_component_data()
+    distributions = {'Mwe': ('uniform', {'low': 20, 'high': 40})}
+    monte_carlo_calculator = MonteCarloCalculator()
+
+    samples = monte_carlo_calculator.draw_samples(data, distributions, 100, seed=7)
+
+    np.testing.assert_array_equal(samples['Mwe'], monte_carlo_calculator.draw_samples(data, distributions, 100, seed=7)['Mwe'])
+    assert np.all((samples['Mwe'] >= 20) & (samples['Mwe'] < 40))
+    assert np.all(samples['E'] == data['Materiał']['E'][0])
+    assert np.all(samples['Fwm'] == data['Fwm'][0])
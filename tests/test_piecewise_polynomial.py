@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from ShaftDesigner.model.PiecewisePolynomial import PiecewisePolynomial, subdivide
+
+# Bending moment of a beam on the supports at 20 and 280 loaded with two opposite forces, with a jump of a moment load
+TERMS = (([20, 120, 185, 280], [-250, 1000, -1000, 250], 1), ([150], [-4000], 0))
+
+def singularity_functions_at(z, terms):
+    z = np.asarray(z, dtype=float)[:, np.newaxis]
+    return sum(np.sum(np.where(z >= np.asarray(positions), np.asarray(values) * np.abs(z - np.asarray(positions))**order, 0), axis=1)
+               for positions, values, order in terms)
+
+@pytest.fixture
+def function():
+    return PiecewisePolynomial.from_singularity_functions(0, 300, *TERMS)
+
+def test_singularity_functions_are_right_continuous(function):
+    z = np.concatenate((np.linspace(0, 300, 3001), [20, 120, 150, 185, 280]))
+
+    assert function(z) == pytest.approx(singularity_functions_at(z, TERMS), abs=1e-9)
+    # The moment load makes a jump - the left limit is the value before it
+    assert function(150) - function.left_limit(150) == pytest.approx(-4000)
+    assert function.left_limit(120) == pytest.approx(function(120))
+
+def test_antiderivative_is_continuous_and_integrates_the_function(function):
+    antiderivative = function.antiderivative()
+    z = np.linspace(0, 300, 300001)
+    values = function(z)
+    trapezoid = np.concatenate(([0], np.cumsum((values[1:] + values[:-1]) / 2 * np.diff(z))))
+
+    assert antiderivative(0) == 0
+    assert antiderivative(function.breakpoints) == pytest.approx(antiderivative.left_limit(function.breakpoints))
+    # The trapezoidal rule is exact for the linear intervals - only the sample across the jump differs
+    assert antiderivative(z) == pytest.approx(trapezoid, rel=1e-9, abs=4000 * (z[1] - z[0]))
+    assert antiderivative.derivative()(z) == pytest.approx(values, abs=1e-9)
+
+# The functions are shifted, so that they cross 0 several times and are not identically 0 before the support A
+@pytest.mark.parametrize('order, shift', [(1, 9000), (2, 7e5), (3, 1e8)])
+def test_roots_are_the_zeros_of_every_interval(function, order, shift):
+    tested_function = function
+    for _ in range(order - 1):
+        tested_function = tested_function.antiderivative()
+    tested_function = tested_function + shift
+    roots = tested_function.roots()
+
+    # The samples do not hit the roots exactly
+    z = np.linspace(0, 300, 299993)
+    values = tested_function(z)
+    sign_changes = np.flatnonzero(np.sign(values[1:]) * np.sign(values[:-1]) < 0)
+    assert len(roots) == len(sign_changes)
+    assert roots == pytest.approx(z[sign_changes], abs=0.001)
+    assert tested_function(roots) == pytest.approx(0, abs=1e-6 * np.abs(values).max())
+
+def test_extrema_are_found_in_closed_form(function):
+    squared = function.antiderivative() * function.antiderivative() - function * 1000
+    z = np.linspace(0, 300, 300001)
+    values = squared(z)
+
+    z_max, value_max = squared.maximum()
+    z_min, value_min = squared.minimum()
+    assert value_max == pytest.approx(values.max(), rel=1e-9)
+    assert value_min == pytest.approx(values.min(), rel=1e-9)
+    assert squared(z_max) == pytest.approx(value_max)
+    assert abs(squared.max_abs()[1]) == pytest.approx(np.abs(values).max(), rel=1e-9)
+    # Both sides of the jump of the moment load are the candidates
+    candidates_z, candidates_values = function.extrema()
+    assert function.left_limit(150) in candidates_values[candidates_z == 150]
+    assert function(150) in candidates_values[candidates_z == 150]
+
+def test_arithmetic_aligns_the_breakpoints(function):
+    other = PiecewisePolynomial([0, 70, 300], [[1, 2], [-3, 0.5]])
+    z = np.linspace(0, 300, 3001)
+
+    assert (function + other)(z) == pytest.approx(function(z) + other(z))
+    assert (function - other)(z) == pytest.approx(function(z) - other(z))
+    assert (function * other)(z) == pytest.approx(function(z) * other(z))
+    assert (2 * function + 1)(z) == pytest.approx(2 * function(z) + 1)
+    assert np.array_equal((function + other).breakpoints, np.union1d(function.breakpoints, other.breakpoints))
+
+def test_restriction_keeps_the_values(function):
+    restricted = function.restrict(20, 280)
+    z = np.linspace(20, 280, 2601)
+
+    assert restricted.domain == (20, 280)
+    assert restricted(z) == pytest.approx(function(z))
+
+def test_subdivision_keeps_the_points():
+    points = np.array([0, 0.5, 10, 30])
+
+    z = subdivide(points, 3)
+
+    assert np.isin(points, z).all()
+    assert np.diff(z).max() <= 3 + 1e-12
+    assert np.all(np.diff(z) > 0)
+    assert len(z) == 1 + 1 + 4 + 7
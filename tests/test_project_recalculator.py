@@ -0,0 +1,55 @@
+import copy
+import sqlite3
+
+import pytest
+
+from conftest import create_component_data, create_shaft_steps
+from Core.ProjectRecalculator import ProjectRecalculator
+from InputShaft.model.InputShaftCalculator import InputShaftCalculator
+
+def create_project(database_handler):
+    data = create_component_data()
+    data['Materiał'] = database_handler.getSingleItem('wał czynny-materiały', 'S235JR')
+    for bearing_section_id, table_name, code in (('support_A', 'wał czynny-łożyska-podporowe-kulkowe', 6002),
+                                                 ('support_B', 'wał czynny-łożyska-podporowe-kulkowe', 6002),
+                                                 ('eccentrics', 'wał czynny-łożyska-centralne-walcowe', 'N203')):
+        attributes = data['Bearings'][bearing_section_id]
+        attributes['data'] = database_handler.getSingleItem(table_name, code)
+        attributes['rolling_elements'] = database_handler.getSingleItem(f"wał czynny-elementy toczne-{attributes['data']['elementy toczne'][0]}", 'Ø2')
+        attributes['Lh'][0], attributes['fd'][0], attributes['ft'][0], attributes['f'][0] = 10000, 1.2, 1, 0.00005
+    return [copy.deepcopy(data), {}, {}, {}, {}, False]
+
+def update_catalog(database_handler, query, parameters):
+    with sqlite3.connect(database_handler._databaseAbsPath) as conn:
+        conn.execute(query, parameters)
+
+def test_recalculation_reads_the_current_catalog_values(database_handler):
+    project = create_project(database_handler)
+    summary = ProjectRecalculator().recalculate(copy.deepcopy(project))
+
+    update_catalog(database_handler, 'UPDATE "wał czynny-materiały" SET "Zgo [MPa]" = ? WHERE "Oznaczenie" = ?', (80, 'S235JR'))
+    updated_summary = ProjectRecalculator().recalculate(copy.deepcopy(project))
+
+    # dsc is limited by the equivalent stress - half of the strength gives the cube root of 2 times larger diameter
+    assert updated_summary['dsc'] == pytest.approx(summary['dsc'] * 2**(1 / 3), abs=0.02)
+    assert updated_summary['P'] == pytest.approx(summary['P'])
+
+def test_recalculation_reads_the_bearing_of_the_table_with_the_same_attributes(database_handler):
+    # N203 is both a support bearing and an eccentric bearing - the eccentric one has the 'E' attribute
+    project = create_project(database_handler)
+    project[0]['Bearings']['eccentrics']['data']['E'][0] = 0
+    input_shaft_calculator = InputShaftCalculator()
+    input_shaft_calculator.set_data(project[0])
+
+    ProjectRecalculator()._update_catalog_items(input_shaft_calculator)
+
+    bearing = input_shaft_calculator.get_data()['Bearings']['eccentrics']['data']
+    assert bearing == database_handler.getSingleItem('wał czynny-łożyska-centralne-walcowe', 'N203')
+    assert bearing['E'][0] == pytest.approx(35.1)
+
+def test_project_with_an_item_removed_from_the_catalog_is_reported(database_handler):
+    project = create_project(database_handler)
+    update_catalog(database_handler, 'DELETE FROM "wał czynny-łożyska-centralne-walcowe" WHERE "Kod" = ?', ('N203',))
+
+    with pytest.raises(LookupError, match='N203'):
+        ProjectRecalculator().recalculate(project)
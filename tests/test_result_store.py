@@ -0,0 +1,91 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+from DbHandler.model.ResultStore import ResultStore
+
+def create_rows(count, offset=0):
+    generator = np.random.default_rng(offset)
+    # The numpy scalars are written the same as the python numbers
+    return [{'id': np.int64(offset + idx), 'dsc': float(generator.uniform(15, 30)), 'fmax': np.float64(generator.uniform(0, 0.1)),
+             'P': float(generator.uniform(50, 150)), 'code': f'6{idx % 7}02'} for idx in range(count)]
+
+def write_rows(database_path, offset):
+    with ResultStore(database_path) as store:
+        return store.writeResults(create_rows(500, offset), batchSize=50)
+
+@pytest.fixture
+def store(tmp_path):
+    with ResultStore(str(tmp_path / 'results.db')) as store:
+        store.writeResults(create_rows(2000), batchSize=300)
+        yield store
+
+def test_results_are_read_back_as_columns(store):
+    rows = create_rows(2000)
+
+    results = store.getResults(orderBy='id')
+
+    assert store.getColumns() == {'id': 'INTEGER', 'dsc': 'REAL', 'fmax': 'REAL', 'P': 'REAL', 'code': 'TEXT'}
+    np.testing.assert_array_equal(results['dsc'], [row['dsc'] for row in rows])
+    np.testing.assert_array_equal(results['fmax'], [row['fmax'] for row in rows])
+    assert results['code'].dtype == object
+    assert list(results['code']) == [row['code'] for row in rows]
+
+def test_missing_values_are_nan_and_unknown_keys_are_ignored(store):
+    store.writeResults([{'id': 2000, 'dsc': 20.0, 'other': 1}])
+
+    results = store.getResults(limits={'id': {'min': 2000, 'max': None}})
+
+    assert results['dsc'] == [20.0]
+    assert np.isnan(results['fmax'][0])
+    assert 'other' not in store.getColumns()
+
+@pytest.mark.parametrize('limits', [{'dsc': {'min': 20, 'max': 22}},
+                                    {'dsc': {'min': 18, 'max': None}, 'P': {'min': None, 'max': 60}},
+                                    {'dsc': {'min': 15, 'max': 30}, 'fmax': {'min': 0.05, 'max': 0.051}, 'code': {'min': '6102', 'max': '6302'}},
+                                    {'P': {'min': 0, 'max': 0}}])
+def test_range_queries_match_the_filtered_rows(store, limits):
+    rows = create_rows(2000)
+    within = lambda row: all((columnLimits['min'] is None or row[column] >= columnLimits['min']) and
+                             (columnLimits['max'] is None or row[column] <= columnLimits['max']) for column, columnLimits in limits.items())
+    expected = [row['id'] for row in rows if within(row)]
+
+    results = store.getResults(limits, columns=['id'], orderBy='id')
+
+    assert list(results['id']) == expected
+    assert store.countResults(limits) == len(expected)
+
+def test_results_are_sorted_and_limited(store):
+    results = store.getResults(columns=['dsc'], orderBy='dsc', maxCount=10)
+
+    assert len(results['dsc']) == 10
+    np.testing.assert_array_equal(results['dsc'], np.sort([row['dsc'] for row in create_rows(2000)])[:10])
+
+def test_unknown_columns_are_rejected(store):
+    with pytest.raises(ValueError):
+        store.getResults({'d': {'min': 1, 'max': None}})
+    with pytest.raises(ValueError):
+        store.getResults(columns=['d'])
+
+def test_store_reopens_the_existing_table(tmp_path):
+    database_path = str(tmp_path / 'results.db')
+    with ResultStore(database_path) as store:
+        store.writeResults(create_rows(10))
+
+    with ResultStore(database_path) as store:
+        assert store.countResults() == 10
+        store.writeResults(create_rows(5, offset=10))
+        assert store.countResults() == 15
+
+def test_many_processes_write_to_the_same_store(tmp_path):
+    database_path = str(tmp_path / 'results.db')
+    with ResultStore(database_path, columns={'id': 'INTEGER', 'dsc': 'REAL', 'fmax': 'REAL', 'P': 'REAL', 'code': 'TEXT'}):
+        pass
+
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        written = list(executor.map(write_rows, [database_path] * 4, [idx * 500 for idx in range(4)]))
+
+    with ResultStore(database_path) as store:
+        assert written == [500] * 4
+        assert sorted(store.getResults(columns=['id'])['id']) == list(range(2000))
@@ -0,0 +1,62 @@
+import copy
+
+import pytest
+
+from conftest import create_component_data, create_shaft_steps
+from InputShaft.model.InputShaftCalculator import InputShaftCalculator
+from InputShaft.model.ParametricSweep import ParametricSweep
+from InputShaft.model.SensitivityAnalysis import SensitivityAnalysis
+from ShaftDesigner.model.FunctionsCalculator import FunctionsCalculator
+
+def calculate_deflection(data, shaft_steps):
+    calculator = FunctionsCalculator(initial_functions_cache_size=0)
+    calculator.calculate_initial_functions_and_attributes(data)
+    calculator.calculate_remaining_functions(shaft_steps)
+    return abs(calculator.get_deflection_arrow_extremum()[1])
+
+def perturb(data, path, value):
+    # Component data with the changed input - the dependent values are set again the same as by the preliminary data tab
+    input_shaft_calculator = InputShaftCalculator()
+    input_shaft_calculator.set_data(copy.deepcopy(data))
+    perturbed_data = input_shaft_calculator.get_data()
+    if len(path) == 1:
+        ParametricSweep.set_combination_data(input_shaft_calculator, {path[0]: value})
+    else:
+        perturbed_data[path[0]][path[1]][0] = value
+    return perturbed_data
+
+@pytest.fixture
+def analysis():
+    data = create_component_data(Mwe=30)
+    # Every bound of the steps is an end of the shaft or an edge of an eccentric, so the steps of the perturbed shaft are known
+    shaft_steps = create_shaft_steps(data, d=26)
+    analysis = SensitivityAnalysis()
+    return data, analysis, analysis.calculate(data, shaft_steps)
+
+@pytest.mark.parametrize('path', [('L',), ('LA',), ('LB',), ('L1',), ('B',), ('x',), ('e',), ('Fwzx',), ('Materiał', 'E')])
+def test_deflection_derivatives_match_the_recalculated_shaft(analysis, path):
+    data, sensitivity_analysis, results = analysis
+    value = SensitivityAnalysis._get_value(data, path)
+    step = sensitivity_analysis._relative_step * abs(value)
+
+    deflections = []
+    for perturbed_value in (value + step, value - step):
+        perturbed_data = perturb(data, path, perturbed_value)
+        deflections.append(calculate_deflection(perturbed_data, create_shaft_steps(perturbed_data, d=26)))
+
+    derivative = results['jacobian'][results['outputs'].index('fmax'), results['inputs'].index('.'.join(path))]
+    assert derivative == pytest.approx((deflections[0] - deflections[1]) / (2 * step), rel=1e-6, abs=1e-12)
+
+def test_all_derivatives_are_analysed(analysis):
+    _, _, results = analysis
+
+    assert results['not_analysed'] == []
+    assert {row['input'] for row in results['table'] if row['output'] == 'fmax'} >= {'L1', 'LA', 'LB', 'B', 'x', 'Fwzx', 'Materiał.E'}
+
+def test_nominal_values_match_the_single_case_calculation(analysis):
+    data, _, results = analysis
+    calculated_data = copy.deepcopy(data)
+    fmax = calculate_deflection(calculated_data, create_shaft_steps(data, d=26))
+
+    assert results['values'][results['outputs'].index('dsc')] == calculated_data['dsc'][0]
+    assert results['values'][results['outputs'].index('fmax')] == pytest.approx(fmax)
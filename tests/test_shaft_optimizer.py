@@ -0,0 +1,93 @@
+import math
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from conftest import create_component_data
+from ShaftDesigner.model.FunctionsCalculator import FunctionsCalculator
+from ShaftDesigner.model.ShaftCalculator import ShaftCalculator
+from ShaftDesigner.model.ShaftOptimizer import ShaftOptimizer
+
+def get_steps_bounds(start, end, direction, steps):
+    # Start and end of every step - the steps are numbered from the eccentric
+    bounds = []
+    position = end if direction < 0 else start
+    for step in steps.values():
+        next_position = position + direction * step['l']
+        bounds.append((min(position, next_position), max(position, next_position), step['d']))
+        position = next_position
+    return bounds
+
+def create_envelope():
+    z = np.linspace(0, 100, 1001)
+    return z, 12 + 8 * np.sqrt(np.abs(np.sin(z / 30)))
+
+@pytest.mark.parametrize('direction', [1, -1])
+@pytest.mark.parametrize('max_steps', [1, 2, 4])
+def test_steps_stay_above_the_envelope(direction, max_steps):
+    z, d_min = create_envelope()
+    limits = {'d': {'min': 10, 'max': 1000}, 'l': {'min': 0, 'max': 80}}
+
+    sections = ShaftOptimizer().optimize({'section': (10, 90, direction, limits)}, z, d_min, max_steps)
+
+    steps = sections['section']
+    assert 1 <= len(steps) <= max_steps
+    assert sum(step['l'] for step in steps.values()) == pytest.approx(80)
+    for start, end, d in get_steps_bounds(10, 90, direction, steps):
+        inside = (z >= start) & (z <= end)
+        assert d >= d_min[inside].max()
+        assert d % 0.5 == 0
+
+def test_diameters_are_clipped_to_the_limits():
+    z, d_min = create_envelope()
+    limits = {'d': {'min': 25, 'max': 1000}, 'l': {'min': 0, 'max': 80}}
+
+    steps = ShaftOptimizer().optimize({'section': (10, 90, 1, limits)}, z, d_min, 3)['section']
+
+    assert [step['d'] for step in steps.values()] == [25]
+
+def test_layout_has_the_minimal_mass():
+    z, d_min = create_envelope()
+    limits = {'d': {'min': 10, 'max': 1000}, 'l': {'min': 0, 'max': 80}}
+    optimizer = ShaftOptimizer(length_increment=10)
+    max_steps = 3
+
+    steps = optimizer.optimize({'section': (10, 90, 1, limits)}, z, d_min, max_steps)['section']
+    mass = sum(step['l'] * step['d']**2 for step in steps.values())
+
+    # Every layout of the steps starting and ending at the candidates
+    candidates = 10 + np.arange(0, 81, 10)
+    step_diameter = lambda start, end: math.ceil(round(d_min[(z >= start) & (z <= end)].max() / 0.5, 9)) * 0.5
+    masses = []
+    for steps_number in range(1, max_steps + 1):
+        for inner in combinations(candidates[1:-1], steps_number - 1):
+            bounds = (candidates[0],) + inner + (candidates[-1],)
+            masses.append(sum((end - start) * step_diameter(start, end)**2 for start, end in zip(bounds[:-1], bounds[1:])))
+    assert mass == pytest.approx(min(masses))
+
+def test_proposed_shaft_is_above_its_own_minimal_diameters():
+    data = create_component_data(Mwe=30)
+    functions_calculator = FunctionsCalculator(initial_functions_cache_size=0)
+    functions_calculator.calculate_initial_functions_and_attributes(data)
+    shaft_calculator = ShaftCalculator()
+    shaft_calculator.set_data(functions_calculator.get_shaft_initial_attributes())
+    eccentric = {'l': data['B'][0], 'd': math.ceil(data['dec'][0] / 0.5) * 0.5}
+    eccentrics = {idx: dict(eccentric) for idx in range(data['n'][0])}
+    shaft_calculator.shaft_sections = {'Mimośrody': eccentrics}
+    shaft_calculator.calculate_shaft_sections()
+    functions_calculator.calculate_remaining_functions(shaft_calculator.get_shaft_attributes())
+
+    sections = ShaftOptimizer().optimize_shaft(shaft_calculator, functions_calculator, max_steps=3)
+
+    shaft_calculator.shaft_sections = {'Mimośrody': eccentrics, **sections}
+    shaft_calculator.calculate_shaft_sections()
+    shaft_steps = shaft_calculator.get_shaft_attributes()
+    assert sum(step['l'] for step in shaft_steps) == pytest.approx(data['L'][0])
+    functions_calculator.calculate_remaining_functions(shaft_steps)
+    functions = functions_calculator.get_shaft_functions()
+    z, d_min = functions['z'], functions['dmin(z)']['dmin']['function']
+    for step in shaft_steps:
+        if step['e'] == 0:
+            inside = (z >= step['z']) & (z <= step['z'] + step['l'])
+            assert step['d'] >= d_min[inside].max()
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from conftest import create_component_data
+from InputShaft.model.ParametricSweep import ParametricSweep
+from InputShaft.model.ParetoExplorer import ParetoExplorer
+
+RANGES = {'LA': np.arange(10, 41, 10.0), 'LB': np.arange(250, 291, 10.0), 'x': [8.0, 12.0]}
+
+class CountingSweep(ParametricSweep):
+    # Sweep counting the chunks submitted to the workers
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.submitted_chunks = 0
+
+    def _submit_chunk(self, executor, chunk):
+        self.submitted_chunks += 1
+        return super()._submit_chunk(executor, chunk)
+
+def sort_results(results):
+    return sorted(results, key=lambda result: [result[key] for key in ParametricSweep.sweep_keys])
+
+def test_resumed_sweep_equals_the_uninterrupted_one(tmp_path):
+    base_data = create_component_data(Mwe=30)
+    checkpoint_path = str(tmp_path / 'sweep.db')
+    uninterrupted = [result for chunk in ParametricSweep(base_data, chunk_size=4, max_workers=2).run(RANGES) for result in chunk]
+
+    # The sweep is interrupted after two chunks
+    interrupted_run = CountingSweep(base_data, chunk_size=4, max_workers=2).run(RANGES, checkpoint_path)
+    completed = [next(interrupted_run) for _ in range(2)]
+    interrupted_run.close()
+
+    sweep = CountingSweep(base_data, chunk_size=4, max_workers=2)
+    resumed = [result for chunk in sweep.run(RANGES, checkpoint_path) for result in chunk]
+
+    chunks_number = -(-len(uninterrupted) // 4)
+    assert sweep.submitted_chunks == chunks_number - len(completed)
+    assert all(result in resumed for chunk in completed for result in chunk)
+    assert sort_results(resumed) == sort_results(uninterrupted)
+
+    # The completed sweep is read from the checkpoint only
+    sweep = CountingSweep(base_data, chunk_size=4, max_workers=2)
+    assert sort_results([result for chunk in sweep.run(RANGES, checkpoint_path) for result in chunk]) == sort_results(uninterrupted)
+    assert sweep.submitted_chunks == 0
+
+def test_changed_inputs_discard_the_checkpoint(tmp_path):
+    checkpoint_path = str(tmp_path / 'sweep.db')
+    list(ParametricSweep(create_component_data(Mwe=30), chunk_size=4, max_workers=2).run(RANGES, checkpoint_path))
+
+    base_data = create_component_data(Mwe=40)
+    sweep = CountingSweep(base_data, chunk_size=4, max_workers=2)
+    results = [result for chunk in sweep.run(RANGES, checkpoint_path) for result in chunk]
+
+    assert sweep.submitted_chunks == -(-len(results) // 4)
+    assert sort_results(results) == sort_results([result for chunk in ParametricSweep(base_data, chunk_size=4, max_workers=2).run(RANGES) for result in chunk])
+
+def create_explored_data(database_handler):
+    data = create_component_data(Mwe=30)
+    data['Materiał'] = database_handler.getSingleItem('wał czynny-materiały', 'S235JR')
+    for attributes in data['Bearings'].values():
+        attributes['Lh'][0], attributes['fd'][0], attributes['ft'][0], attributes['f'][0] = 10000, 1.2, 1, 0.00005
+    return data
+
+def test_resumed_exploration_gives_the_same_front(database_handler, tmp_path):
+    data = create_explored_data(database_handler)
+    checkpoint_path = str(tmp_path / 'pareto.db')
+    ranges = {'LA': [10.0, 25.0], 'LB': [260.0, 280.0], 'x': [8.0]}
+    front = list(ParetoExplorer(data, max_steps_options=(1, 2), chunk_size=1, max_workers=2).explore(ranges))[-1]
+
+    interrupted_exploration = ParetoExplorer(data, max_steps_options=(1, 2), chunk_size=1, max_workers=2).explore(ranges, checkpoint_path)
+    next(interrupted_exploration)
+    interrupted_exploration.close()
+    resumed_front = list(ParetoExplorer(data, max_steps_options=(1, 2), chunk_size=1, max_workers=2).explore(ranges, checkpoint_path))[-1]
+
+    key = lambda design: [design[key] for key in ParetoExplorer.objectives_keys]
+    assert len(front) > 0
+    assert sorted(resumed_front, key=key) == sorted(front, key=key)
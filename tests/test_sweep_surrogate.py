@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from conftest import create_component_data
+from InputShaft.model.ParametricSweep import ParametricSweep, _evaluate_chunk
+from InputShaft.model.SweepSurrogate import SweepSurrogate
+
+KEYS = ('Ra', 'Rb', 'F')
+RANGES = {'LA': (10, 40), 'LB': (250, 290), 'x': (8, 14)}
+
+@pytest.fixture(scope='module')
+def base_data():
+    return create_component_data(Mwe=30, n=3)
+
+def get_results(base_data, method):
+    if method == 'linear':
+        sweep_ranges = {'LA': np.arange(10, 41, 6.0), 'LB': np.arange(250, 291, 8.0), 'x': [8.0, 10.0, 12.0, 14.0]}
+        combinations = list(ParametricSweep(base_data).get_feasible_combinations(sweep_ranges))
+    else:
+        generator = np.random.default_rng(1)
+        combinations = [{key: float(generator.uniform(*RANGES[key])) for key in RANGES} for _ in range(150)]
+    return _evaluate_chunk(base_data, combinations)
+
+@pytest.mark.parametrize('method', SweepSurrogate.methods)
+def test_error_estimate_bounds_the_held_out_error(base_data, method):
+    surrogate = SweepSurrogate(base_data, get_results(base_data, method), keys=KEYS, method=method, relative_tolerance=1)
+    generator = np.random.default_rng(2)
+    points = [{key: float(generator.uniform(*RANGES[key])) for key in RANGES} for _ in range(200)]
+
+    answers = [surrogate.query(point) for point in points]
+    exact_results = _evaluate_chunk(base_data, points)
+
+    interpolated = [(answer, result) for answer, result in zip(answers, exact_results) if not answer['exact']]
+    assert len(interpolated) > 0.9 * len(points)
+    for answer, result in interpolated:
+        for key in KEYS:
+            # The round-off of the interpolation is below the estimate of the constant values
+            assert abs(answer['values'][key] - result[key]) <= answer['errors'][key] + 1e-9 * abs(result[key]), key
+
+@pytest.mark.parametrize('method', SweepSurrogate.methods)
+def test_results_are_reproduced_at_the_nodes(base_data, method):
+    results = get_results(base_data, method)
+    surrogate = SweepSurrogate(base_data, results, keys=KEYS, method=method, relative_tolerance=1)
+
+    for result in results[::10]:
+        answer = surrogate.query({key: result[key] for key in RANGES})
+        assert answer['values'] == pytest.approx({key: result[key] for key in KEYS})
+
+def test_points_outside_of_the_trust_region_are_calculated(base_data):
+    surrogate = SweepSurrogate(base_data, get_results(base_data, 'linear'), keys=KEYS)
+    point = {'LA': 45.0, 'LB': 270.0, 'x': 10.0}
+
+    answer = surrogate.query(point)
+
+    assert answer['exact']
+    assert answer['values'] == {key: _evaluate_chunk(base_data, [point])[0][key] for key in KEYS}
+    assert answer['errors'] == dict.fromkeys(KEYS, 0.0)
+
+def test_tight_tolerance_falls_back_to_the_exact_calculation(base_data):
+    surrogate = SweepSurrogate(base_data, get_results(base_data, 'rbf'), keys=('Ra',), method='rbf', relative_tolerance=1e-12)
+    point = {'LA': 25.0, 'LB': 270.0, 'x': 11.0}
+
+    answer = surrogate.query(point)
+
+    assert answer['exact']
+    assert answer['values']['Ra'] == _evaluate_chunk(base_data, [point])[0]['Ra']